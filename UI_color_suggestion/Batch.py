@@ -0,0 +1,101 @@
+import numpy as np
+
+import ColorSpace
+
+
+class BatchEngine(object):
+    # vectorized counterpart of ColorEngine for (N, 3) uint8 arrays of base colors
+    # the HSV math follows colorsys step by step so results match the scalar code
+
+    @staticmethod
+    def as_colors(colors):
+        colors = np.asarray(colors)
+        if colors.ndim != 2 or colors.shape[1] != 3:
+            raise ValueError(f"Expected an (N, 3) array of RGB colors, got shape {colors.shape}")
+        if colors.dtype != np.uint8:
+            if colors.size and (colors.min() < 0 or colors.max() > 255):
+                raise ValueError("RGB channels must be in the range 0-255")
+            colors = colors.astype(np.uint8)
+        return colors
+
+    @staticmethod
+    def rgb_to_hsv(rgb):
+        rgb = np.asarray(rgb, dtype=np.float64)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        maxc = rgb.max(axis=-1)
+        minc = rgb.min(axis=-1)
+        rangec = maxc - minc
+        gray = rangec == 0
+        safe_range = np.where(gray, 1.0, rangec)
+        safe_max = np.where(maxc == 0, 1.0, maxc)
+
+        s = np.where(gray, 0.0, rangec / safe_max)
+        rc = (maxc - r) / safe_range
+        gc = (maxc - g) / safe_range
+        bc = (maxc - b) / safe_range
+        h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+        h = np.where(gray, 0.0, np.mod(h / 6.0, 1.0))
+        return np.stack([h, s, maxc], axis=-1)
+
+    @staticmethod
+    def hsv_to_rgb(hsv):
+        hsv = np.asarray(hsv, dtype=np.float64)
+        h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        i = np.trunc(h * 6.0)
+        f = (h * 6.0) - i
+        p = v * (1.0 - s)
+        q = v * (1.0 - s * f)
+        t = v * (1.0 - s * (1.0 - f))
+        i = np.mod(i.astype(np.int64), 6)
+
+        r = np.choose(i, [v, q, p, p, t, v])
+        g = np.choose(i, [t, v, v, q, p, p])
+        b = np.choose(i, [p, p, t, v, v, q])
+        rgb = np.stack([r, g, b], axis=-1)
+        gray = (s == 0.0)[..., None]
+        return np.where(gray, v[..., None], rgb)
+
+    @staticmethod
+    def rotate_hue(colors, offsets, space="hsv"):
+        colors = BatchEngine.as_colors(colors)
+        if space != "hsv":
+            return ColorSpace.rotate_hue(colors, offsets, space)
+        offsets = np.asarray(offsets, dtype=np.float64).reshape(-1)
+        hsv = BatchEngine.rgb_to_hsv(colors / 255.0)
+        rotated = np.repeat(hsv[:, None, :], len(offsets), axis=1)
+        rotated[..., 0] = np.mod(hsv[:, None, 0] + offsets[None, :], 1.0)
+        rgb = BatchEngine.hsv_to_rgb(rotated)
+        return (rgb * 255).astype(np.uint8)
+
+    @staticmethod
+    def complementary(colors, space="hsv"):
+        return BatchEngine.rotate_hue(colors, [0.5], space)
+
+    @staticmethod
+    def hue_steps(colors, num_colors, step=0.1, space="hsv"):
+        return BatchEngine.rotate_hue(colors, step * np.arange(1, num_colors + 1), space)
+
+    @staticmethod
+    def analogous(colors, num_colors, hue_step=30, space="hsv"):
+        return BatchEngine.hue_steps(colors, num_colors, hue_step / 360.0, space)
+
+    @staticmethod
+    def split_complementary(colors, spread=30, space="hsv"):
+        offset = spread / 360.0
+        return BatchEngine.rotate_hue(colors, [0.5 - offset, 0.5 + offset], space)
+
+    @staticmethod
+    def intensity_ladder(colors, changes, space="srgb"):
+        colors = BatchEngine.as_colors(colors)
+        changes = np.asarray(changes, dtype=np.int16).reshape(-1)
+        if space == "srgb":
+            return np.clip(colors[:, None, :].astype(np.int16) + changes[None, :, None], 0, 255).astype(np.uint8)
+        return ColorSpace.shift_lightness(colors, changes, space)
+
+    @staticmethod
+    def tints(colors, num_colors, step=20, space="srgb"):
+        return BatchEngine.intensity_ladder(colors, step * np.arange(1, num_colors + 1), space)
+
+    @staticmethod
+    def shades(colors, num_colors, step=20, space="srgb"):
+        return BatchEngine.intensity_ladder(colors, -step * np.arange(1, num_colors + 1), space)
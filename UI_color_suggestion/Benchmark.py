@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import Codec
+import Ladder
+import PaletteIO
+import Scoring
+from Batch import BatchEngine
+from Engine import ColorEngine
+from Library import PaletteLibrary
+from LazyImport import lazy_import
+from Module import ColorMixerApp, Layer, Suggestion
+from Quantize import PaletteQuantizer
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+IMAGE_SIZES = (64, 256, 1024, 2048)
+QUICK_IMAGE_SIZES = (64, 256)
+ENTROPIES = ("flat", "gradient", "noise")
+BATCH_SIZES = (1000, 100000)
+
+
+class _NoCache(object):
+    # stands in for ColorMixerApp.result_cache so every call measures the extraction itself
+    def get_or_compute(self, path, params, compute):
+        return compute()
+
+
+def synthetic_image(size, entropy, seed=0):
+    # flat: four solid blocks, gradient: smooth ramps, noise: uniform random pixels
+    rng = np.random.default_rng(seed)
+    if entropy == "flat":
+        image = np.empty((size, size, 3), dtype=np.uint8)
+        half = size // 2
+        for i, color in enumerate(rng.integers(0, 256, (4, 3), dtype=np.uint8)):
+            image[(i // 2) * half:(i // 2 + 1) * half or None, (i % 2) * half:(i % 2 + 1) * half or None] = color
+        return image
+    if entropy == "gradient":
+        ramp = np.linspace(0, 255, size)
+        return np.stack([np.broadcast_to(ramp[None, :], (size, size)),
+                         np.broadcast_to(ramp[:, None], (size, size)),
+                         np.full((size, size), rng.integers(0, 256))], axis=-1).astype(np.uint8)
+    if entropy == "noise":
+        return rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    raise ValueError(f"Unknown image entropy: {entropy!r}")
+
+
+def synthetic_colors(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (count, 3), dtype=np.uint8)
+
+
+def mixer_stub():
+    # the attributes the ColorMixerApp methods read, without creating any Tk widgets
+    return SimpleNamespace(most_common_sample_size=ColorMixerApp.most_common_sample_size, most_common_bits=ColorMixerApp.most_common_bits,
+                           result_cache=_NoCache(), palette_extractors={})
+
+
+def suggestion_stub():
+    return SimpleNamespace(hue_space=Suggestion.hue_space)
+
+
+def layer_stub():
+    return SimpleNamespace(colors=["#3C6E9F", "", "", "", ""], is_valid_hex_color=Codec.is_valid_hex_color,
+                           hex_to_rgb=Codec.hex_to_rgb, rgb_to_hex=Codec.rgb_to_hex, update_labels=lambda: None)
+
+
+def image_cases(workdir, sizes):
+    mixer = mixer_stub()
+    for size in sizes:
+        for entropy in ENTROPIES:
+            image = synthetic_image(size, entropy)
+            path = os.path.join(workdir, f"{entropy}_{size}.png")
+            cv2.imwrite(path, image[..., ::-1])
+            pixels = size * size
+            yield f"get_most_common_color[{entropy}-{size}]", lambda path=path: ColorMixerApp.get_most_common_color(mixer, path), pixels
+            yield f"get_dominant_color[{entropy}-{size}]", lambda image=image: ColorMixerApp.get_dominant_color(mixer, image), pixels
+            for k in (1, 5):
+                yield (f"get_dominant_color_upload[k={k}-{entropy}-{size}]",
+                       lambda image=image, k=k: ColorMixerApp.get_dominant_color_upload(mixer, image, k), pixels)
+            for method in PaletteQuantizer.METHODS:
+                yield (f"PaletteQuantizer.extract[{method}-{entropy}-{size}]",
+                       lambda image=image, quantizer=PaletteQuantizer(5, method): quantizer.extract(image), pixels)
+
+
+def suggestion_cases():
+    suggestion = suggestion_stub()
+
+    def suggest(main_color):
+        candidates = Suggestion.suggestion_candidates(suggestion, main_color)
+        return Scoring.rank_candidates(main_color, candidates, 4, Suggestion.min_contrast)
+
+    for hex_color in ("#3C6E9F", "#F2C14E", "#202020"):
+        yield f"suggest_colors[{hex_color}]", lambda main=Codec.hex_to_rgb(hex_color): suggest(main), 1
+
+
+def layer_cases():
+    layer = layer_stub()
+    yield "Layer.deep_colors", lambda: Layer.deep_colors(layer), 4
+    yield "Layer.light_colors", lambda: Layer.light_colors(layer), 4
+    for space in ("oklab", "lab"):
+        yield f"ColorEngine.tints[{space}]", lambda space=space: ColorEngine.tints((60, 110, 159), 4, 20, space), 4
+
+
+def batch_cases(sizes):
+    for count in sizes:
+        colors = synthetic_colors(count)
+        hexes = Codec.encode_many(colors)
+        palettes = synthetic_colors(count * 5).reshape(count, 5, 3)
+        yield f"BatchEngine.analogous[{count}]", lambda colors=colors: BatchEngine.analogous(colors, 4), count
+        yield f"BatchEngine.tints[oklab-{count}]", lambda colors=colors: BatchEngine.tints(colors, 4, 20, "oklab"), count
+        yield f"Codec.encode_many[{count}]", lambda colors=colors: Codec.encode_many(colors), count
+        yield f"Codec.decode_many[{count}]", lambda hexes=hexes: Codec.decode_many(hexes), count
+        yield f"Scoring.score_palettes[{count}]", lambda palettes=palettes: Scoring.score_palettes(palettes), count
+        yield f"Ladder.ladder[scale-10-{count}]", lambda colors=colors: Ladder.ladder(colors, 10, "scale"), count
+        yield f"Ladder.token_scale[{count}]", lambda colors=colors: Ladder.token_scale(colors), count
+
+
+def library_cases(workdir, sizes):
+    for count in sizes:
+        path = os.path.join(workdir, f"library_{count}.cpal")
+        palettes = synthetic_colors(count * 5).reshape(count, 5, 3)
+        PaletteIO.save_packed(path, [(f"p{i}", palette) for i, palette in enumerate(palettes)])
+        library = PaletteLibrary(os.path.join(workdir, f"library_{count}")).add(PaletteIO.PackedPalettes(path))
+        queries = list(synthetic_colors(32 * 5, seed=1).reshape(32, 5, 3))
+        yield f"PaletteLibrary.query[32x{count}]", lambda library=library, queries=queries: library.query(queries, 10), 32
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(fn, items, min_runs=5, min_time=0.2, max_runs=1000):
+    fn()  # warm-up: lazy imports, lookup tables and allocator pools
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < max_runs and (len(latencies) < min_runs or time.perf_counter() - start < min_time):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - call_start) * 1000.0)
+    latencies.sort()
+    mean_ms = statistics.fmean(latencies)
+    return {
+        "runs": len(latencies),
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "mean_ms": mean_ms,
+        "calls_per_s": 1000.0 / mean_ms if mean_ms else float("inf"),
+        "items_per_s": items * 1000.0 / mean_ms if mean_ms else float("inf"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    # a case regresses when its median latency grows by more than the tolerance over the stored baseline
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and result["p50_ms"] > previous["p50_ms"] * (1.0 + tolerance):
+            regressions.append((name, previous["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark color extraction, suggestion and ladder code on synthetic data (headless).")
+    parser.add_argument("-k", "--filter", default=None, help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="small images and batches only")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per case")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--baseline", default=None, help="JSON file of stored results to compare against")
+    parser.add_argument("--save-baseline", default=None, help="write these results to a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--json", default=None, help="also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="color-bench-")
+    results = {}
+    try:
+        cases = [image_cases(workdir, QUICK_IMAGE_SIZES if args.quick else IMAGE_SIZES), suggestion_cases(), layer_cases(),
+                 batch_cases(BATCH_SIZES[:1] if args.quick else BATCH_SIZES), library_cases(workdir, BATCH_SIZES[:1] if args.quick else BATCH_SIZES)]
+        print(f"{'case':52} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>12}")
+        for group in cases:
+            for name, fn, items in group:
+                if args.filter and args.filter not in name:
+                    continue
+                result = measure(fn, items, args.min_runs, args.min_time)
+                results[name] = result
+                print(f"{name:52} {result['runs']:5d} {result['p50_ms']:10.3f} {result['p95_ms']:10.3f} {result['items_per_s']:12.4g}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump(report, stream, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as stream:
+            json.dump(report, stream, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            regressions = compare(results, json.load(stream), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.3f} ms -> {after:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
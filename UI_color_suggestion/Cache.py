@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ResultCache(object):
+    # bounded LRU of extraction results keyed by the source file and the extraction parameters,
+    # optionally backed by one small JSON file per entry in cache_dir so results survive restarts;
+    # hits refresh the file's mtime, so disk trimming drops the least recently used entries
+
+    TRIM_EVERY = 64
+
+    def __init__(self, max_entries=1024, max_bytes=4 * 1024 * 1024, cache_dir=None, max_disk_bytes=64 * 1024 * 1024, key_mode="stat"):
+        if key_mode not in ("stat", "content"):
+            raise ValueError(f"Unknown cache key mode: {key_mode!r}")
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = int(max_disk_bytes)
+        self.key_mode = key_mode
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_trim = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def content_hash(path, chunk_size=1 << 20):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key(self, path, params):
+        if self.key_mode == "content":
+            source = self.content_hash(path)
+        else:
+            stat = os.stat(path)
+            source = f"{os.path.realpath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        payload = source + "|" + json.dumps(params, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _remember(self, key, value, size):
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def _touch(self, key):
+        if self.cache_dir:
+            try:
+                os.utime(self._disk_path(key))
+            except OSError:
+                pass
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                value = self.entries[key][0]
+                hit = True
+            else:
+                hit = False
+        if hit:
+            self._touch(key)
+            return value
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key)) as stored:
+                    encoded = stored.read()
+                value = json.loads(encoded)
+            except (OSError, ValueError):
+                value = None
+            else:
+                with self._lock:
+                    self._remember(key, value, len(encoded))
+                    self.hits += 1
+                self._touch(key)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._remember(key, value, len(encoded))
+        if self.cache_dir:
+            # write to a temp file and rename so concurrent readers never see a partial entry
+            handle, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(handle, "w") as stored:
+                stored.write(encoded)
+            os.replace(temp_path, self._disk_path(key))
+            self._puts_since_trim += 1
+            if self._puts_since_trim >= self.TRIM_EVERY:
+                self._puts_since_trim = 0
+                self.trim_disk()
+
+    def trim_disk(self):
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+            files = []
+            for name in names:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def get_or_compute(self, path, params, compute):
+        key = self.key(path, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+
+from LazyImport import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+
+class OpenCVCaptureBackend(object):
+    # wraps cv2.VideoCapture; source can be a device index or a video file path
+    def __init__(self, source=0, loop=True):
+        self.source = source
+        self.loop = loop and not isinstance(source, int)
+        self.capture = None
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.source)
+        if not self.capture.isOpened():
+            self.release()
+            raise ValueError(f"Could not open capture source: {self.source!r}")
+
+    def read(self):
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        if not ok:
+            return False, None
+        return True, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class SyntheticCaptureBackend(object):
+    # replays RGB frames (a list or a callable taking the frame index) so the session runs without hardware
+    def __init__(self, frames, fps=30):
+        self.frames = frames
+        self.interval = 1.0 / fps if fps else 0
+        self.index = 0
+        self.opened = False
+
+    def open(self):
+        self.opened = True
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        if self.interval:
+            time.sleep(self.interval)
+        if callable(self.frames):
+            frame = self.frames(self.index)
+        else:
+            frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return frame is not None, frame
+
+    def release(self):
+        self.opened = False
+
+
+class CameraSession(object):
+    # opens the capture device once, reads frames on a background thread into a ring buffer
+    # and publishes a smoothed dominant color to the Tk thread through root.after
+
+    def __init__(self, root, on_color, backend=None, publish_interval=200, buffer_size=4, smoothing=0.5, sample_stride=8, on_error=None):
+        self.root = root
+        self.on_color = on_color
+        self.on_error = on_error
+        self.backend = backend if backend is not None else OpenCVCaptureBackend(0)
+        self.publish_interval = int(publish_interval)
+        self.frames = deque(maxlen=buffer_size)
+        self.smoothing = float(smoothing)
+        self.sample_stride = int(sample_stride)
+        self.color = None
+        self.error = None
+        self.frames_read = 0
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._after_id = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.backend.open()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True)
+        self._thread.start()
+        self._after_id = self.root.after(self.publish_interval, self._publish)
+
+    def _capture_loop(self):
+        # the reader owns the device: it releases it only after its last read() has returned
+        try:
+            while not self._stop_event.is_set():
+                ok, frame = self.backend.read()
+                if not ok:
+                    self.error = "Camera stopped delivering frames"
+                    break
+                with self._lock:
+                    self.frames.append(frame)
+                    self.frames_read += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.backend.release()
+
+    def latest_frame(self):
+        with self._lock:
+            return self.frames[-1] if self.frames else None
+
+    def measure(self, frame):
+        pixels = np.asarray(frame)[::self.sample_stride, ::self.sample_stride, :3].reshape(-1, 3)
+        current = pixels.mean(axis=0)
+        if self.color is None:
+            self.color = current
+        else:
+            self.color = self.smoothing * current + (1.0 - self.smoothing) * self.color
+        return tuple(int(c) for c in self.color)
+
+    def _publish(self):
+        self._after_id = None
+        if self._stop_event.is_set():
+            return
+        frame = self.latest_frame()
+        if frame is not None:
+            self.on_color(self.measure(frame))
+        if self.running:
+            self._after_id = self.root.after(self.publish_interval, self._publish)
+        elif self.error and self.on_error:
+            self.on_error(self.error)
+
+    def current_color(self):
+        if self.color is None:
+            return None
+        return tuple(int(c) for c in self.color)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._thread is None:
+            self.backend.release()
+            return
+        # a reader stuck in read() past the timeout still releases the device itself once the read returns
+        self._thread.join(timeout=1.0)
+        if not self._thread.is_alive():
+            self._thread = None
@@ -0,0 +1,234 @@
+import csv
+import json
+import os
+
+import Codec
+import ColorSpace
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+CSS_COLORS = """
+aliceblue F0F8FF antiquewhite FAEBD7 aqua 00FFFF aquamarine 7FFFD4 azure F0FFFF beige F5F5DC bisque FFE4C4
+black 000000 blanchedalmond FFEBCD blue 0000FF blueviolet 8A2BE2 brown A52A2A burlywood DEB887 cadetblue 5F9EA0
+chartreuse 7FFF00 chocolate D2691E coral FF7F50 cornflowerblue 6495ED cornsilk FFF8DC crimson DC143C cyan 00FFFF
+darkblue 00008B darkcyan 008B8B darkgoldenrod B8860B darkgray A9A9A9 darkgreen 006400 darkgrey A9A9A9
+darkkhaki BDB76B darkmagenta 8B008B darkolivegreen 556B2F darkorange FF8C00 darkorchid 9932CC darkred 8B0000
+darksalmon E9967A darkseagreen 8FBC8F darkslateblue 483D8B darkslategray 2F4F4F darkslategrey 2F4F4F
+darkturquoise 00CED1 darkviolet 9400D3 deeppink FF1493 deepskyblue 00BFFF dimgray 696969 dimgrey 696969
+dodgerblue 1E90FF firebrick B22222 floralwhite FFFAF0 forestgreen 228B22 fuchsia FF00FF gainsboro DCDCDC
+ghostwhite F8F8FF gold FFD700 goldenrod DAA520 gray 808080 green 008000 greenyellow ADFF2F grey 808080
+honeydew F0FFF0 hotpink FF69B4 indianred CD5C5C indigo 4B0082 ivory FFFFF0 khaki F0E68C lavender E6E6FA
+lavenderblush FFF0F5 lawngreen 7CFC00 lemonchiffon FFFACD lightblue ADD8E6 lightcoral F08080 lightcyan E0FFFF
+lightgoldenrodyellow FAFAD2 lightgray D3D3D3 lightgreen 90EE90 lightgrey D3D3D3 lightpink FFB6C1
+lightsalmon FFA07A lightseagreen 20B2AA lightskyblue 87CEFA lightslategray 778899 lightslategrey 778899
+lightsteelblue B0C4DE lightyellow FFFFE0 lime 00FF00 limegreen 32CD32 linen FAF0E6 magenta FF00FF maroon 800000
+mediumaquamarine 66CDAA mediumblue 0000CD mediumorchid BA55D3 mediumpurple 9370DB mediumseagreen 3CB371
+mediumslateblue 7B68EE mediumspringgreen 00FA9A mediumturquoise 48D1CC mediumvioletred C71585
+midnightblue 191970 mintcream F5FFFA mistyrose FFE4E1 moccasin FFE4B5 navajowhite FFDEAD navy 000080
+oldlace FDF5E6 olive 808000 olivedrab 6B8E23 orange FFA500 orangered FF4500 orchid DA70D6 palegoldenrod EEE8AA
+palegreen 98FB98 paleturquoise AFEEEE palevioletred DB7093 papayawhip FFEFD5 peachpuff FFDAB9 peru CD853F
+pink FFC0CB plum DDA0DD powderblue B0E0E6 purple 800080 rebeccapurple 663399 red FF0000 rosybrown BC8F8F
+royalblue 4169E1 saddlebrown 8B4513 salmon FA8072 sandybrown F4A460 seagreen 2E8B57 seashell FFF5EE
+sienna A0522D silver C0C0C0 skyblue 87CEEB slateblue 6A5ACD slategray 708090 slategrey 708090 snow FFFAFA
+springgreen 00FF7F steelblue 4682B4 tan D2B48C teal 008080 thistle D8BFD8 tomato FF6347 turquoise 40E0D0
+violet EE82EE wheat F5DEB3 white FFFFFF whitesmoke F5F5F5 yellow FFFF00 yellowgreen 9ACD32
+"""
+
+
+class LabGridIndex(object):
+    # uniform grid over Lab space: points are sorted by cell so each cell is a contiguous slice,
+    # and a query searches cubic shells of cells outward until the k-th distance is provably final
+
+    def __init__(self, points, cell_size=None, order=None, starts=None, origin=None, dims=None):
+        self.points = np.asarray(points, dtype=np.float32)
+        if order is not None:
+            self.cell_size = float(cell_size)
+            self.order, self.starts = order, starts
+            self.origin, self.dims = np.asarray(origin, dtype=np.float32), np.asarray(dims, dtype=np.int64)
+            return
+        low = self.points.min(axis=0) if len(self.points) else np.zeros(3, np.float32)
+        high = self.points.max(axis=0) if len(self.points) else np.ones(3, np.float32)
+        extent = np.maximum(high - low, 1e-3)
+        if cell_size is None:
+            # aim for roughly two points per occupied cell on a 2-D-ish color surface
+            cell_size = float(max(extent.max() / max(np.sqrt(len(self.points) / 2.0), 1.0), 0.5))
+        self.cell_size = cell_size
+        self.origin = low
+        self.dims = (np.floor(extent / cell_size).astype(np.int64) + 1)
+        keys = self._keys(self._cells(self.points))
+        self.order = np.argsort(keys, kind="stable")
+        self.starts = np.searchsorted(keys[self.order], np.arange(int(np.prod(self.dims)) + 1))
+
+    def _cells(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.dims - 1)
+
+    def _keys(self, cells):
+        return (cells[..., 0] * self.dims[1] + cells[..., 1]) * self.dims[2] + cells[..., 2]
+
+    _shells = {}
+
+    @classmethod
+    def _shell(cls, radius):
+        if radius not in cls._shells:
+            span = np.arange(-radius, radius + 1)
+            offsets = np.stack(np.meshgrid(span, span, span, indexing="ij"), axis=-1).reshape(-1, 3)
+            cls._shells[radius] = offsets[np.abs(offsets).max(axis=1) == radius]
+        return cls._shells[radius]
+
+    def query_one(self, point, k=1):
+        point = np.asarray(point, dtype=np.float32)
+        center = self._cells(point[None, :])[0]
+        max_radius = int(self.dims.max())
+        candidates = []
+        found = 0
+        for radius in range(max_radius + 1):
+            cells = center + self._shell(radius)
+            inside = ((cells >= 0) & (cells < self.dims)).all(axis=1)
+            keys = self._keys(cells[inside])
+            begin, end = self.starts[keys], self.starts[keys + 1]
+            lengths = end - begin
+            if lengths.sum():
+                offsets = np.repeat(begin - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+                candidates.append(self.order[offsets])
+                found += int(lengths.sum())
+            if found >= k:
+                pool = np.concatenate(candidates)
+                distances = ((self.points[pool] - point) ** 2).sum(axis=1)
+                nearest = np.argsort(distances, kind="stable")[:k]
+                # anything outside the searched cube is at least radius cells away
+                if distances[nearest[-1]] <= (radius * self.cell_size) ** 2 or radius == max_radius:
+                    return np.sqrt(distances[nearest]), pool[nearest]
+        pool = np.concatenate(candidates) if candidates else np.empty(0, np.int64)
+        distances = ((self.points[pool] - point) ** 2).sum(axis=1)
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return np.sqrt(distances[nearest]), pool[nearest]
+
+    def query(self, points, k=1):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        distances = np.empty((len(points), k), dtype=np.float32)
+        indices = np.empty((len(points), k), dtype=np.int64)
+        for i, point in enumerate(points):
+            d, idx = self.query_one(point, k)
+            distances[i], indices[i] = d, idx
+        return distances, indices
+
+
+class ColorCatalog(object):
+    # named colors indexed in CIELAB so nearest matches follow perceived difference (Delta E 1976)
+
+    def __init__(self, names, colors, backend="auto"):
+        self.names = np.asarray(names, dtype=str)
+        self.colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        if len(self.names) != len(self.colors):
+            raise ValueError("Catalog names and colors must have the same length")
+        self.lab = ColorSpace.rgb_to_lab(self.colors).astype(np.float32)
+        self.backend = backend
+        self.index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def build_index(self, grid=None):
+        if self.backend in ("auto", "kdtree"):
+            try:
+                from scipy.spatial import cKDTree
+                self.index = cKDTree(self.lab)
+                self.backend = "kdtree"
+                return self
+            except ImportError:
+                if self.backend == "kdtree":
+                    raise
+        self.index = grid if grid is not None else LabGridIndex(self.lab)
+        self.backend = "grid"
+        return self
+
+    def nearest(self, colors, k=1):
+        if len(self) == 0:
+            raise ValueError("Cannot query an empty color catalog")
+        if self.index is None:
+            self.build_index()
+        k = min(k, len(self))
+        lab = ColorSpace.rgb_to_lab(np.asarray(colors, dtype=np.uint8).reshape(-1, 3)).astype(np.float32)
+        distances, indices = self.index.query(lab, k=k)
+        return np.asarray(distances, dtype=np.float32).reshape(len(lab), k), np.asarray(indices, dtype=np.int64).reshape(len(lab), k)
+
+    def match(self, rgb_color, k=1):
+        distances, indices = self.nearest([rgb_color], k)
+        return [(str(self.names[i]), Codec.rgb_to_hex(self.colors[i]), float(d)) for d, i in zip(distances[0], indices[0])]
+
+    def name_of(self, rgb_color):
+        return self.match(rgb_color, 1)[0][0]
+
+    @classmethod
+    def css(cls, **kwargs):
+        tokens = CSS_COLORS.split()
+        return cls(tokens[0::2], Codec.decode_many(np.array(["#" + value for value in tokens[1::2]])), **kwargs)
+
+    @classmethod
+    def from_json(cls, path, **kwargs):
+        # accepts {"name": "#RRGGBB"} or [{"name": ..., "hex": ...}]
+        with open(path) as source:
+            data = json.load(source)
+        if isinstance(data, dict):
+            names, hexes = list(data.keys()), list(data.values())
+        else:
+            names = [entry["name"] for entry in data]
+            hexes = [entry.get("hex") or entry.get("color") for entry in data]
+        return cls(names, Codec.decode_many(np.array(hexes)), **kwargs)
+
+    @classmethod
+    def from_csv(cls, path, name_column=0, hex_column=1, **kwargs):
+        names, hexes = [], []
+        with open(path, newline="") as source:
+            for row in csv.reader(source):
+                if len(row) > max(name_column, hex_column):
+                    names.append(row[name_column].strip())
+                    hexes.append(row[hex_column].strip())
+        if hexes and not Codec.is_valid_hex_color(hexes[0]):
+            names, hexes = names[1:], hexes[1:]
+        return cls(names, Codec.decode_many(np.array(hexes)), **kwargs)
+
+    def save(self, path):
+        arrays = {"names": self.names, "colors": self.colors, "lab": self.lab}
+        if self.index is not None and self.backend == "grid":
+            arrays.update(grid_order=self.index.order, grid_starts=self.index.starts, grid_origin=self.index.origin,
+                          grid_dims=self.index.dims, grid_cell=np.float32(self.index.cell_size))
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path, backend="auto"):
+        stored = np.load(path)
+        catalog = cls.__new__(cls)
+        catalog.names, catalog.colors, catalog.lab = stored["names"], stored["colors"], stored["lab"]
+        catalog.backend = backend
+        catalog.index = None
+        if backend in ("auto", "grid") and "grid_order" in stored.files:
+            grid = LabGridIndex(catalog.lab, float(stored["grid_cell"]), stored["grid_order"], stored["grid_starts"], stored["grid_origin"], stored["grid_dims"])
+            catalog.backend = "grid"
+            catalog.index = grid
+        return catalog
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".json":
+            return cls.from_json(path, **kwargs)
+        if extension == ".csv":
+            return cls.from_csv(path, **kwargs)
+        if extension == ".npz":
+            return cls.load(path, **kwargs)
+        raise ValueError(f"Unsupported catalog format: {path}")
+
+
+_default_catalog = None
+
+
+def default_catalog():
+    # COLOR_CATALOG may point at a brand palette (.json, .csv or a saved .npz); CSS names otherwise
+    global _default_catalog
+    if _default_catalog is None:
+        path = os.environ.get("COLOR_CATALOG")
+        _default_catalog = ColorCatalog.from_file(path) if path else ColorCatalog.css()
+    return _default_catalog
@@ -0,0 +1,105 @@
+import Trace
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+
+class DominantPaletteExtractor(object):
+    # small NumPy k-means for dominant palettes: k-means++ seeding on a pixel subsample,
+    # optional warm start from the previous call's centroids (e.g. the previous camera frame)
+
+    def __init__(self, num_colors=1, sample_size=2000, max_iter=20, tol=0.5, warm_start=True, random_state=None):
+        if num_colors < 1:
+            raise ValueError(f"num_colors must be at least 1, got {num_colors!r}")
+        self.num_colors = int(num_colors)
+        self.sample_size = int(sample_size)
+        self.max_iter = int(max_iter)
+        self.tol = float(tol)
+        self.warm_start = warm_start
+        self.rng = np.random.default_rng(random_state)
+        self.centroids = None
+
+    def reset(self):
+        self.centroids = None
+
+    @staticmethod
+    def pixels_of(image):
+        pixels = np.asarray(image)
+        if pixels.ndim == 3:
+            if pixels.shape[2] < 3:
+                raise ValueError(f"Expected an RGB image, got shape {pixels.shape}")
+            pixels = pixels[..., :3].reshape(-1, 3)
+        elif pixels.ndim != 2 or pixels.shape[1] != 3:
+            raise ValueError(f"Expected an RGB image or (N, 3) pixels, got shape {pixels.shape}")
+        if len(pixels) == 0:
+            raise ValueError("Cannot extract colors from an empty image")
+        return pixels
+
+    def subsample(self, pixels):
+        if len(pixels) <= self.sample_size:
+            return pixels.astype(np.float32)
+        index = self.rng.choice(len(pixels), self.sample_size, replace=False)
+        return pixels[index].astype(np.float32)
+
+    @staticmethod
+    def squared_distances(points, centroids):
+        # |p|^2 - 2 p.c + |c|^2 keeps this a single matrix product
+        distances = (points * points).sum(axis=1)[:, None] - 2.0 * points @ centroids.T + (centroids * centroids).sum(axis=1)[None, :]
+        return np.maximum(distances, 0.0)
+
+    def seed(self, points, k):
+        centroids = np.empty((k, 3), dtype=np.float32)
+        centroids[0] = points[self.rng.integers(len(points))]
+        closest = self.squared_distances(points, centroids[:1])[:, 0]
+        for i in range(1, k):
+            total = closest.sum()
+            if total <= 0:
+                centroids[i:] = centroids[0]
+                break
+            centroids[i] = points[self.rng.choice(len(points), p=closest / total)]
+            closest = np.minimum(closest, self.squared_distances(points, centroids[i:i + 1])[:, 0])
+        return centroids
+
+    def fit(self, points, k, task=None):
+        if self.warm_start and self.centroids is not None and len(self.centroids) == k:
+            centroids = self.centroids.copy()
+        else:
+            centroids = self.seed(points, k)
+        for _ in range(self.max_iter):
+            # a Worker task may be cancelled between iterations
+            if task is not None:
+                task.check_cancelled()
+            labels = self.squared_distances(points, centroids).argmin(axis=1)
+            counts = np.bincount(labels, minlength=k)
+            sums = np.stack([np.bincount(labels, weights=points[:, c], minlength=k) for c in range(3)], axis=1)
+            updated = centroids.copy()
+            filled = counts > 0
+            updated[filled] = sums[filled] / counts[filled, None]
+            shift = np.abs(updated - centroids).max()
+            centroids = updated
+            if shift <= self.tol:
+                break
+        return centroids
+
+    def extract(self, image, task=None):
+        pixels = self.pixels_of(image)
+        if self.num_colors == 1:
+            mean = pixels.mean(axis=0)
+            self.centroids = mean[None, :].astype(np.float32)
+            return [tuple(map(int, mean))], [1.0]
+
+        points = self.subsample(pixels)
+        k = min(self.num_colors, len(points))
+        with Trace.span("kmeans", k=k, points=len(points)):
+            centroids = self.fit(points, k, task)
+        self.centroids = centroids
+
+        labels = self.squared_distances(points, centroids).argmin(axis=1)
+        shares = np.bincount(labels, minlength=k) / float(len(points))
+        order = np.argsort(-shares, kind="stable")
+        colors = [tuple(int(c) for c in np.clip(centroids[i], 0, 255)) for i in order]
+        return colors, [float(shares[i]) for i in order]
+
+    def dominant_color(self, image, task=None):
+        colors, shares = self.extract(image, task)
+        return colors[0]
@@ -0,0 +1,131 @@
+import csv
+
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# precomputed tables shared by every window: byte -> "RR" and "rr"/"RR" -> byte
+BYTE_TO_HEX = tuple("{:02X}".format(i) for i in range(256))
+HEX_PAIR_TO_INT = {}
+for _value in range(256):
+    for _pair in ("{:02X}".format(_value), "{:02x}".format(_value), "{:X}{:x}".format(_value >> 4, _value & 15), "{:x}{:X}".format(_value >> 4, _value & 15)):
+        HEX_PAIR_TO_INT[_pair] = _value
+del _value, _pair
+
+_NIBBLES = None
+_HEX_ASCII = None
+
+
+def is_valid_hex_color(hex_color):
+    try:
+        return (len(hex_color) == 7 and hex_color[0] == "#" and hex_color[1:3] in HEX_PAIR_TO_INT
+                and hex_color[3:5] in HEX_PAIR_TO_INT and hex_color[5:7] in HEX_PAIR_TO_INT)
+    except TypeError:
+        return False
+
+
+def hex_to_rgb(hex_color):
+    try:
+        if hex_color[:1] == "#":
+            hex_color = hex_color[1:]
+        if len(hex_color) == 6:
+            return (HEX_PAIR_TO_INT[hex_color[0:2]], HEX_PAIR_TO_INT[hex_color[2:4]], HEX_PAIR_TO_INT[hex_color[4:6]])
+    except (KeyError, TypeError):
+        pass
+    raise ValueError(f"Invalid hexadecimal color format: {hex_color!r}")
+
+
+def rgb_to_hex(rgb_color):
+    try:
+        r, g, b = rgb_color
+        r, g, b = int(r), int(g), int(b)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid RGB color: {rgb_color!r}")
+    if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+        raise ValueError(f"RGB channel out of range: {rgb_color!r}")
+    return "#" + BYTE_TO_HEX[r] + BYTE_TO_HEX[g] + BYTE_TO_HEX[b]
+
+
+def _tables():
+    global _NIBBLES, _HEX_ASCII
+    if _NIBBLES is None:
+        nibbles = np.full(128, -1, dtype=np.int16)
+        for i, digit in enumerate("0123456789ABCDEF"):
+            nibbles[ord(digit)] = i
+            nibbles[ord(digit.lower())] = i
+        _NIBBLES = nibbles
+        _HEX_ASCII = np.frombuffer("".join(BYTE_TO_HEX).encode("ascii"), dtype=np.uint8).reshape(256, 2)
+    return _NIBBLES, _HEX_ASCII
+
+
+def encode_many(colors):
+    colors = np.asarray(colors)
+    if colors.ndim != 2 or colors.shape[1] != 3:
+        raise ValueError(f"Expected an (N, 3) array of RGB colors, got shape {colors.shape}")
+    if colors.dtype != np.uint8:
+        if colors.size and (colors.min() < 0 or colors.max() > 255):
+            raise ValueError("RGB channels must be in the range 0-255")
+        colors = colors.astype(np.uint8)
+    _, hex_ascii = _tables()
+    encoded = np.empty((len(colors), 7), dtype=np.uint8)
+    encoded[:, 0] = ord("#")
+    encoded[:, 1:3] = hex_ascii[colors[:, 0]]
+    encoded[:, 3:5] = hex_ascii[colors[:, 1]]
+    encoded[:, 5:7] = hex_ascii[colors[:, 2]]
+    return encoded.view("S7").ravel().astype("U7")
+
+
+def _code_points(hex_colors):
+    hex_colors = np.asarray(hex_colors)
+    if hex_colors.ndim != 1:
+        hex_colors = hex_colors.reshape(-1)
+    if hex_colors.dtype.kind != "U":
+        hex_colors = hex_colors.astype("U")
+    width = hex_colors.dtype.itemsize // 4
+    if width < 7:
+        hex_colors = hex_colors.astype("U7")
+        width = 7
+    return hex_colors.view(np.uint32).reshape(len(hex_colors), width)
+
+
+def _valid_codes(codes):
+    nibbles, _ = _tables()
+    body = codes[:, 1:7]
+    ascii_body = np.where(body < 128, body, 0)
+    valid = (codes[:, 0] == ord("#")) & (nibbles[ascii_body] >= 0).all(axis=1) & (body < 128).all(axis=1)
+    if codes.shape[1] > 7:
+        valid &= (codes[:, 7:] == 0).all(axis=1)
+    return valid
+
+
+def validate_many(hex_colors):
+    return _valid_codes(_code_points(hex_colors))
+
+
+def decode_many(hex_colors):
+    codes = _code_points(hex_colors)
+    valid = _valid_codes(codes)
+    if not valid.all():
+        bad = int(np.flatnonzero(~valid)[0])
+        raise ValueError(f"Invalid hexadecimal color at index {bad}: {np.asarray(hex_colors).reshape(-1)[bad]!r}")
+    nibbles, _ = _tables()
+    values = nibbles[codes[:, 1:7]].astype(np.uint8)
+    return (values[:, 0::2] << 4) | values[:, 1::2]
+
+
+def load_hex_csv(path, column=0):
+    with open(path, newline="") as source:
+        rows = [row[column].strip() for row in csv.reader(source) if len(row) > column]
+    if rows and not is_valid_hex_color(rows[0]):
+        rows = rows[1:]
+    return decode_many(np.array(rows) if rows else np.empty(0, dtype="U7"))
+
+
+def save_hex_csv(path, colors, header="hex"):
+    encoded = encode_many(colors)
+    with open(path, "w", newline="") as target:
+        if header:
+            target.write(header + "\n")
+        if len(encoded):
+            target.write("\n".join(encoded.tolist()))
+            target.write("\n")
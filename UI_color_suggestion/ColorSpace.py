@@ -0,0 +1,224 @@
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# vectorized sRGB <-> linear <-> XYZ <-> CIELAB / OKLab / LCh conversions on (..., 3) arrays
+# sRGB values are uint8 0-255; linear, XYZ and OKLab are floats in 0-1 scale, CIELAB L is 0-100
+
+SPACES = ("srgb", "linear", "xyz", "lab", "lch", "oklab", "oklch")
+
+# D65 white point and sRGB primaries
+WHITE_D65 = (0.95047, 1.0, 1.08883)
+LINEAR_TO_XYZ = ((0.4124564, 0.3575761, 0.1804375),
+                 (0.2126729, 0.7151522, 0.0721750),
+                 (0.0193339, 0.1191920, 0.9503041))
+XYZ_TO_LINEAR = ((3.2404542, -1.5371385, -0.4985314),
+                 (-0.9692660, 1.8760108, 0.0415560),
+                 (0.0556434, -0.2040259, 1.0572252))
+LINEAR_TO_LMS = ((0.4122214708, 0.5363325363, 0.0514459929),
+                 (0.2119034982, 0.6806995451, 0.1073969566),
+                 (0.0883024619, 0.2817188376, 0.6299787005))
+LMS_TO_OKLAB = ((0.2104542553, 0.7936177850, -0.0040720468),
+                (1.9779984951, -2.4285922050, 0.4505937099),
+                (0.0259040371, 0.7827717662, -0.8086757660))
+OKLAB_TO_LMS = ((1.0, 0.3963377774, 0.2158037573),
+                (1.0, -0.1055613458, -0.0638541728),
+                (1.0, -0.0894841775, -1.2914855480))
+LMS_TO_LINEAR = ((4.0767416621, -3.3077115913, 0.2309699292),
+                 (-1.2684380046, 2.6097574011, -0.3413193965),
+                 (-0.0041960863, -0.7034186147, 1.7076147010))
+
+LINEAR_LUT_SIZE = 4096
+_decode_lut = None
+_encode_lut = None
+
+
+def _matmul(values, matrix):
+    return values @ np.asarray(matrix, dtype=np.float64).T
+
+
+def _luts():
+    global _decode_lut, _encode_lut
+    if _decode_lut is None:
+        _decode_lut = _srgb_to_linear_exact(np.arange(256) / 255.0)
+        levels = np.arange(LINEAR_LUT_SIZE) / (LINEAR_LUT_SIZE - 1.0)
+        _encode_lut = np.round(_linear_to_srgb_exact(levels) * 255.0).astype(np.uint8)
+    return _decode_lut, _encode_lut
+
+
+def _srgb_to_linear_exact(values):
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb_exact(values):
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+
+
+def srgb_to_linear(rgb):
+    rgb = np.asarray(rgb)
+    if rgb.dtype == np.uint8:
+        decode_lut, _ = _luts()
+        return decode_lut[rgb]
+    return _srgb_to_linear_exact(rgb.astype(np.float64) / 255.0)
+
+
+def linear_to_srgb(linear, use_lut=True):
+    linear = np.asarray(linear, dtype=np.float64)
+    if use_lut:
+        _, encode_lut = _luts()
+        index = np.rint(np.clip(linear, 0.0, 1.0) * (LINEAR_LUT_SIZE - 1)).astype(np.intp)
+        return encode_lut[index]
+    return np.round(_linear_to_srgb_exact(linear) * 255.0).astype(np.uint8)
+
+
+def linear_to_xyz(linear):
+    return _matmul(linear, LINEAR_TO_XYZ)
+
+
+def xyz_to_linear(xyz):
+    return _matmul(xyz, XYZ_TO_LINEAR)
+
+
+def xyz_to_lab(xyz):
+    scaled = np.asarray(xyz, dtype=np.float64) / np.asarray(WHITE_D65)
+    epsilon = 216 / 24389.0
+    kappa = 24389 / 27.0
+    f = np.where(scaled > epsilon, np.cbrt(scaled), (kappa * scaled + 16) / 116.0)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def lab_to_xyz(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    epsilon = 216 / 24389.0
+    kappa = 24389 / 27.0
+    fy = (lab[..., 0] + 16) / 116.0
+    fx = fy + lab[..., 1] / 500.0
+    fz = fy - lab[..., 2] / 200.0
+    f = np.stack([fx, fy, fz], axis=-1)
+    cubed = f ** 3
+    scaled = np.where(cubed > epsilon, cubed, (116 * f - 16) / kappa)
+    # the Y channel uses L directly below the linear segment
+    scaled[..., 1] = np.where(lab[..., 0] > kappa * epsilon, cubed[..., 1], lab[..., 0] / kappa)
+    return scaled * np.asarray(WHITE_D65)
+
+
+def linear_to_oklab(linear):
+    lms = np.cbrt(_matmul(linear, LINEAR_TO_LMS))
+    return _matmul(lms, LMS_TO_OKLAB)
+
+
+def oklab_to_linear(oklab):
+    lms = _matmul(oklab, OKLAB_TO_LMS) ** 3
+    return _matmul(lms, LMS_TO_LINEAR)
+
+
+def lab_to_lch(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = np.mod(np.degrees(np.arctan2(lab[..., 2], lab[..., 1])), 360.0)
+    return np.stack([lab[..., 0], chroma, hue], axis=-1)
+
+
+def lch_to_lab(lch):
+    lch = np.asarray(lch, dtype=np.float64)
+    hue = np.radians(lch[..., 2])
+    return np.stack([lch[..., 0], lch[..., 1] * np.cos(hue), lch[..., 1] * np.sin(hue)], axis=-1)
+
+
+def rgb_to_lab(rgb):
+    return xyz_to_lab(linear_to_xyz(srgb_to_linear(rgb)))
+
+
+def lab_to_rgb(lab, use_lut=True):
+    return linear_to_srgb(xyz_to_linear(lab_to_xyz(lab)), use_lut)
+
+
+def rgb_to_oklab(rgb):
+    return linear_to_oklab(srgb_to_linear(rgb))
+
+
+def oklab_to_rgb(oklab, use_lut=True):
+    return linear_to_srgb(oklab_to_linear(oklab), use_lut)
+
+
+def to_space(rgb, space):
+    if space == "srgb":
+        return np.asarray(rgb, dtype=np.float64)
+    if space == "linear":
+        return srgb_to_linear(rgb)
+    if space == "xyz":
+        return linear_to_xyz(srgb_to_linear(rgb))
+    if space == "lab":
+        return rgb_to_lab(rgb)
+    if space == "lch":
+        return lab_to_lch(rgb_to_lab(rgb))
+    if space == "oklab":
+        return rgb_to_oklab(rgb)
+    if space == "oklch":
+        return lab_to_lch(rgb_to_oklab(rgb))
+    raise ValueError(f"Unknown color space: {space!r}")
+
+
+def from_space(values, space, use_lut=True):
+    if space == "srgb":
+        return np.clip(np.rint(np.asarray(values, dtype=np.float64)), 0, 255).astype(np.uint8)
+    if space == "linear":
+        return linear_to_srgb(values, use_lut)
+    if space == "xyz":
+        return linear_to_srgb(xyz_to_linear(values), use_lut)
+    if space == "lab":
+        return lab_to_rgb(values, use_lut)
+    if space == "lch":
+        return lab_to_rgb(lch_to_lab(values), use_lut)
+    if space == "oklab":
+        return oklab_to_rgb(values, use_lut)
+    if space == "oklch":
+        return oklab_to_rgb(lch_to_lab(values), use_lut)
+    raise ValueError(f"Unknown color space: {space!r}")
+
+
+def lightness_scale(space):
+    # range of the lightness channel, used to express RGB-style steps in perceptual units
+    if space in ("lab", "lch"):
+        return 100.0
+    if space in ("oklab", "oklch"):
+        return 1.0
+    raise ValueError(f"Color space {space!r} has no lightness channel")
+
+
+def rectangular(space):
+    # averaging and lightness edits happen in the rectangular form of a cylindrical space
+    return {"lch": "lab", "oklch": "oklab"}.get(space, space)
+
+
+def shift_lightness(rgb_colors, offsets, space="oklab"):
+    # returns (N, k, 3) uint8: each color with its lightness moved by each offset (expressed in 0-255 RGB-style units)
+    space = rectangular(space)
+    values = to_space(np.asarray(rgb_colors).reshape(-1, 3), space)
+    scale = lightness_scale(space)
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1)
+    shifted = np.repeat(values[:, None, :], len(offsets), axis=1)
+    shifted[..., 0] = np.clip(values[:, None, 0] + offsets[None, :] / 255.0 * scale, 0.0, scale)
+    return from_space(shifted, space)
+
+
+def rotate_hue(rgb_colors, offsets, space="oklch"):
+    # returns (N, k, 3) uint8 with the LCh hue rotated by each offset (fractions of a turn, like colorsys)
+    if space not in ("lch", "oklch"):
+        raise ValueError(f"Hue rotation needs a cylindrical space, got {space!r}")
+    values = to_space(np.asarray(rgb_colors).reshape(-1, 3), space)
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1)
+    rotated = np.repeat(values[:, None, :], len(offsets), axis=1)
+    rotated[..., 2] = np.mod(values[:, None, 2] + offsets[None, :] * 360.0, 360.0)
+    return from_space(rotated, space)
+
+
+def mix(rgb_colors, space="oklab", weights=None):
+    space = rectangular(space)
+    values = to_space(np.asarray(rgb_colors).reshape(-1, 3), space)
+    mixed = np.average(values, axis=0, weights=weights)
+    return from_space(mixed[None, :], space)[0]
@@ -0,0 +1,82 @@
+import colorsys
+
+import Codec
+import ColorSpace
+
+
+class ColorEngine(object):
+    # headless color operations shared by ColorMixerApp, Suggestion and Layer
+    # errors are raised as ValueError so the Tk windows decide how to report them
+
+    is_valid_hex_color = staticmethod(Codec.is_valid_hex_color)
+    hex_to_rgb = staticmethod(Codec.hex_to_rgb)
+    rgb_to_hex = staticmethod(Codec.rgb_to_hex)
+
+    @staticmethod
+    def clamp(value):
+        return max(0, min(255, int(value)))
+
+    @staticmethod
+    def mix(color1, color2, space="srgb"):
+        if space != "srgb":
+            return tuple(int(c) for c in ColorSpace.mix([color1, color2], space))
+        r1, g1, b1 = color1
+        r2, g2, b2 = color2
+        return ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
+
+    @staticmethod
+    def subtract(color1, color2):
+        r1, g1, b1 = color1
+        r2, g2, b2 = color2
+        return (max(0, r1 - r2), max(0, g1 - g2), max(0, b1 - b2))
+
+    @staticmethod
+    def rotate_hue(rgb_color, offset, space="hsv"):
+        if space != "hsv":
+            return ColorEngine.rotate_hues(rgb_color, [offset], space)[0]
+        h, s, v = colorsys.rgb_to_hsv(*[x / 255.0 for x in rgb_color])
+        rgb = colorsys.hsv_to_rgb((h + offset) % 1.0, s, v)
+        return tuple(int(x * 255) for x in rgb)
+
+    @staticmethod
+    def rotate_hues(rgb_color, offsets, space="hsv"):
+        # space is "hsv" (matches colorsys) or a perceptual "lch"/"oklch"
+        if space == "hsv":
+            return [ColorEngine.rotate_hue(rgb_color, offset) for offset in offsets]
+        return [tuple(int(c) for c in color) for color in ColorSpace.rotate_hue([rgb_color], offsets, space)[0]]
+
+    @staticmethod
+    def complementary(rgb_color, space="hsv"):
+        return ColorEngine.rotate_hue(rgb_color, 0.5, space)
+
+    @staticmethod
+    def hue_steps(rgb_color, num_colors, step=0.1, space="hsv"):
+        return ColorEngine.rotate_hues(rgb_color, [step * i for i in range(1, num_colors + 1)], space)
+
+    @staticmethod
+    def analogous(rgb_color, num_colors, hue_step=30, space="hsv"):
+        return ColorEngine.hue_steps(rgb_color, num_colors, hue_step / 360.0, space)
+
+    @staticmethod
+    def split_complementary(rgb_color, spread=30, space="hsv"):
+        offset = spread / 360.0
+        return ColorEngine.rotate_hues(rgb_color, [0.5 - offset, 0.5 + offset], space)
+
+    @staticmethod
+    def adjust_intensity(rgb_color, change):
+        return tuple(ColorEngine.clamp(c + change) for c in rgb_color)
+
+    @staticmethod
+    def intensity_ladder(rgb_color, changes, space="srgb"):
+        # srgb adds a flat offset per channel; lab/oklab move only the perceptual lightness by the same amount
+        if space == "srgb":
+            return [ColorEngine.adjust_intensity(rgb_color, change) for change in changes]
+        return [tuple(int(c) for c in color) for color in ColorSpace.shift_lightness([rgb_color], changes, space)[0]]
+
+    @staticmethod
+    def tints(rgb_color, num_colors, step=20, space="srgb"):
+        return ColorEngine.intensity_ladder(rgb_color, [step * i for i in range(1, num_colors + 1)], space)
+
+    @staticmethod
+    def shades(rgb_color, num_colors, step=20, space="srgb"):
+        return ColorEngine.intensity_ladder(rgb_color, [-step * i for i in range(1, num_colors + 1)], space)
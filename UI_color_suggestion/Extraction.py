@@ -0,0 +1,137 @@
+import Trace
+from LazyImport import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+
+
+class ImageColorExtractor(object):
+    # headless dominant color extraction shared by ColorMixerApp and the batch pipeline
+
+    METHODS = ("common", "histogram", "mean")
+    # above this many bins a dense bincount costs more memory than sorting the packed keys
+    MAX_BINCOUNT_BITS = 6
+
+    # decoders can scale by these factors while decoding (JPEG via DCT scaling), far cheaper than a full decode
+    REDUCTION_FACTORS = (8, 4, 2)
+
+    def __init__(self, sample_size=50, method="common", bits=8, reduced_decode=True):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown extraction method: {method!r}")
+        if not 1 <= int(bits) <= 8:
+            raise ValueError(f"Bits per channel must be between 1 and 8, got {bits!r}")
+        self.sample_size = int(sample_size)
+        self.method = method
+        self.bits = int(bits)
+        self.reduced_decode = reduced_decode
+
+    # EXIF orientations that turn the stored image a quarter turn, swapping its width and height
+    TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+    @staticmethod
+    def read_header(image_path):
+        # (format, (width, height)) from the file header only, or None when PIL is missing or can't tell;
+        # the size is the upright one load_image returns, after the EXIF orientation
+        try:
+            with Image.open(image_path) as image:
+                width, height = image.size
+                if image.getexif().get(0x0112) in ImageColorExtractor.TRANSPOSED_ORIENTATIONS:
+                    width, height = height, width
+                return image.format, (width, height)
+        except (ImportError, OSError):
+            return None
+
+    @staticmethod
+    def reduction_factor(width, height, min_size):
+        # largest factor that still leaves both sides at least min_size pixels
+        for factor in ImageColorExtractor.REDUCTION_FACTORS:
+            if min(width, height) // factor >= min_size:
+                return factor
+        return 1
+
+    @staticmethod
+    def load_image(image_path, min_size=None):
+        # with min_size, decode at a reduced resolution that keeps both sides at least min_size pixels;
+        # every path applies the EXIF orientation, as cv2.imread does by default
+        header = ImageColorExtractor.read_header(image_path) if min_size else None
+        factor = ImageColorExtractor.reduction_factor(*header[1], min_size) if header else 1
+        if factor > 1 and header[0] == "JPEG":
+            with Trace.span("PIL.draft", factor=factor):
+                with Image.open(image_path) as image:
+                    image.draft("RGB", (min_size, min_size))
+                    return np.asarray(ImageOps.exif_transpose(image).convert("RGB"))
+        flags = getattr(cv2, f"IMREAD_REDUCED_COLOR_{factor}") if factor > 1 else cv2.IMREAD_COLOR
+        with Trace.span("cv2.imread", factor=factor):
+            image = cv2.imread(image_path, flags)
+        if image is None:
+            raise ValueError(f"Could not decode image: {image_path}")
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    def downsample(self, image):
+        height, width = image.shape[:2]
+        if height * width <= self.sample_size * self.sample_size:
+            return image
+        with Trace.span("cv2.resize"):
+            return cv2.resize(image, (self.sample_size, self.sample_size), interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def pixels_of(image):
+        pixels = np.asarray(image)
+        if pixels.ndim != 3 or pixels.shape[2] < 3:
+            raise ValueError(f"Expected an RGB image, got shape {pixels.shape}")
+        return pixels[..., :3].reshape(-1, 3)
+
+    @staticmethod
+    def most_common_color(image):
+        pixels = ImageColorExtractor.pixels_of(image)
+        colors, counts = np.unique(pixels, axis=0, return_counts=True)
+        return tuple(map(int, colors[counts.argmax()]))
+
+    @staticmethod
+    def pack_colors(pixels, bits=8):
+        shift = 8 - bits
+        pixels = pixels.astype(np.uint32) >> shift
+        return (pixels[:, 0] << (2 * bits)) | (pixels[:, 1] << bits) | pixels[:, 2]
+
+    @staticmethod
+    def histogram_color(image, bits=8):
+        pixels = ImageColorExtractor.pixels_of(image)
+        keys = ImageColorExtractor.pack_colors(pixels, bits)
+        if bits <= ImageColorExtractor.MAX_BINCOUNT_BITS:
+            counts = np.bincount(keys, minlength=1 << (3 * bits))
+            winner = counts.argmax()
+        else:
+            unique_keys, counts = np.unique(keys, return_counts=True)
+            winner = unique_keys[counts.argmax()]
+        if bits == 8:
+            return (int(winner >> 16), int((winner >> 8) & 0xFF), int(winner & 0xFF))
+        # report the average of the pixels that fell into the winning bin rather than the bin corner
+        return tuple(map(int, pixels[keys == winner].mean(axis=0).round()))
+
+    @staticmethod
+    def mean_color(image):
+        pixels = ImageColorExtractor.pixels_of(image)
+        return tuple(map(int, pixels.mean(axis=0)))
+
+    def dominant_color(self, image):
+        small_image = self.downsample(image)
+        with Trace.span(f"extract.{self.method}"):
+            if self.method == "mean":
+                return self.mean_color(small_image)
+            if self.method == "histogram":
+                return self.histogram_color(small_image, self.bits)
+            return self.most_common_color(small_image)
+
+    @property
+    def decode_size(self):
+        # min_size handed to load_image; None decodes at full resolution
+        return self.sample_size if self.reduced_decode else None
+
+    def cache_params(self):
+        # everything that changes extract()'s result, for ResultCache keys
+        return {"method": self.method, "sample_size": self.sample_size, "bits": self.bits, "decode_size": self.decode_size}
+
+    def extract(self, image_path):
+        return self.dominant_color(self.load_image(image_path, self.decode_size))
@@ -0,0 +1,101 @@
+import json
+
+import Codec
+import ColorSpace
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# N-step tint / shade / tone ladders evenly spaced in OKLCh lightness, computed for whole palettes at once
+# out-of-gamut steps keep their lightness and hue and give up chroma instead of clipping each channel
+
+KINDS = ("tint", "shade", "tone", "scale")
+LIGHTEST = 0.97
+DARKEST = 0.20
+
+# design-token steps and the OKLab lightness each one targets
+TOKEN_STEPS = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900)
+TOKEN_LIGHTNESS = (0.97, 0.93, 0.87, 0.79, 0.71, 0.63, 0.54, 0.45, 0.36, 0.27)
+
+GAMUT_ITERATIONS = 16
+
+
+def in_gamut(oklch, tolerance=1e-4):
+    linear = ColorSpace.oklab_to_linear(ColorSpace.lch_to_lab(oklch))
+    return ((linear >= -tolerance) & (linear <= 1.0 + tolerance)).all(axis=-1)
+
+
+def fit_gamut(oklch):
+    # largest chroma (at most the requested one) that stays inside sRGB, by vectorized bisection
+    oklch = np.array(oklch, dtype=np.float64)
+    outside = ~in_gamut(oklch)
+    if not outside.any():
+        return oklch
+    # only the out-of-gamut colors take part in the search
+    target = oklch[outside]
+    low = np.zeros(len(target))
+    high = np.ones(len(target))
+    probe = target.copy()
+    for _ in range(GAMUT_ITERATIONS):
+        middle = (low + high) / 2.0
+        probe[:, 1] = target[:, 1] * middle
+        ok = in_gamut(probe)
+        low = np.where(ok, middle, low)
+        high = np.where(ok, high, middle)
+    target[:, 1] *= low
+    oklch[outside] = target
+    return oklch
+
+
+def ladder(rgb_colors, steps, kind="scale", lightest=LIGHTEST, darkest=DARKEST):
+    # (N, 3) base colors -> (N, steps, 3) uint8
+    # tint: base to lightest, shade: base to darkest, tone: base to the gray of equal lightness,
+    # scale: lightest to darkest through the base hue with chroma following the base
+    if kind not in KINDS:
+        raise ValueError(f"Unknown ladder kind: {kind!r}")
+    if steps < 2:
+        raise ValueError(f"A ladder needs at least 2 steps, got {steps!r}")
+    base = ColorSpace.to_space(np.asarray(rgb_colors, dtype=np.uint8).reshape(-1, 3), "oklch")
+    t = np.linspace(0.0, 1.0, steps)
+    values = np.repeat(base[:, None, :], steps, axis=1)
+    if kind == "tint":
+        # bases already lighter than `lightest` run on to white, so a tint never darkens
+        target = np.where(base[:, 0] < lightest, lightest, 1.0)
+        values[..., 0] = base[:, None, 0] + (target - base[:, 0])[:, None] * t
+        values[..., 1] = base[:, None, 1] * (1.0 - t)
+    elif kind == "shade":
+        # and bases darker than `darkest` run on to black, so a shade never lightens
+        target = np.where(base[:, 0] > darkest, darkest, 0.0)
+        values[..., 0] = base[:, None, 0] + (target - base[:, 0])[:, None] * t
+    elif kind == "tone":
+        values[..., 1] = base[:, None, 1] * (1.0 - t)
+    else:
+        values[..., 0] = lightest + (darkest - lightest) * t
+    return ColorSpace.from_space(fit_gamut(values), "oklch")
+
+
+def token_scale(rgb_colors, steps=TOKEN_STEPS, lightness=TOKEN_LIGHTNESS, anchor=True):
+    # (N, 3) -> (N, len(steps), 3); with anchor the step closest to each base color's lightness is the base itself
+    rgb_colors = np.asarray(rgb_colors, dtype=np.uint8).reshape(-1, 3)
+    base = ColorSpace.to_space(rgb_colors, "oklch")
+    values = np.repeat(base[:, None, :], len(steps), axis=1)
+    values[..., 0] = np.asarray(lightness)[None, :]
+    scale = ColorSpace.from_space(fit_gamut(values), "oklch")
+    if anchor:
+        nearest = np.abs(base[:, None, 0] - np.asarray(lightness)[None, :]).argmin(axis=1)
+        scale[np.arange(len(scale)), nearest] = rgb_colors
+    return scale
+
+
+def export_tokens(names, scales, fmt="json", steps=TOKEN_STEPS):
+    # scales: (N, len(steps), 3) from token_scale; returns the text of a JSON token file or CSS custom properties
+    hexes = [Codec.encode_many(scale) for scale in np.asarray(scales)]
+    if fmt == "json":
+        return json.dumps({name: {str(step): str(value) for step, value in zip(steps, row)} for name, row in zip(names, hexes)}, indent=2)
+    if fmt == "css":
+        lines = [":root {"]
+        for name, row in zip(names, hexes):
+            lines.extend(f"  --{name}-{step}: {value};" for step, value in zip(steps, row))
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+    raise ValueError(f"Unknown token format: {fmt!r}")
@@ -0,0 +1,242 @@
+import argparse
+import os
+import sys
+
+import Codec
+import ColorSpace
+import PaletteIO
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# each palette is indexed by an order-invariant feature vector:
+#   its Lab colors sorted by lightness and resampled to SLOTS entries (so 3- and 7-color palettes compare)
+#   plus a chroma-weighted hue histogram, so two palettes with the same hues in any order land close together
+SLOTS = 5
+HUE_BINS = 12
+LAB_SCALE = 1.0 / 100.0
+HUE_WEIGHT = 0.5
+# library rows compared against the queries per matrix product; bounds the temporary distance matrix
+QUERY_CHUNK = 1 << 16
+
+
+def palette_features(palettes, slots=SLOTS, hue_bins=HUE_BINS):
+    # (N, k, 3) uint8 palettes of one size -> (N, 3 * slots + hue_bins) float32
+    palettes = np.asarray(palettes, dtype=np.uint8)
+    count, size = palettes.shape[:2]
+    lab = ColorSpace.rgb_to_lab(palettes.reshape(-1, 3)).reshape(count, size, 3)
+    order = np.argsort(lab[..., 0], axis=1, kind="stable")
+    ordered = np.take_along_axis(lab, order[..., None], axis=1)
+    positions = np.round(np.linspace(0, size - 1, slots)).astype(np.intp)
+    centroids = ordered[:, positions].reshape(count, -1) * LAB_SCALE
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    bins = (np.floor((np.arctan2(lab[..., 2], lab[..., 1]) + np.pi) / (2 * np.pi) * hue_bins).astype(np.intp)) % hue_bins
+    keys = np.arange(count)[:, None] * hue_bins + bins
+    histogram = np.bincount(keys.ravel(), weights=chroma.ravel(), minlength=count * hue_bins).reshape(count, hue_bins)
+    # achromatic palettes keep an all-zero histogram
+    histogram /= np.maximum(histogram.sum(axis=1, keepdims=True), 1e-9)
+    return np.concatenate([centroids, histogram * HUE_WEIGHT], axis=1).astype(np.float32)
+
+
+def _packed_features(packed, chunk=QUERY_CHUNK * 4):
+    # features for a PackedPalettes file, vectorized per palette size so mixed-size libraries stay batched
+    features = np.empty((len(packed), 3 * SLOTS + HUE_BINS), dtype=np.float32)
+    uniform = packed.uniform()
+    if uniform is not None:
+        for start in range(0, len(packed), chunk):
+            features[start:start + chunk] = palette_features(uniform[start:start + chunk])
+        return features
+    sizes = packed.sizes.astype(np.int64)
+    starts = np.asarray(packed.palette_offsets[:-1], dtype=np.int64)
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        for start in range(0, len(rows), chunk):
+            group = rows[start:start + chunk]
+            colors = packed.colors[starts[group][:, None] + np.arange(size)]
+            features[group] = palette_features(colors)
+    return features
+
+
+def _query_features(palettes):
+    # list of hex lists or (k, 3) arrays -> (Q, dims) features
+    palettes = [PaletteIO.as_palette("", colors)[1] for colors in palettes]
+    if any(not len(colors) for colors in palettes):
+        raise ValueError("Cannot search with an empty palette")
+    features = np.empty((len(palettes), 3 * SLOTS + HUE_BINS), dtype=np.float32)
+    sizes = np.array([len(colors) for colors in palettes])
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        features[rows] = palette_features(np.stack([palettes[i] for i in rows]))
+    return features
+
+
+class PaletteLibrary(object):
+    # a directory of append-only arrays, all memory-mapped: colors (uint8 RGB rows), palette end offsets,
+    # UTF-8 names with their end offsets, and one float32 feature row per palette; storing palettes appends
+    # to each file, so its cost follows the new palettes and not the library size. The offsets files are
+    # written last and decide how many palettes exist, so an interrupted append leaves the library readable.
+    # A query scores every palette with one matrix product per chunk of library rows.
+
+    FILES = ("colors.u8", "names.utf8", "features.f32", "offsets.u64", "name_offsets.u64")
+    DIMS = 3 * SLOTS + HUE_BINS
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.colors = self.offsets = self.names = self.name_offsets = self.features = None
+        self.norms = None
+        if os.path.isdir(path):
+            self.open()
+
+    def __len__(self):
+        return self.count
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _map(self, name, dtype, columns=None):
+        size = os.path.getsize(self._file(name)) if os.path.exists(self._file(name)) else 0
+        row = np.dtype(dtype).itemsize * (columns or 1)
+        rows = size // row
+        if not rows:
+            return np.empty((0, columns) if columns else 0, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows, columns) if columns else (rows,))
+
+    def open(self):
+        self.close()
+        self.offsets = self._map("offsets.u64", "<u8")
+        self.name_offsets = self._map("name_offsets.u64", "<u8")
+        self.features = self._map("features.f32", "<f4", self.DIMS)
+        self.colors = self._map("colors.u8", np.uint8, 3)
+        self.names = self._map("names.utf8", np.uint8)
+        self.count = min(len(self.offsets), len(self.name_offsets), len(self.features))
+        return self
+
+    def close(self):
+        # drops every map, so the files can be appended to, replaced or deleted on any platform
+        self.colors = self.offsets = self.names = self.name_offsets = self.features = None
+        self.norms = None
+        self.count = 0
+
+    def name(self, index):
+        start = int(self.name_offsets[index - 1]) if index else 0
+        return self.names[start:int(self.name_offsets[index])].tobytes().decode("utf-8")
+
+    def palette_colors(self, index):
+        start = int(self.offsets[index - 1]) if index else 0
+        return self.colors[start:int(self.offsets[index])]
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError(f"Palette index {index} out of range for {self.count} palettes")
+        index %= self.count
+        return self.name(index), self.palette_colors(index)
+
+    def add(self, palettes):
+        # appends (name, colors) pairs, or a whole PaletteIO.PackedPalettes file in one batch
+        if isinstance(palettes, PaletteIO.PackedPalettes):
+            name_bytes = np.asarray(palettes.strings)
+            name_sizes = np.diff(np.asarray(palettes.name_offsets, dtype=np.uint64))
+            sizes = palettes.sizes.astype(np.uint64)
+            colors = np.asarray(palettes.colors)
+            features = _packed_features(palettes)
+        else:
+            palettes = [PaletteIO.as_palette(name, colors) for name, colors in palettes]
+            names = [name.encode("utf-8") for name, _ in palettes]
+            name_bytes = np.frombuffer(b"".join(names), dtype=np.uint8)
+            name_sizes = np.array([len(name) for name in names], dtype=np.uint64)
+            sizes = np.array([len(colors) for _, colors in palettes], dtype=np.uint64)
+            colors = np.concatenate([colors for _, colors in palettes]) if palettes else np.empty((0, 3), np.uint8)
+            features = _query_features([colors for _, colors in palettes]) if palettes else None
+        if not len(sizes):
+            return self
+        os.makedirs(self.path, exist_ok=True)
+        count = self.count
+        color_end = int(self.offsets[count - 1]) if count else 0
+        name_end = int(self.name_offsets[count - 1]) if count else 0
+        self.close()
+        # bytes past the last committed palette belong to an interrupted append and are overwritten
+        sections = [("colors.u8", color_end * 3, np.ascontiguousarray(colors, dtype=np.uint8)),
+                    ("names.utf8", name_end, np.ascontiguousarray(name_bytes, dtype=np.uint8)),
+                    ("features.f32", count * self.DIMS * 4, np.ascontiguousarray(features, dtype="<f4")),
+                    ("offsets.u64", count * 8, (color_end + np.cumsum(sizes)).astype("<u8")),
+                    ("name_offsets.u64", count * 8, (name_end + np.cumsum(name_sizes)).astype("<u8"))]
+        for name, position, values in sections:
+            with open(self._file(name), "r+b" if os.path.exists(self._file(name)) else "wb") as stream:
+                stream.truncate(position)
+                stream.seek(position)
+                stream.write(values.tobytes())
+        return self.open()
+
+    def query(self, palettes, k=10):
+        # batched top-k: (Q, k) squared feature distances and library indices, nearest first
+        if not len(self):
+            raise ValueError("The palette library is empty")
+        queries = _query_features(palettes)
+        k = min(k, len(self))
+        if self.norms is None:
+            self.norms = np.einsum("ij,ij->i", self.features, self.features)
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        best_distances = np.full((len(queries), 0), np.inf, dtype=np.float32)
+        best_indices = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self), QUERY_CHUNK):
+            block = np.asarray(self.features[start:start + QUERY_CHUNK])
+            distances = query_norms[:, None] + self.norms[None, start:start + len(block)] - 2.0 * (queries @ block.T)
+            take = min(k, distances.shape[1])
+            nearest = np.argpartition(distances, take - 1, axis=1)[:, :take]
+            best_distances = np.concatenate([best_distances, np.take_along_axis(distances, nearest, axis=1)], axis=1)
+            best_indices = np.concatenate([best_indices, nearest + start], axis=1)
+            if best_distances.shape[1] > k:
+                keep = np.argpartition(best_distances, k - 1, axis=1)[:, :k]
+                best_distances = np.take_along_axis(best_distances, keep, axis=1)
+                best_indices = np.take_along_axis(best_indices, keep, axis=1)
+        order = np.argsort(best_distances, axis=1, kind="stable")
+        return np.maximum(np.take_along_axis(best_distances, order, axis=1), 0.0), np.take_along_axis(best_indices, order, axis=1)
+
+    def similar(self, colors, k=10):
+        # [(name, hex colors, distance)] for the palettes most like one palette
+        distances, indices = self.query([colors], k)
+        results = []
+        for distance, index in zip(distances[0], indices[0]):
+            name, palette = self[int(index)]
+            results.append((name, [str(value) for value in Codec.encode_many(palette)], float(np.sqrt(distance))))
+        return results
+
+
+_default_library = None
+
+
+def default_library():
+    # COLOR_LIBRARY may point at a shared library directory; one in the home directory otherwise
+    global _default_library
+    if _default_library is None:
+        path = os.environ.get("COLOR_LIBRARY") or os.path.join(os.path.expanduser("~"), ".color_palettes")
+        _default_library = PaletteLibrary(path)
+    return _default_library
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or search a palette library.")
+    parser.add_argument("library", help="library directory (created on the first --add)")
+    parser.add_argument("--add", nargs="+", default=[], metavar="FILE", help="palette files (JSON, GPL, ASE, CSS, CPAL) to append")
+    parser.add_argument("-q", "--query", nargs="+", default=None, metavar="HEX", help="colors of the palette to search for")
+    parser.add_argument("-k", "--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        library = PaletteLibrary(args.library)
+        for path in args.add:
+            library.add(PaletteIO.load_palettes(path))
+        if args.add:
+            print(f"{len(library)} palettes in {args.library}")
+        if args.query:
+            for name, colors, distance in library.similar(args.query, args.top):
+                print(f"{distance:8.4f}  {name}  {' '.join(colors)}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
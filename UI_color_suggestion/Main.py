@@ -1,4 +1,7 @@
+import os
 import tkinter as tk
+from tkinter import filedialog, messagebox
+import Trace
 from Module import ColorMixerApp, Layer, Suggestion
 
 class Main:
@@ -19,6 +22,20 @@ class Main:
         self.Layer_button.place(anchor="s", relx=0.5, rely=0.5, x=0, y=0)
         self.Suggestion_button.place(anchor="s", relx=0.5, rely=0.7, x=0, y=0)
 
+        # timing instrumentation, also switchable with COLOR_TRACE=1 (and COLOR_TRACE_OVERLAY=1 for the overlay)
+        self.trace_overlay = None
+        self.trace_enabled = tk.BooleanVar(value=Trace.tracer.enabled)
+        menu = tk.Menu(root)
+        debug_menu = tk.Menu(menu, tearoff=0)
+        debug_menu.add_checkbutton(label="Record Timings", variable=self.trace_enabled, command=self.toggle_trace)
+        debug_menu.add_command(label="Show Timing Overlay", command=self.show_trace_overlay)
+        debug_menu.add_command(label="Export Trace...", command=self.export_trace)
+        debug_menu.add_command(label="Clear Trace", command=Trace.tracer.clear)
+        menu.add_cascade(label="Debug", menu=debug_menu)
+        root.config(menu=menu)
+        if Trace.tracer.enabled and os.environ.get("COLOR_TRACE_OVERLAY", "") not in ("", "0"):
+            self.show_trace_overlay()
+
     def open_ColorMixerApp(self):
         try:
             new_window = tk.Toplevel(self.root)
@@ -26,6 +43,27 @@ class Main:
         except Exception as e:
             print(f"Failed to open ColorMixerApp: {e}")
 
+    def toggle_trace(self):
+        Trace.tracer.enabled = self.trace_enabled.get()
+
+    def show_trace_overlay(self):
+        if self.trace_overlay is not None and self.trace_overlay.window.winfo_exists():
+            self.trace_overlay.window.lift()
+            return
+        if not Trace.tracer.enabled:
+            self.trace_enabled.set(True)
+            self.toggle_trace()
+        self.trace_overlay = Trace.TraceOverlay(self.root)
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")])
+        if path:
+            try:
+                events = Trace.tracer.export(path)
+                messagebox.showinfo("Trace Exported", f"Wrote {events} events to {path}")
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not write trace: {e}")
+
     def open_Layer(self):
         new_window = tk.Toplevel(self.root)
         app = Layer(new_window)
@@ -1,13 +1,32 @@
 import tkinter as tk
-from tkinter import colorchooser, filedialog, simpledialog, messagebox, StringVar
-from PIL import Image
-import cv2
-import numpy as np
-from sklearn.cluster import KMeans
-import colorsys
-import re
+from tkinter import colorchooser, filedialog, simpledialog, messagebox, StringVar, ttk
+import os
 import imghdr
+import json
 from abc import ABC, abstractmethod
+from LazyImport import lazy_import
+import Codec
+from Engine import ColorEngine
+from Extraction import ImageColorExtractor
+from Clustering import DominantPaletteExtractor
+from Camera import CameraSession
+from Worker import TaskCancelled, TaskRunner
+from Cache import ResultCache
+from Catalog import default_catalog
+from Library import default_library
+from Optimizer import PaletteOptimizer
+from Quantize import PaletteQuantizer
+from Regions import RegionColorExtractor
+from ViewModel import PaletteView
+import Ladder
+import PaletteIO
+import Scoring
+import Trace
+
+# heavy dependencies load on first use so the launcher window comes up without them
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
 
 
 
@@ -43,6 +62,91 @@ class Hex(ABC):
     def rgb_to_hex(self, rgb_color):
         pass
 
+class PaletteFiles(ABC):
+    # save / load for windows that keep their palette in self.colors; subclasses decide how loaded colors fill the slots
+    palette_filetypes = [("JSON palettes", "*.json"), ("GIMP palette", "*.gpl"), ("Adobe Swatch Exchange", "*.ase"),
+                         ("CSS custom properties", "*.css"), ("Packed palette library", "*.cpal")]
+    # matches listed by Similar, searched in the library from Library.default_library
+    similar_count = 8
+
+    def save_palette(self):
+        try:
+            colors = [color for color in self.colors if self.is_valid_hex_color(color)]
+            if not colors:
+                messagebox.showerror("Error", "There are no colors to save")
+                return
+            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=self.palette_filetypes)
+            if path:
+                name = os.path.splitext(os.path.basename(path))[0]
+                PaletteIO.save_palettes(path, [(name, colors)])
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving palette: {e}")
+
+    def load_palette(self):
+        try:
+            path = filedialog.askopenfilename(filetypes=[("Palette files", "*.json *.gpl *.ase *.css *.cpal")] + self.palette_filetypes)
+            if not path:
+                return
+            palettes = PaletteIO.load_palettes(path)
+            if not len(palettes):
+                messagebox.showerror("Error", "The file holds no palettes")
+                return
+            index = 0
+            if len(palettes) > 1:
+                index = simpledialog.askinteger("Load Palette", f"The file holds {len(palettes)} palettes. Load which one?",
+                                                initialvalue=1, minvalue=1, maxvalue=len(palettes))
+                if index is None:
+                    return
+                index -= 1
+            _, colors = palettes[index]
+            self.apply_palette(Codec.encode_many(colors))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading palette: {e}")
+
+    def store_palette(self):
+        try:
+            colors = [color for color in self.colors if self.is_valid_hex_color(color)]
+            if not colors:
+                messagebox.showerror("Error", "There are no colors to store")
+                return
+            name = simpledialog.askstring("Store Palette", "Palette name:", initialvalue=f"palette {len(default_library()) + 1}")
+            if name:
+                with Trace.span("Library.add"):
+                    default_library().add([(name, colors)])
+        except Exception as e:
+            messagebox.showerror("Error", f"Error storing palette: {e}")
+
+    def similar_palettes(self):
+        try:
+            colors = [color for color in self.colors if self.is_valid_hex_color(color)]
+            library = default_library()
+            if not colors:
+                messagebox.showerror("Error", "Choose some colors first")
+                return
+            if not len(library):
+                messagebox.showerror("Error", f"The palette library at {library.path} is empty. Store a palette first.")
+                return
+            with Trace.span("Library.similar", size=len(library)):
+                matches = library.similar(colors, self.similar_count)
+            popup = tk.Toplevel(self.root)
+            popup.title("Similar palettes")
+            for name, hex_colors, distance in matches:
+                row = tk.Frame(popup)
+                row.pack(fill="x", padx=5, pady=2)
+                canvas = tk.Canvas(row, width=30 * len(hex_colors), height=24, highlightthickness=0, cursor="hand2")
+                canvas.pack(side="left")
+                for i, hex_color in enumerate(hex_colors):
+                    canvas.create_rectangle(i * 30, 0, (i + 1) * 30, 24, fill=hex_color, outline="")
+                canvas.bind("<Button-1>", lambda event, value=hex_colors: self.apply_palette(value))
+                tk.Label(row, text=f"{name} ({distance:.2f})").pack(side="left", padx=5)
+            tk.Label(popup, text="Click a palette to load it").pack()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error searching the palette library: {e}")
+
+    @abstractmethod
+    def apply_palette(self, hex_colors):
+        pass
+
 class UI(object):
     def __init__(self, root, color1, color2, camera, color1_label, color2_label, color3_label, color_button, random_color_button, upload_button, camera_button, reset_button, add_button, subtract_button, manual_input_button, color_option, color1_radio, result_label):
         self.root = root
@@ -112,6 +216,13 @@ class UI(object):
 
 
 class ColorMixerApp(UI,Hex):
+    most_common_sample_size = 200
+    most_common_bits = 5
+    # "srgb" keeps the classic channel average; "oklab" or "lab" mix perceptually
+    mix_space = "srgb"
+    # shared by every mixer window; set COLOR_CACHE_DIR to keep results between sessions
+    result_cache = ResultCache(cache_dir=os.environ.get("COLOR_CACHE_DIR") or None)
+
     def __init__(self, root,add_used = False,subtract_used = False):
         super().__init__(
             root=root,
@@ -135,6 +246,25 @@ class ColorMixerApp(UI,Hex):
         )
         self.add_used =add_used
         self.subtract_used =subtract_used
+        self.palette_extractors = {}
+        self.camera_target = None
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.tasks = TaskRunner(root, on_busy_change=self.show_busy)
+        # camera frames and uploads only touch Tk when a swatch actually changes
+        self.swatch_view = PaletteView(root, [self.color1_label, self.color2_label], ["Color 1", "Color 2"])
+        self.progress = ttk.Progressbar(root, mode="indeterminate")
+        self.cancel_button = tk.Button(root, text="Cancel", command=self.tasks.cancel_all)
+        self.progress.grid(row=5, column=0, sticky="ew")
+        self.cancel_button.grid(row=5, column=2, sticky="nsew")
+        self.progress.grid_remove()
+        self.cancel_button.grid_remove()
+
+        menu = tk.Menu(root)
+        tools_menu = tk.Menu(menu, tearoff=0)
+        tools_menu.add_command(label="Pick Regions...", command=self.pick_regions)
+        menu.add_cascade(label="Tools", menu=tools_menu)
+        root.config(menu=menu)
 
     def import_colors(self):
         try:
@@ -144,10 +274,10 @@ class ColorMixerApp(UI,Hex):
                 hex_color = color[1]  
                 if selected_color == "color1":
                     self.color1 = color[0]  
-                    self.color1_label.config(bg=hex_color, text=hex_color)  
+                    self.swatch_view.set(0, hex_color)
                 elif selected_color == "color2":
                     self.color2 = color[0]
-                    self.color2_label.config(bg=hex_color, text=hex_color)
+                    self.swatch_view.set(1, hex_color)
             self.reset_add_subtract_flags()
         except Exception as e:
             print(f"Error occurred: {e}")
@@ -161,10 +291,10 @@ class ColorMixerApp(UI,Hex):
                     rgb_color = self.hex_to_rgb(color_input)
                     if selected_color == "color1":
                         self.color1 = rgb_color
-                        self.color1_label.config(bg=color_input, text=color_input)
+                        self.swatch_view.set(0, color_input)
                     elif selected_color == "color2":
                         self.color2 = rgb_color
-                        self.color2_label.config(bg=color_input, text=color_input)
+                        self.swatch_view.set(1, color_input)
                 else:
                     raise ValueError("Invalid color format. Please use the #RRGGBB format.")
                 self.reset_add_subtract_flags()
@@ -176,25 +306,34 @@ class ColorMixerApp(UI,Hex):
 
     def random_color(self):
         random_color = (np.random.randint(0, 256), np.random.randint(0, 256), np.random.randint(0, 256))
-        hex_color = "#{:02X}{:02X}{:02X}".format(*random_color)
+        hex_color = self.rgb_to_hex(random_color)
         selected_color = self.color_option.get()
         if selected_color == "color1":
             self.color1 = random_color
-            self.color1_label.config(bg=hex_color, text=hex_color)
+            self.swatch_view.set(0, hex_color)
         elif selected_color == "color2":
             self.color2 = random_color
-            self.color2_label.config(bg=hex_color, text=hex_color)
+            self.swatch_view.set(1, hex_color)
         self.reset_add_subtract_flags()
 
-    def get_most_common_color(self, image_path):
-        image = cv2.imread(image_path)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        small_image = cv2.resize(image_rgb, (50, 50))
-        pixels = small_image.reshape(-1, 3)
-        colors, counts = np.unique(pixels, axis=0, return_counts=True)
-        most_common_color = colors[counts.argmax()]
-        most_common_color = tuple(map(int, most_common_color))
-        return most_common_color
+    def get_most_common_color(self, image_path, task=None):
+        extractor = ImageColorExtractor(sample_size=self.most_common_sample_size, method="histogram", bits=self.most_common_bits)
+        params = extractor.cache_params()
+
+        def compute():
+            Trace.count("cache.miss")
+            # decode and extraction are separate stages so a cancelled upload stops before the second one
+            image = extractor.load_image(image_path, extractor.decode_size)
+            if task is not None:
+                task.report(0.5)
+                task.check_cancelled()
+            return list(extractor.dominant_color(image))
+
+        with Trace.span("ColorMixerApp.get_most_common_color"):
+            color = self.result_cache.get_or_compute(image_path, params, compute)
+        if task is not None:
+            task.report(1.0)
+        return tuple(color)
 
     def upload_image(self):
         try:
@@ -202,81 +341,127 @@ class ColorMixerApp(UI,Hex):
             file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.bmp")])
             if file_path:
                 if imghdr.what(file_path) is not None:
-                    color = self.get_most_common_color(file_path)
-                    hex_color = "#{:02X}{:02X}{:02X}".format(*color)
-                    if selected_color == "color1":
-                        self.color1 = color
-                        self.color1_label.config(bg=hex_color, text=hex_color)
-                    elif selected_color == "color2":
-                        self.color2 = color
-                        self.color2_label.config(bg=hex_color, text=hex_color)
+                    # decode and extraction run on the worker pool so the window stays responsive
+                    self.tasks.submit(self.get_most_common_color, file_path, name="upload_image",
+                                      on_done=lambda color: self.set_color(selected_color, color),
+                                      on_error=self.upload_failed, on_progress=self.show_progress, pass_task=True)
                 else:
                     # when the upload not image
                     raise ValueError("The selected file is not a supported image format.")
-                self.reset_add_subtract_flags()
         except ValueError as ve:
             messagebox.showerror("Invalid File", str(ve))
         except Exception as e:
-            messagebox.showerror("Error", "An unexpected error occurred while uploading the image: " + str(e))
+            self.upload_failed(e)
+
+    def upload_failed(self, error):
+        messagebox.showerror("Error", "An unexpected error occurred while uploading the image: " + str(error))
+
+    def set_color(self, selected_color, color):
+        with Trace.span("tk.set_color"):
+            hex_color = self.rgb_to_hex(color)
+            if selected_color == "color1":
+                self.color1 = color
+                self.swatch_view.set(0, hex_color)
+            elif selected_color == "color2":
+                self.color2 = color
+                self.swatch_view.set(1, hex_color)
+            self.reset_add_subtract_flags()
+
+    def pick_regions(self):
+        file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.bmp")])
+        if file_path:
+            selected_color = self.color_option.get()
+            self.tasks.submit(RegionColorExtractor().load, file_path, name="pick_regions",
+                              on_done=lambda extractor: RegionPicker(self.root, extractor, lambda color: self.set_color(selected_color, color)),
+                              on_error=self.upload_failed, on_progress=self.show_progress, pass_task=True)
+
+    def show_busy(self, busy):
+        if busy:
+            self.progress.config(mode="indeterminate", value=0)
+            self.progress.grid()
+            self.cancel_button.grid()
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.grid_remove()
+            self.cancel_button.grid_remove()
+
+    def show_progress(self, fraction):
+        # the first report switches the bar from the busy animation to a real fraction
+        if str(self.progress.cget("mode")) != "determinate":
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=100)
+        self.progress.config(value=fraction * 100)
 
 
     def open_camera(self):
         try:
-            selected_color = self.color_option.get()
-            if not self.camera:
-                self.camera = cv2.VideoCapture(0)
-
-            ret, frame = self.camera.read()
-            if ret:
-                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image_pil = Image.fromarray(image)
-                color = self.get_dominant_color(image_pil)
-                hex_color = "#{:02X}{:02X}{:02X}".format(*color)
-                if selected_color == "color1":
-                    self.color1 = color
-                    self.color1_label.config(bg=hex_color, text=hex_color)
-                elif selected_color == "color2":
-                    self.color2 = color
-                    self.color2_label.config(bg=hex_color, text=hex_color)
-            self.reset_add_subtract_flags()
-            self.camera = None
+            if self.camera is not None and self.camera.running:
+                self.stop_camera()
+                return
+            self.camera_target = self.color_option.get()
+            self.camera = CameraSession(self.root, self.show_camera_color, on_error=self.camera_failed)
+            self.camera.start()
+            self.camera_button.config(text="Stop Camera")
         except Exception as e:
+            self.camera = None
             messagebox.showerror("Error", "An unexpected error occurred while accessing the camera: " + str(e))
 
+    def show_camera_color(self, color):
+        self.set_color(self.camera_target, color)
+
+    def camera_failed(self, message):
+        self.stop_camera()
+        messagebox.showerror("Error", "An unexpected error occurred while accessing the camera: " + message)
+
+    def stop_camera(self):
+        if self.camera is not None:
+            self.camera.stop()
+            self.camera = None
+        self.camera_button.config(text="Open Camera")
+
+    def close(self):
+        try:
+            self.swatch_view.cancel()
+            self.stop_camera()
+            self.tasks.shutdown()
+        finally:
+            self.root.destroy()
+
 
     def process_and_display_image(self, image, selected_color):
         try:
             resized_image = image.resize((100, 100))
-            color = self.get_dominant_color_upload(resized_image)
-            if selected_color == "color1":
-                self.color1 = color
-                self.color1_label.config(bg=self.rgb_to_hex(color))
-            elif selected_color == "color2":
-                self.color2 = color
-                self.color2_label.config(bg=self.rgb_to_hex(color))
+            self.tasks.submit(self.get_dominant_color_upload, resized_image, name="process_and_display_image",
+                              on_done=lambda color: color and self.set_color(selected_color, color),
+                              on_progress=self.show_progress, pass_task=True)
         except Exception as e:
             print(f"Error in process_and_display_image: {e}")
 
     def get_dominant_color(self, image):
         try:
-            pixels = np.array(image)
-            pixels = pixels.reshape(-1, 3)
-            dominant_color = pixels.mean(axis=0)
-            return tuple(map(int, dominant_color))
+            return ImageColorExtractor.mean_color(image)
         except Exception as e:
             print(f"Error in get_dominant_color: {e}")
 
-    def get_dominant_color_upload(self, image, num_colors=1):
+    def get_dominant_color_upload(self, image, num_colors=1, task=None):
         try:
             pixels = np.array(image)
             if pixels.shape[2] != 3:
                 image = image.convert("RGB")
                 pixels = np.array(image)
-            pixels = pixels.reshape(-1, 3)
-            kmeans = KMeans(n_clusters=num_colors)
-            kmeans.fit(pixels)
-            dominant_color = kmeans.cluster_centers_[0]
-            return tuple(map(int, dominant_color))
+            if task is not None:
+                task.report(0.3)
+                task.check_cancelled()
+            if num_colors not in self.palette_extractors:
+                self.palette_extractors[num_colors] = DominantPaletteExtractor(num_colors=num_colors)
+            with Trace.span("ColorMixerApp.get_dominant_color_upload", num_colors=num_colors):
+                color = self.palette_extractors[num_colors].dominant_color(pixels, task)
+            if task is not None:
+                task.report(1.0)
+            return color
+        except TaskCancelled:
+            raise
         except Exception as e:
             print(f"Error in get_dominant_color_upload: {e}")
 
@@ -296,10 +481,10 @@ class ColorMixerApp(UI,Hex):
             else:
                 if selected_color == "color1":
                     self.color1 = (255, 255, 255)
-                    self.color1_label.config(bg=self.rgb_to_hex(self.color1))
+                    self.swatch_view.set_state(0, self.rgb_to_hex(self.color1), self.swatch_view.text_of(0))
                 elif selected_color == "color2":
                     self.color2 = (255, 255, 255)
-                    self.color2_label.config(bg=self.rgb_to_hex(self.color2))
+                    self.swatch_view.set_state(1, self.rgb_to_hex(self.color2), self.swatch_view.text_of(1))
         except Exception as e:
             print(f"Error in reset: {e}")
 
@@ -316,7 +501,7 @@ class ColorMixerApp(UI,Hex):
                 r1, g1, b1 = self.color2
                 r2, g2, b2 = self.color1
 
-            added_color = ((r1 + r2) // 2, (g1 + g2) // 2, (b1 + b2) // 2)
+            added_color = ColorEngine.mix((r1, g1, b1), (r2, g2, b2), space=self.mix_space)
             self.display_result("Add Color: " + self.rgb_to_hex(added_color), added_color, selected_color)
 
             if selected_color == "color1":
@@ -341,7 +526,7 @@ class ColorMixerApp(UI,Hex):
                 r1, g1, b1 = self.color2
                 r2, g2, b2 = self.color1
 
-            subtracted_color = (max(0, r1 - r2), max(0, g1 - g2), max(0, b1 - b2))
+            subtracted_color = ColorEngine.subtract((r1, g1, b1), (r2, g2, b2))
             self.display_result("Subtract Color: " + self.rgb_to_hex(subtracted_color), subtracted_color, selected_color)
 
             if selected_color == "color1":
@@ -358,22 +543,106 @@ class ColorMixerApp(UI,Hex):
         self.subtract_used = False
 
     def is_valid_hex_color(self, hex_color):
-        try:    
-            hex_color = hex_color.lstrip('#')
-            return len(hex_color) == 6 and all(c in '0123456789ABCDEFabcdef' for c in hex_color)
-        except TypeError:
-            return False
+        return Codec.is_valid_hex_color(hex_color)
 
     def hex_to_rgb(self, hex_color):
         try:
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+            return Codec.hex_to_rgb(hex_color)
         except ValueError:
             messagebox.showerror("Error", "Invalid hexadecimal color format")
 
     @staticmethod
     def rgb_to_hex(rgb):
-        return "#{:02X}{:02X}{:02X}".format(*rgb)
+        return Codec.rgb_to_hex(rgb)
+
+
+class RegionPicker(object):
+    # drag rectangles over an image to read the dominant color of each; all rectangles are
+    # re-evaluated together from the extractor's summed-area tables on every change
+    display_size = 640
+
+    def __init__(self, root, extractor, on_pick=None):
+        self.extractor = extractor
+        self.on_pick = on_pick
+        self.rects = []
+        self.colors = []
+        self.drag_start = None
+        self.drag_item = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Region Colors")
+        source_width, source_height = extractor.source_size
+        self.display_scale = min(1.0, self.display_size / float(max(source_width, source_height)))
+        display = (max(1, round(source_width * self.display_scale)), max(1, round(source_height * self.display_scale)))
+        self.photo = ImageTk.PhotoImage(Image.fromarray(extractor.image).resize(display))
+
+        self.canvas = tk.Canvas(self.window, width=display[0], height=display[1], highlightthickness=0, cursor="crosshair")
+        self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self.canvas.grid(row=0, column=0, rowspan=3)
+        self.region_list = tk.Listbox(self.window, width=24)
+        self.region_list.grid(row=0, column=1, columnspan=2, sticky="nsew")
+        tk.Button(self.window, text="Use Color", command=self.use_selected).grid(row=1, column=1, sticky="ew")
+        tk.Button(self.window, text="Clear", command=self.clear).grid(row=1, column=2, sticky="ew")
+        tk.Button(self.window, text="Save Regions...", command=self.save_regions).grid(row=2, column=1, columnspan=2, sticky="ew")
+
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<ButtonRelease-1>", self.end_drag)
+        self.region_list.bind("<Double-Button-1>", lambda event: self.use_selected())
+
+    def start_drag(self, event):
+        self.drag_start = (event.x, event.y)
+        self.drag_item = self.canvas.create_rectangle(event.x, event.y, event.x, event.y, outline="white", dash=(3, 2))
+
+    def drag(self, event):
+        if self.drag_item is not None:
+            self.canvas.coords(self.drag_item, *self.drag_start, event.x, event.y)
+
+    def end_drag(self, event):
+        if self.drag_item is None:
+            return
+        x0, x1 = sorted((self.drag_start[0], event.x))
+        y0, y1 = sorted((self.drag_start[1], event.y))
+        self.canvas.coords(self.drag_item, x0, y0, x1, y1)
+        self.canvas.itemconfig(self.drag_item, dash=(), width=2)
+        scale = self.display_scale
+        self.rects.append((x0 / scale, y0 / scale, max(1, x1 - x0) / scale, max(1, y1 - y0) / scale))
+        self.drag_item = None
+        self.refresh()
+
+    def refresh(self):
+        with Trace.span("RegionPicker.refresh", regions=len(self.rects)):
+            colors, shares = self.extractor.region_colors(self.rects)
+        self.colors = [tuple(int(c) for c in color) for color in colors]
+        self.region_list.delete(0, tk.END)
+        for i, (color, share) in enumerate(zip(self.colors, shares)):
+            hex_color = Codec.rgb_to_hex(color)
+            self.region_list.insert(tk.END, f"{i + 1}: {hex_color}  {share:.0%}")
+            text_color = "black" if Scoring.relative_luminance(color) > 0.18 else "white"
+            self.region_list.itemconfig(i, bg=hex_color, fg=text_color)
+
+    def use_selected(self):
+        selection = self.region_list.curselection()
+        if selection and self.on_pick is not None:
+            self.on_pick(self.colors[selection[0]])
+
+    def clear(self):
+        self.rects = []
+        self.colors = []
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+        self.region_list.delete(0, tk.END)
+
+    def save_regions(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            regions = [{"name": f"region {i + 1}", "rect": [round(v) for v in rect], "dominant": Codec.rgb_to_hex(color)}
+                       for i, (rect, color) in enumerate(zip(self.rects, self.colors))]
+            try:
+                with open(path, "w") as stream:
+                    json.dump(regions, stream, indent=2)
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not save regions: {e}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -446,9 +715,26 @@ class UI_2(object):
         self.decorative_color_1_label.place(relx=0.45, rely=0.5)
         self.decorative_color_2_label.place(relx=0.65, rely=0.5)
         self.decorative_color_3_label.place(relx=0.85, rely=0.5)
+        # label writes go through the view so only changed slots reach Tk, once per idle cycle
+        self.palette_view = PaletteView(root, [self.Main_color_label, self.secondary_color_label, self.decorative_color_1_label,
+                                               self.decorative_color_2_label, self.decorative_color_3_label],
+                                        ["first", "second", "third", "fourth", "fifth"])
         self.colors = ["", "", "", "", ""]
 
-class Suggestion(UI_2,Hex):
+class Suggestion(UI_2,Hex,PaletteFiles):
+    # "hsv" rotates hue like colorsys; "oklch" or "lch" rotate at constant perceived lightness
+    hue_space = "hsv"
+    # WCAG 2.x ratio a suggestion must reach against the main color (3.0 is AA for large text and UI parts)
+    min_contrast = Scoring.WCAG_AA_LARGE
+    # Optimize keeps the filled slots and searches the empty ones under these constraints
+    optimize_harmony = "any"
+    optimize_lightness = (20.0, 95.0)
+    optimize_budget = 0.3
+    # From Image fills the enabled slots from an image's largest color clusters ("median_cut" or "octree"),
+    # decoded at a reduced resolution that keeps both sides at least image_decode_size pixels
+    image_method = "median_cut"
+    image_decode_size = 256
+
     def __init__(self, root, import_button=None, suggest_button=None, random_button=None, reset_button=None, manual_input_button=None, two_color=None, three_color=None, four_color=None, five_color=None, color_option=None, secondary_color=None, decorative_color_1=None, decorative_color_2=None, decorative_color_3=None, last_suggested_colors=None, color_options=None, placement_radios=None, number_of_color=None, one_color=None, Main_color_radio=None,deep_colors_executed=False,light_colors_executed=False):
         super().__init__(
             root=root,
@@ -489,11 +775,26 @@ class Suggestion(UI_2,Hex):
         self.random_button = CustomButton(self.blue_frame, text="Random", bg='white', width=8, command=self.random_colors)
         self.reset_button = CustomButton(self.blue_frame, text="Delete", bg='white', width=8, command=self.reset_colors)
         self.manual_input_button = CustomButton(self.blue_frame, text="Manual", bg='white', width=8, command=self.manual_input_color)
+        self.optimize_button = CustomButton(self.blue_frame, text="Optimize", bg='white', width=8, command=self.optimize_colors)
         self.import_button.place(anchor="s", relx=0, rely=1, x=340, y=-75)
         self.suggest_button.place(anchor="s", relx=0, rely=1, x=440, y=-75)
         self.random_button.place(anchor="s", relx=0, rely=1, x=140, y=-75)
         self.reset_button.place(anchor="s", relx=0, rely=1, x=540, y=-75)
         self.manual_input_button.place(anchor="s", relx=0, rely=1, x=240, y=-75)
+        self.optimize_button.place(anchor="s", relx=0, rely=1, x=340, y=-30)
+        self.save_button = CustomButton(self.blue_frame, text="Save", bg='white', width=8, command=self.save_palette)
+        self.load_button = CustomButton(self.blue_frame, text="Load", bg='white', width=8, command=self.load_palette)
+        self.save_button.place(anchor="s", relx=0, rely=1, x=240, y=-30)
+        self.load_button.place(anchor="s", relx=0, rely=1, x=440, y=-30)
+        self.store_button = CustomButton(self.blue_frame, text="Store", bg='white', width=8, command=self.store_palette)
+        self.similar_button = CustomButton(self.blue_frame, text="Similar", bg='white', width=8, command=self.similar_palettes)
+        self.store_button.place(anchor="s", relx=0, rely=1, x=140, y=-30)
+        self.similar_button.place(anchor="s", relx=0, rely=1, x=540, y=-30)
+        self.image_button = CustomButton(self.blue_frame, text="From Image", bg='white', width=8, command=self.image_colors)
+        self.image_button.place(anchor="s", relx=0, rely=1, x=640, y=-75)
+        # image decode and quantization run off the Tk thread; the button stays disabled while one is running
+        self.tasks = TaskRunner(root, on_busy_change=self.show_busy)
+        root.protocol("WM_DELETE_WINDOW", self.close)
         self.number_of_color = tk.StringVar()
         self.number_of_color.set("1 color")
         self.one_color = tk.Radiobutton(self.blue_frame, text="1 color", variable=self.number_of_color, value="1 color", command=self.check_option)
@@ -527,21 +828,8 @@ class Suggestion(UI_2,Hex):
             selected_color = self.color_option.get()
             color = colorchooser.askcolor()
             if color and color[1]:
-                if selected_color == "first":
-                    self.colors[0] = color[1]
-                    self.Main_color_label.config(text=self.rgb_to_hex_import(color), bg=color[1])
-                elif selected_color == "second":
-                    self.colors[1] = color[1]
-                    self.secondary_color_label.config(text=self.rgb_to_hex_import(color), bg=color[1])
-                elif selected_color == "third":
-                    self.colors[2] = color[1]
-                    self.decorative_color_1_label.config(text=self.rgb_to_hex_import(color), bg=color[1])
-                elif selected_color == "fourth":
-                    self.colors[3] = color[1]
-                    self.decorative_color_2_label.config(text=self.rgb_to_hex_import(color), bg=color[1])
-                elif selected_color == "fifth":
-                    self.colors[4] = color[1]
-                    self.decorative_color_3_label.config(text=self.rgb_to_hex_import(color), bg=color[1])
+                slot = ["first", "second", "third", "fourth", "fifth"].index(selected_color)
+                self.colors[slot] = self.rgb_to_hex_import(color)
             self.update_labels()
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred while importing colors: {e}")
@@ -560,9 +848,7 @@ class Suggestion(UI_2,Hex):
             messagebox.showerror("Error", f"An error occurred while manually inputting color: {e}")
 
     def is_valid_hex_color(self, color_str):
-        if not color_str:
-            return False
-        return bool(re.match(r"^#[A-Fa-f0-9]{6}$", color_str))
+        return Codec.is_valid_hex_color(color_str)
 
 
     def suggest_colors(self):
@@ -575,13 +861,13 @@ class Suggestion(UI_2,Hex):
 
             if self.colors[0]:
                 main_color_rgb = self.hex_to_rgb(self.colors[0])
-                main_color_hsv = colorsys.rgb_to_hsv(*[x/255.0 for x in main_color_rgb])
+                with Trace.span("Suggestion.candidates"):
+                    candidates = self.suggestion_candidates(main_color_rgb)
+                with Trace.span("Suggestion.rank", candidates=len(candidates)):
+                    ranked, scores = Scoring.rank_candidates(main_color_rgb, candidates, num_colors - 1, self.min_contrast)
                 suggested_colors = []
-                for i in range(1, num_colors):
-                    hue_offset = (main_color_hsv[0] + 0.1 * i) % 1
-                    new_color_hsv = (hue_offset, main_color_hsv[1], main_color_hsv[2])
-                    new_color_rgb = colorsys.hsv_to_rgb(*new_color_hsv)
-                    suggested_color = self.rgb_to_hex([int(x * 255) for x in new_color_rgb])
+                for i, candidate in enumerate(ranked, start=1):
+                    suggested_color = self.rgb_to_hex(candidates[candidate])
                     if self.colors[i] == suggested_color or self.colors[i] == "#FFFFFF":
                         suggested_colors.append(f"{self.colors[i]} (Perfect Color)")
                     else:
@@ -595,6 +881,83 @@ class Suggestion(UI_2,Hex):
         except Exception as e:
             messagebox.showerror("Error", f"Error suggesting colors: {e}")
 
+    def optimize_colors(self):
+        try:
+            num_colors = self.color_options.index(self.number_of_color.get()) + 1
+            locked = {i: self.colors[i] for i in range(num_colors) if self.is_valid_hex_color(self.colors[i])}
+            if len(locked) == num_colors:
+                self.show_popup_message("Every slot is filled. Delete the colors you want optimized.")
+                return
+            optimizer = PaletteOptimizer(num_colors, locked, self.min_contrast, self.optimize_harmony, self.optimize_lightness)
+            with Trace.span("Suggestion.optimize", free=num_colors - len(locked)):
+                palettes = optimizer.optimize(top_n=1, time_budget=self.optimize_budget)
+            best, score, feasible = palettes[0]
+            for i, color in enumerate(best):
+                self.colors[i] = color
+            self.update_labels()
+            if not feasible:
+                self.show_popup_message(f"No palette met contrast {self.min_contrast:g}:1 and the {self.optimize_harmony} rule.\nShowing the closest one found.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error optimizing colors: {e}")
+
+    def image_colors(self):
+        try:
+            file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.png *.bmp")])
+            if not file_path:
+                return
+            if imghdr.what(file_path) is None:
+                raise ValueError("The selected file is not a supported image format.")
+            num_colors = self.color_options.index(self.number_of_color.get()) + 1
+            self.tasks.submit(self.extract_image_colors, file_path, num_colors, name="image_colors",
+                              on_done=lambda result: self.show_image_colors(num_colors, *result),
+                              on_error=self.image_colors_failed, pass_task=True)
+        except ValueError as ve:
+            messagebox.showerror("Invalid File", str(ve))
+        except Exception as e:
+            self.image_colors_failed(e)
+
+    def extract_image_colors(self, file_path, num_colors, task=None):
+        # runs on the worker pool; a cancelled job stops between the decode and the quantizer
+        image = ImageColorExtractor.load_image(file_path, self.image_decode_size)
+        if task is not None:
+            task.report(0.5)
+            task.check_cancelled()
+        with Trace.span("Suggestion.image_colors", method=self.image_method, k=num_colors):
+            result = PaletteQuantizer(num_colors, self.image_method).extract(image)
+        if task is not None:
+            task.report(1.0)
+        return result
+
+    def show_image_colors(self, num_colors, colors, shares):
+        for i in range(num_colors):
+            self.colors[i] = self.rgb_to_hex(colors[i]) if i < len(colors) else ""
+        self.update_labels()
+        # each filled slot shows its share of the image's pixels until the slot next changes
+        for i, share in enumerate(shares[:num_colors]):
+            self.palette_view.set_state(i, self.colors[i], f"{self.colors[i]}\n{share:.0%}")
+
+    def image_colors_failed(self, error):
+        messagebox.showerror("Error", f"Error extracting colors from the image: {error}")
+
+    def show_busy(self, busy):
+        self.image_button.config(state="disabled" if busy else "normal")
+
+    def close(self):
+        try:
+            self.palette_view.cancel()
+            self.tasks.shutdown()
+        finally:
+            self.root.destroy()
+
+    def suggestion_candidates(self, main_color_rgb):
+        # hue steps around the wheel plus a lighter and darker variant of each, scored together by Scoring
+        candidates = []
+        for hue_color in ColorEngine.hue_steps(main_color_rgb, 9, 0.1, self.hue_space):
+            candidates.append(hue_color)
+            candidates.extend(ColorEngine.tints(hue_color, 1, 60))
+            candidates.extend(ColorEngine.shades(hue_color, 1, 60))
+        return candidates
+
     def show_suggested_colors_popup(self, suggested_colors):
         try:
             popup_message = ""
@@ -605,23 +968,23 @@ class Suggestion(UI_2,Hex):
                         perfect_color = color.replace(' (Perfect Color)', '')
                         popup_message += f"{color_labels[i-1]}: {perfect_color} (Already Perfect), "
                     else:
-                        popup_message += f"{color_labels[i-1]}: {color}, "
+                        popup_message += f"{color_labels[i-1]}: {color} {self.color_name(color)}, "
             popup_message = popup_message.rstrip(', ')
-            self.show_popup_message("Suggested colors:"  + popup_message+"\n")
+            with Trace.span("tk.popup"):
+                self.show_popup_message("Suggested colors:"  + popup_message+"\n")
         except Exception as e:
             messagebox.showerror("Error", f"Error showing suggested colors popup: {e}\n")
 
+    def color_name(self, hex_color):
+        try:
+            return f"({default_catalog().name_of(Codec.hex_to_rgb(hex_color))})"
+        except Exception as e:
+            print(f"Error looking up color name: {e}")
+            return ""
+
     def generate_analogous_colors(self, base_rgb, num_colors):
         try:
-            hue_step = 30
-            base_hsv = colorsys.rgb_to_hsv(*base_rgb)
-            analogous_colors = []
-            for i in range(1, num_colors + 1):
-                offset = (base_hsv[0] + i * hue_step) % 360
-                hsv = (offset / 360.0, base_hsv[1], base_hsv[2])
-                rgb = colorsys.hsv_to_rgb(*hsv)
-                analogous_colors.append(tuple(int(x * 255) for x in rgb))
-            return analogous_colors
+            return ColorEngine.analogous(base_rgb, num_colors, hue_step=30, space=self.hue_space)
         except Exception as e:
             messagebox.showerror("Error", f"Error generating analogous colors: {e}")
 
@@ -653,9 +1016,7 @@ class Suggestion(UI_2,Hex):
     def generate_split_complementary_scheme(self, colors):
         try:
             base_color = self.hex_to_rgb(colors[0])
-            complementary_color = self.get_complementary_color(base_color)
-
-            split_colors = [self.adjust_color(complementary_color), self.adjust_color(complementary_color)]
+            split_colors = ColorEngine.split_complementary(base_color, space=self.hue_space)
             return [self.rgb_to_hex(color) for color in split_colors]
         except Exception as e:
             messagebox.showerror("Error", f"Error generating split complementary color scheme: {e}")
@@ -676,57 +1037,37 @@ class Suggestion(UI_2,Hex):
             popup.lift()
             popup.attributes('-topmost', True)
             popup.focus_set()
-            popup.wait_window()
         except Exception as e:
             messagebox.showerror("Error", f"Error displaying popup message: {e}")
 
-    def is_color_good(self):
+    def is_color_good(self, color, suggested_color):
         try:
-            return True
+            ratio = Scoring.contrast_ratio(self.hex_to_rgb(color), self.hex_to_rgb(suggested_color))
+            return bool(ratio >= self.min_contrast)
         except Exception as e:
             messagebox.showerror("Error", f"Error checking if color is good: {e}")
 
+    def apply_palette(self, hex_colors):
+        # loaded colors fill the slots in order; extra colors are dropped and missing ones leave the slot empty
+        for i in range(len(self.colors)):
+            self.colors[i] = hex_colors[i] if i < len(hex_colors) else ""
+        self.update_labels()
+
     def random_colors(self):
         try:
             random_color = (np.random.randint(0, 256), np.random.randint(0, 256), np.random.randint(0, 256))
 
-            selected_color = self.color_option.get()
-            if selected_color == "first":
-                self.colors[0] = self.rgb_to_hex_random(random_color)
-                self.Main_color_label.config(text=self.colors[0], bg=self.colors[0])
-            elif selected_color == "second":
-                self.colors[1] = self.rgb_to_hex_random(random_color)
-                self.secondary_color_label.config(text=self.colors[1], bg=self.colors[1])
-            elif selected_color == "third":
-                self.colors[2] = self.rgb_to_hex_random(random_color)
-                self.decorative_color_1_label.config(text=self.colors[2], bg=self.colors[2])
-            elif selected_color == "fourth":
-                self.colors[3] = self.rgb_to_hex_random(random_color)
-                self.decorative_color_2_label.config(text=self.colors[3], bg=self.colors[3])
-            elif selected_color == "fifth":
-                self.colors[4] = self.rgb_to_hex_random(random_color)
-                self.decorative_color_3_label.config(text=self.colors[4], bg=self.colors[4])
+            slot = ["first", "second", "third", "fourth", "fifth"].index(self.color_option.get())
+            self.colors[slot] = self.rgb_to_hex_random(random_color)
+            self.palette_view.set(slot, self.colors[slot])
         except Exception as e:
             messagebox.showerror("Error", f"Error generating random colors: {e}")
 
     def reset_colors(self):
         try:
-            selected_color = self.color_option.get()
-            if selected_color == "first":
-                self.colors[0] = ""
-                self.Main_color_label.config(text="first", bg="white")
-            elif selected_color == "second":
-                self.colors[1] = ""
-                self.secondary_color_label.config(text="second", bg="white")
-            elif selected_color == "third":
-                self.colors[2] = ""
-                self.decorative_color_1_label.config(text="third", bg="white")
-            elif selected_color == "fourth":
-                self.colors[3] = ""
-                self.decorative_color_2_label.config(text="fourth", bg="white")
-            elif selected_color == "fifth":
-                self.colors[4] = ""
-                self.decorative_color_3_label.config(text="fifth", bg="white")
+            slot = ["first", "second", "third", "fourth", "fifth"].index(self.color_option.get())
+            self.colors[slot] = ""
+            self.palette_view.clear(slot)
         except Exception as e:
             messagebox.showerror("Error", f"Error resetting colors: {e}")
 
@@ -744,33 +1085,23 @@ class Suggestion(UI_2,Hex):
         except Exception as e:
             messagebox.showerror("Error", f"Error checking options: {e}")
 
+    @Trace.traced("Suggestion.update_labels")
     def update_labels(self):
         try:
-            labels = [
-                self.Main_color_label,
-                self.secondary_color_label,
-                self.decorative_color_1_label,
-                self.decorative_color_2_label,
-                self.decorative_color_3_label
-            ]
-            for i, label in enumerate(labels):
-                if self.colors[i] and self.is_valid_hex_color(self.colors[i]):
-                    label.config(bg=self.colors[i], text=self.colors[i])
-                else:
-                    label.config(bg="white", text=['first', 'second', 'third', 'fourth', 'fifth'][i])
+            self.palette_view.set_all(self.colors)
         except Exception as e:
             messagebox.showerror("Error", f"Error updating labels: {str(e)}")
 
     def rgb_to_hex_random(self, color):
         try:
-            return "#{:02X}{:02X}{:02X}".format(int(color[0]), int(color[1]), int(color[2]))
+            return Codec.rgb_to_hex(color)
         except Exception as e:
             messagebox.showerror("Error", f"Error converting RGB to hexadecimal: {e}")
 
     def rgb_to_hex_import(self, color):
         try:
             if color and isinstance(color, tuple) and len(color) > 0 and isinstance(color[0], tuple):
-                return "#{:02X}{:02X}{:02X}".format(int(color[0][0]), int(color[0][1]), int(color[0][2]))
+                return Codec.rgb_to_hex(color[0])
             else:
                 return None  #or #FFFF
         except Exception as e:
@@ -779,8 +1110,7 @@ class Suggestion(UI_2,Hex):
 
     def hex_to_rgb(self, hex_color):
         try:
-            hex_color = hex_color.lstrip("#")
-            return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+            return Codec.hex_to_rgb(hex_color)
         except ValueError:
             messagebox.showerror("Error", "Invalid hexadecimal color format")
         except Exception as e:
@@ -788,24 +1118,20 @@ class Suggestion(UI_2,Hex):
 
     def rgb_to_hex(self, rgb_color):
         try:
-            return "#{:02X}{:02X}{:02X}".format(*rgb_color)
+            return Codec.rgb_to_hex(rgb_color)
         except Exception as e:
             messagebox.showerror("Error", f"Error converting RGB to hexadecimal: {e}")
 
     def adjust_color(self, rgb_color):
         try:
-            adjusted_color = [min(255, max(0, value + np.random.randint(-20, 20))) for value in rgb_color]
+            adjusted_color = [ColorEngine.clamp(value + np.random.randint(-20, 20)) for value in rgb_color]
             return tuple(adjusted_color)
         except Exception as e:
             messagebox.showerror("Error", f"Error adjusting color: {e}")
 
     def get_complementary_color(self, rgb_color):
         try:
-            hsv_color = colorsys.rgb_to_hsv(*[x/255.0 for x in rgb_color])
-            complementary_hue = (hsv_color[0] + 0.5) % 1.0
-            complementary_hsv = (complementary_hue, hsv_color[1], hsv_color[2])
-            complementary_rgb = colorsys.hsv_to_rgb(*complementary_hsv)
-            return self.rgb_to_hex([int(x * 255) for x in complementary_rgb])
+            return ColorEngine.complementary(rgb_color, self.hue_space)
         except Exception as e:
             messagebox.showerror("Error", f"Error getting complementary color: {e}")
 
@@ -825,7 +1151,12 @@ if __name__ == "__main__":
     app = Suggestion(root)
     root.mainloop()
 
-class Layer(UI_2,Hex):
+class Layer(UI_2,Hex,PaletteFiles):
+    # deep and light fill the other slots with an OKLCh shade or tint ladder from the main color;
+    # the scale window shows an N-step OKLCh ladder of the main color; kind is tint, shade, tone or scale
+    scale_kind = "scale"
+    scale_swatch_width = 600
+
     def __init__(self, root,import_button=None,deep_button=None,light_button=None,number_of_color=None,one_color=None,color_option=None,Main_color_radio=None,click_count=None,color_step_0=None,color_step_1=None,color_step_2=None,color_step_3=None,color_step_4=None,color_options=None,placement_radios=None ):
         super().__init__(
             root=root,
@@ -862,6 +1193,22 @@ class Layer(UI_2,Hex):
         self.import_button.place(anchor="s", relx=0, rely=1, x=340, y=-45)
         self.deep_button.place(anchor="s", relx=0, rely=1, x=140, y=-75)
         self.light_button.place(anchor="s", relx=0, rely=1, x=140, y=-15)
+
+        self.scale_steps = tk.IntVar(value=10)
+        self.scale_steps_box = tk.Spinbox(self.blue_frame, from_=2, to=100, textvariable=self.scale_steps, width=5)
+        self.scale_button = CustomButton(self.blue_frame, text="scale", bg='white', width=6, command=self.show_scale)
+        self.tokens_button = CustomButton(self.blue_frame, text="tokens", bg='white', width=6, command=self.export_tokens)
+        self.scale_steps_box.place(anchor="s", relx=0, rely=1, x=540, y=-85)
+        self.scale_button.place(anchor="s", relx=0, rely=1, x=540, y=-45)
+        self.tokens_button.place(anchor="s", relx=0, rely=1, x=540, y=-15)
+        self.save_button = CustomButton(self.blue_frame, text="save", bg='white', width=6, command=self.save_palette)
+        self.load_button = CustomButton(self.blue_frame, text="load", bg='white', width=6, command=self.load_palette)
+        self.save_button.place(anchor="s", relx=0, rely=1, x=440, y=-75)
+        self.load_button.place(anchor="s", relx=0, rely=1, x=440, y=-15)
+        self.store_button = CustomButton(self.blue_frame, text="store", bg='white', width=6, command=self.store_palette)
+        self.similar_button = CustomButton(self.blue_frame, text="similar", bg='white', width=6, command=self.similar_palettes)
+        self.store_button.place(anchor="s", relx=0, rely=1, x=240, y=-75)
+        self.similar_button.place(anchor="s", relx=0, rely=1, x=240, y=-15)
         
         self.number_of_color = tk.StringVar()
         self.number_of_color.set("1 color")
@@ -894,45 +1241,97 @@ class Layer(UI_2,Hex):
                 if selected_color:
                     selected_color = self.colors[0]
                     color = colorchooser.askcolor()
-                    if color:
-                        self.colors[0] = color[1]
-                        self.colors[1] = color[1]
-                        self.colors[2] = color[1]
-                        self.colors[3] = color[1]
-                        self.colors[4] = color[1]
-                    self.Main_color_label.config(text=self.rgb_to_hex_import(color), bg=color[1])                
+                    if color and color[1]:
+                        self.colors = [self.rgb_to_hex_import(color)] * len(self.colors)
+                        self.palette_view.set(0, self.colors[0])
             self.reset_other_labels()
         except Exception as e:
             messagebox.showerror("Error", f"Error importing colors: {e}")
 
     def deep_colors(self):
+        if not self.is_valid_hex_color(self.colors[0]):
+            messagebox.showerror("Error", "Choose a main color first")
+            return
         try:
             base_color = self.hex_to_rgb(self.colors[0])
-            for i in range(1, len(self.colors)):
-                self.colors[i] = self.rgb_to_hex(self.adjust_color_intensity(base_color, -self.color_step_0 * i))
+            with Trace.span("Layer.shades", steps=len(self.colors)):
+                # step 0 of the ladder is the main color itself
+                shades = Ladder.ladder([base_color], len(self.colors), "shade")[0][1:]
+            for i, shade in enumerate(shades, start=1):
+                self.colors[i] = self.rgb_to_hex(shade)
             self.update_labels()
-        except ValueError:
-            messagebox.showerror("Error", "Invalid color format")
         except Exception as e:
             messagebox.showerror("Error", f"Error deepening colors: {e}")
 
     def light_colors(self):
+        if not self.is_valid_hex_color(self.colors[0]):
+            messagebox.showerror("Error", "Choose a main color first")
+            return
         try:
             base_color = self.hex_to_rgb(self.colors[0])
-            for i in range(1, len(self.colors)):
-                self.colors[i] = self.rgb_to_hex(self.adjust_color_intensity(base_color, self.color_step_0 * i))
+            with Trace.span("Layer.tints", steps=len(self.colors)):
+                tints = Ladder.ladder([base_color], len(self.colors), "tint")[0][1:]
+            for i, tint in enumerate(tints, start=1):
+                self.colors[i] = self.rgb_to_hex(tint)
             self.update_labels()
-        except ValueError:
-            messagebox.showerror("Error", "Invalid color format")
         except Exception as e:
             messagebox.showerror("Error", f"Error lightening colors: {e}")
 
+    def show_scale(self):
+        if not self.is_valid_hex_color(self.colors[0]):
+            messagebox.showerror("Error", "Choose a main color first")
+            return
+        try:
+            steps = self.scale_steps.get()
+            base_color = self.hex_to_rgb(self.colors[0])
+            with Trace.span("Layer.scale", steps=steps, kind=self.scale_kind):
+                scale = Ladder.ladder([base_color], steps, self.scale_kind)[0]
+            popup = tk.Toplevel(self.root)
+            popup.title(f"{steps}-step {self.scale_kind}")
+            width = max(1, self.scale_swatch_width // steps)
+            canvas = tk.Canvas(popup, width=width * steps, height=90, highlightthickness=0)
+            canvas.pack()
+            for i, hex_color in enumerate(Codec.encode_many(scale)):
+                hex_color = str(hex_color)
+                item = canvas.create_rectangle(i * width, 0, (i + 1) * width, 90, fill=hex_color, outline="")
+                canvas.tag_bind(item, "<Button-1>", lambda event, value=hex_color: self.copy_color(value))
+                if width >= 60:
+                    text_color = "black" if Scoring.relative_luminance(scale[i]) > 0.18 else "white"
+                    canvas.create_text(i * width + width // 2, 45, text=hex_color, fill=text_color, state="disabled")
+            tk.Label(popup, text="Click a swatch to copy its hex code").pack()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error building color scale: {e}")
+
+    def apply_palette(self, hex_colors):
+        # Layer works from a single main color, so a loaded palette contributes its first color
+        self.colors = [hex_colors[0]] * len(self.colors)
+        self.palette_view.set(0, self.colors[0])
+        self.reset_other_labels()
+
+    def copy_color(self, hex_color):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(hex_color)
+
+    def export_tokens(self):
+        try:
+            colors = list(dict.fromkeys(color for color in self.colors if self.is_valid_hex_color(color)))
+            if not colors:
+                messagebox.showerror("Error", "Choose a main color first")
+                return
+            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Design tokens", "*.json"), ("CSS custom properties", "*.css")])
+            if path:
+                scales = Ladder.token_scale([self.hex_to_rgb(color) for color in colors])
+                names = [f"color-{i + 1}" for i in range(len(colors))]
+                with open(path, "w") as stream:
+                    stream.write(Ladder.export_tokens(names, scales, "css" if path.endswith(".css") else "json"))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error exporting design tokens: {e}")
+
     def adjust_color(self, index, change):
         try:
             if index < len(self.colors):
                 rgb_color = self.hex_to_rgb(self.colors[index])
-                adjusted_color = [max(0, min(255, value + change)) for value in rgb_color]
-                self.colors[index] = self.rgb_to_hex(adjusted_color)
+                self.colors[index] = self.rgb_to_hex(ColorEngine.adjust_intensity(rgb_color, change))
         except ValueError:
             messagebox.showerror("Error", "Invalid color format")
         except Exception as e:
@@ -940,41 +1339,29 @@ class Layer(UI_2,Hex):
 
     def adjust_color_intensity(self, rgb_color, change):
         try:
-            return tuple(max(0, min(255, c + change)) for c in rgb_color)
+            return ColorEngine.adjust_intensity(rgb_color, change)
         except Exception as e:
             messagebox.showerror("Error", f"Error adjusting color intensity: {e}")
 
     def is_valid_hex_color(self, color_str):
-        try:
-            return bool(re.match(r"^#[A-Fa-f0-9]{6}$", color_str))
-        except Exception as e:
-            messagebox.showerror("Error", f"Error validating hexadecimal color format: {e}")
+        return Codec.is_valid_hex_color(color_str)
 
+    @Trace.traced("Layer.update_labels")
     def update_labels(self):
         try:
             selected_option = self.number_of_color.get()
             if selected_option == "1 color":
                 selected_color = self.color_option.get()
                 if selected_color:
-                    main_color = self.colors[0] if self.colors[0] else "#FFFF"
-                    secondary_color = self.colors[1] if self.colors[1] else "#FFFF"
-                    decorative_color_1 = self.colors[2] if self.colors[2] else "#FFFF"
-                    decorative_color_2 = self.colors[3] if self.colors[3] else "#FFFF"
-                    decorative_color_3 = self.colors[4] if self.colors[4] else "#FFFF"
-                    self.Main_color_label.config(text=main_color, bg=main_color)
-                    self.secondary_color_label.config(text=secondary_color, bg=secondary_color)
-                    self.decorative_color_1_label.config(text=decorative_color_1, bg=decorative_color_1)
-                    self.decorative_color_2_label.config(text=decorative_color_2, bg=decorative_color_2)
-                    self.decorative_color_3_label.config(text=decorative_color_3, bg=decorative_color_3)
+                    # empty slots fall back to the white placeholder instead of the invalid "#FFFF"
+                    self.palette_view.set_all(self.colors)
         except Exception as e:
             messagebox.showerror("Error", f"Error updating labels: {e}")
 
     def reset_other_labels(self):
         try:
-            self.secondary_color_label.config(text="second", bg="white")
-            self.decorative_color_1_label.config(text="third", bg="white")
-            self.decorative_color_2_label.config(text="fourth", bg="white")
-            self.decorative_color_3_label.config(text="fifth", bg="white")
+            for slot in range(1, len(self.colors)):
+                self.palette_view.clear(slot)
         except Exception as e:
             messagebox.showerror("Error", f"Error resetting labels: {e}")
 
@@ -990,14 +1377,13 @@ class Layer(UI_2,Hex):
             messagebox.showerror("Error", f"Error checking options: {e}")
 
     def rgb_to_hex_import(self, color):
-        return "#{:02X}{:02X}{:02X}".format(int(color[0][0]), int(color[0][1]), int(color[0][2]))
+        return Codec.rgb_to_hex(color[0])
 
     def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip("#")
-        return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+        return Codec.hex_to_rgb(hex_color)
 
     def rgb_to_hex(self, rgb_color):
-        return "#{:02X}{:02X}{:02X}".format(*rgb_color)
+        return Codec.rgb_to_hex(rgb_color)
 
 if __name__ == "__main__":
     root = tk.Tk()
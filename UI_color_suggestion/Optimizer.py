@@ -0,0 +1,213 @@
+import time
+
+import Codec
+import ColorSpace
+import Ladder
+import Scoring
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# hue offsets (degrees from the main color) each harmony rule accepts for the other slots
+HARMONY_RULES = {
+    "any": None,
+    "analogous": (0.0, 30.0, -30.0, 60.0, -60.0),
+    "complementary": (0.0, 180.0),
+    "split-complementary": (0.0, 150.0, -150.0),
+    "triadic": (0.0, 120.0, -120.0),
+    "square": (0.0, 90.0, 180.0, -90.0),
+}
+
+# subtracted from palettes that break a hard constraint; larger than the whole range of feasible scores,
+# so every feasible palette ranks above every infeasible one
+INFEASIBLE_PENALTY = 2.0
+# OKLab lightness slack for the rounding to 8-bit sRGB
+LIGHTNESS_SLACK = 0.01
+# OKLCh chroma below which a hue is numerical noise; such slots cannot follow a harmony rule
+MIN_HARMONY_CHROMA = 0.03
+
+
+class PaletteOptimizer(object):
+    # simulated annealing over a batch of palettes held in OKLCh; every chain is scored in one vectorized
+    # call per step, and the search stops when the time budget runs out
+
+    def __init__(self, size=5, locked=None, min_contrast=Scoring.WCAG_AA_LARGE, harmony="any",
+                 lightness_range=(0.0, 100.0), min_delta=10.0, chains=256, random_state=None, harmony_tolerance=15.0):
+        if not 1 <= size <= 16:
+            raise ValueError(f"Palette size must be between 1 and 16, got {size!r}")
+        if harmony not in HARMONY_RULES:
+            raise ValueError(f"Unknown harmony rule: {harmony!r}")
+        low, high = lightness_range
+        if not 0.0 <= low <= high <= 100.0:
+            raise ValueError(f"Lightness range must lie within 0-100, got {lightness_range!r}")
+        self.size = int(size)
+        self.locked = {}
+        for slot, color in (locked or {}).items():
+            if not 0 <= slot < size:
+                raise ValueError(f"Locked slot {slot} is outside a palette of {size} colors")
+            self.locked[slot] = Codec.hex_to_rgb(color) if isinstance(color, str) else tuple(int(c) for c in color)
+        self.min_contrast = float(min_contrast)
+        self.harmony = harmony
+        # largest hue error (degrees) a harmony slot may have and still count as following the rule
+        self.harmony_tolerance = float(harmony_tolerance)
+        self.lightness_range = (low / 100.0, high / 100.0)
+        self.min_delta = float(min_delta)
+        self.chains = int(chains)
+        self.rng = np.random.default_rng(random_state)
+        self.free = np.array([slot for slot in range(size) if slot not in self.locked], dtype=np.intp)
+        self.contrast_gap = self._contrast_gap()
+        self.harmony_hues = self._harmony_hues()
+
+    def _contrast_gap(self):
+        # OKLab lightness band (dark_max, light_min) where no color reaches min_contrast against the main color;
+        # grays map luminance Y to lightness Y ** (1 / 3), so the band is exact for them and a close guide otherwise
+        if 0 not in self.locked or self.min_contrast <= 1.0:
+            return None
+        main = float(Scoring.relative_luminance(self.locked[0]))
+        dark = (main + 0.05) / self.min_contrast - 0.05
+        light = self.min_contrast * (main + 0.05) - 0.05
+        dark_max = np.cbrt(dark) if dark > 0 else -1.0
+        light_min = np.cbrt(light) if light < 1.0 else 2.0
+        return dark_max, light_min
+
+    def _harmony_hues(self):
+        # absolute hues the harmony rule allows, when the main color is locked and has a hue of its own
+        offsets = HARMONY_RULES[self.harmony]
+        if offsets is None or 0 not in self.locked:
+            return None
+        main = ColorSpace.to_space(np.array([self.locked[0]], dtype=np.uint8), "oklch")[0]
+        if main[1] < MIN_HARMONY_CHROMA:
+            return None
+        return np.mod(main[2] + np.asarray(offsets), 360.0)
+
+    def _snap(self, lch):
+        # pulls hue onto the nearest harmony hue with enough chroma to carry it, then moves lightness out of
+        # the contrast gap to its nearer edge (within the lightness range when possible)
+        if self.harmony_hues is not None:
+            distance = np.mod(lch[..., 2, None] - self.harmony_hues, 360.0)
+            distance = np.where(distance > 180.0, distance - 360.0, distance)
+            nearest = np.take_along_axis(distance, np.abs(distance).argmin(axis=-1)[..., None], axis=-1)[..., 0]
+            limit = 0.5 * self.harmony_tolerance
+            lch[..., 2] = np.mod(lch[..., 2] - nearest + np.clip(nearest, -limit, limit), 360.0)
+            lch[..., 1] = np.maximum(lch[..., 1], 1.5 * MIN_HARMONY_CHROMA)
+        if self.contrast_gap is None:
+            return lch
+        dark_max, light_min = self.contrast_gap
+        low, high = self.lightness_range
+        lightness = lch[..., 0]
+        inside = (lightness > dark_max) & (lightness < light_min)
+        can_dark, can_light = dark_max >= low, light_min <= high
+        if not (can_dark or can_light):
+            return lch
+        to_light = (lightness - dark_max > light_min - lightness) if can_dark and can_light else np.full(lightness.shape, can_light)
+        lightness[inside & to_light] = min(light_min + 0.005, high)
+        lightness[inside & ~to_light] = max(dark_max - 0.005, low)
+        return lch
+
+    def _random_lch(self, count):
+        low, high = self.lightness_range
+        lightness = self.rng.uniform(low, high, (count, len(self.free)))
+        chroma = self.rng.uniform(0.0, 0.3, (count, len(self.free)))
+        hue = self.rng.uniform(0.0, 360.0, (count, len(self.free)))
+        return self._snap(np.stack([lightness, chroma, hue], axis=-1))
+
+    def _palettes(self, free_lch):
+        palettes = np.empty((len(free_lch), self.size, 3), dtype=np.uint8)
+        for slot, color in self.locked.items():
+            palettes[:, slot] = color
+        if len(self.free):
+            # out-of-gamut colors give up chroma rather than hue, so snapped hues survive the conversion
+            palettes[:, self.free] = ColorSpace.from_space(Ladder.fit_gamut(free_lch), "oklch")
+        return palettes
+
+    def _harmony_errors(self, palettes):
+        # (M, size - 1) degrees between each slot's hue and the nearest hue the harmony rule allows, and the
+        # chroma each slot lacks to have a hue at all; near-gray slots (or a near-gray main color) get the
+        # largest hue error, so a gray never satisfies a rule
+        offsets = HARMONY_RULES[self.harmony]
+        if offsets is None or self.size < 2:
+            return np.zeros((len(palettes), 1)), np.zeros((len(palettes), 1))
+        lch = ColorSpace.to_space(palettes, "oklch")
+        hue, chroma = lch[..., 2], lch[..., 1]
+        difference = np.mod(hue[:, 1:] - hue[:, :1], 360.0)
+        targets = np.mod(np.asarray(offsets), 360.0)
+        distance = np.abs(difference[..., None] - targets)
+        errors = np.minimum(distance, 360.0 - distance).min(axis=-1)
+        chromatic = (chroma[:, 1:] >= MIN_HARMONY_CHROMA) & (chroma[:, :1] >= MIN_HARMONY_CHROMA)
+        shortfall = np.maximum(MIN_HARMONY_CHROMA - chroma[:, 1:], 0.0)
+        return np.where(chromatic, errors, 180.0), shortfall
+
+    def _lightness_errors(self, palettes):
+        lightness = ColorSpace.to_space(palettes[:, self.free], "oklab")[..., 0] if len(self.free) else np.zeros((len(palettes), 1))
+        low, high = self.lightness_range
+        return np.maximum(low - lightness, 0.0) + np.maximum(lightness - high, 0.0)
+
+    def feasible(self, palettes, metrics=None):
+        # hard constraints: contrast against the main color, the harmony rule and the lightness range
+        metrics = metrics if metrics is not None else Scoring.score_palettes(palettes, self.min_contrast, self.min_delta)
+        return ((metrics["min_contrast"] >= self.min_contrast)
+                & (self._harmony_errors(palettes)[0].max(axis=1) <= self.harmony_tolerance)
+                & (self._lightness_errors(palettes).max(axis=1) <= LIGHTNESS_SLACK))
+
+    def evaluate(self, palettes):
+        # the soft penalties steer infeasible chains toward the constraints; the flat penalty keeps them ranked last
+        metrics = Scoring.score_palettes(palettes, self.min_contrast, self.min_delta)
+        hue_errors, shortfall = self._harmony_errors(palettes)
+        harmony_penalty = (np.clip(hue_errors / 30.0, 0.0, 1.0).mean(axis=1)
+                           + (shortfall / MIN_HARMONY_CHROMA).mean(axis=1))
+        lightness_penalty = np.clip(self._lightness_errors(palettes) / 0.1, 0.0, 1.0).mean(axis=1)
+        infeasible = ~self.feasible(palettes, metrics)
+        return metrics["score"] - 0.5 * harmony_penalty - 0.5 * lightness_penalty - INFEASIBLE_PENALTY * infeasible
+
+    def optimize(self, top_n=5, time_budget=0.3, max_steps=10000):
+        # [(hex colors, score, feasible)], feasible palettes first; when none meets the constraints every
+        # entry has feasible=False and holds the closest palettes found
+        start = time.perf_counter()
+        if not len(self.free):
+            palette = self._palettes(np.empty((1, 0, 3)))
+            return [([Codec.rgb_to_hex(c) for c in palette[0]], float(self.evaluate(palette)[0]), bool(self.feasible(palette)[0]))]
+
+        current = self._random_lch(self.chains)
+        current_score = self.evaluate(self._palettes(current))
+        best, best_score = current.copy(), current_score.copy()
+        step_scale = np.array([0.08, 0.06, 40.0])
+        low, high = self.lightness_range
+
+        step = 0
+        while step < max_steps:
+            elapsed = (time.perf_counter() - start) / time_budget
+            if elapsed >= 1.0:
+                break
+            temperature = 0.05 * (1.0 - elapsed) + 1e-4
+            proposal = current + self.rng.normal(0.0, 1.0, current.shape) * step_scale * (1.0 - 0.8 * elapsed)
+            proposal[..., 0] = np.clip(proposal[..., 0], low, high)
+            proposal[..., 1] = np.clip(proposal[..., 1], 0.0, 0.37)
+            proposal[..., 2] = np.mod(proposal[..., 2], 360.0)
+            proposal = self._snap(proposal)
+            proposal_score = self.evaluate(self._palettes(proposal))
+
+            accept = (proposal_score >= current_score) | (self.rng.random(len(current)) < np.exp(np.minimum(proposal_score - current_score, 0.0) / temperature))
+            current[accept], current_score[accept] = proposal[accept], proposal_score[accept]
+            improved = current_score > best_score
+            best[improved], best_score[improved] = current[improved], current_score[improved]
+
+            # random restarts: reseed the weakest eighth of the chains every 25 steps
+            if step and step % 25 == 0:
+                weakest = np.argsort(current_score)[: max(1, self.chains // 8)]
+                current[weakest] = self._random_lch(len(weakest))
+                current_score[weakest] = self.evaluate(self._palettes(current[weakest]))
+            step += 1
+
+        palettes = self._palettes(best)
+        feasible = self.feasible(palettes)
+        results = []
+        seen = set()
+        for index in np.argsort(-best_score, kind="stable"):
+            hexes = tuple(Codec.rgb_to_hex(c) for c in palettes[index])
+            if hexes in seen:
+                continue
+            seen.add(hexes)
+            results.append((list(hexes), float(best_score[index]), bool(feasible[index])))
+            if len(results) == top_n:
+                break
+        return results
@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+
+import Codec
+import ColorSpace
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# a palette is a (name, colors) pair with colors an (k, 3) uint8 array; every loader returns a sequence of them
+
+FORMATS = ("json", "gpl", "ase", "css", "cpal")
+EXTENSIONS = {".json": "json", ".gpl": "gpl", ".ase": "ase", ".css": "css", ".cpal": "cpal"}
+
+# packed binary layout (little endian): 40-byte header, then 8-byte aligned sections
+#   palette offsets  uint64[count + 1]   start of each palette in the colors section
+#   name offsets     uint64[count + 1]   start of each name in the string table
+#   colors           uint8[total, 3]
+#   string table     utf-8 bytes
+PACKED_MAGIC = b"CPAL"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sHHQQQQ")
+
+ASE_MAGIC = b"ASEF"
+ASE_GROUP_START = 0xC001
+ASE_GROUP_END = 0xC002
+ASE_COLOR = 0x0001
+
+CSS_VARIABLE = re.compile(r"--([A-Za-z0-9_-]+?)-(\d+)\s*:\s*(#[0-9A-Fa-f]{6})\s*;")
+
+
+def as_palette(name, colors):
+    if isinstance(colors, np.ndarray):
+        return str(name), np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+    colors = np.array([Codec.hex_to_rgb(c) if isinstance(c, str) else tuple(c) for c in colors], dtype=np.uint8).reshape(-1, 3)
+    return str(name), colors
+
+
+def format_of(path, fmt=None):
+    fmt = fmt or EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown palette format for {path!r}; use one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def save_palettes(path, palettes, fmt=None):
+    palettes = [as_palette(name, colors) for name, colors in palettes]
+    fmt = format_of(path, fmt)
+    if fmt == "cpal":
+        return save_packed(path, palettes)
+    if fmt == "ase":
+        data = dumps_ase(palettes)
+        mode = "wb"
+    else:
+        data = {"json": dumps_json, "gpl": dumps_gpl, "css": dumps_css}[fmt](palettes)
+        mode = "w"
+    with open(path, mode) as stream:
+        stream.write(data)
+
+
+def load_palettes(path, fmt=None):
+    fmt = format_of(path, fmt)
+    if fmt == "cpal":
+        return PackedPalettes(path)
+    if fmt == "ase":
+        with open(path, "rb") as stream:
+            return loads_ase(stream.read())
+    with open(path) as stream:
+        text = stream.read()
+    return {"json": loads_json, "gpl": loads_gpl, "css": loads_css}[fmt](text)
+
+
+def dumps_json(palettes):
+    return json.dumps({"palettes": [{"name": name, "colors": [str(c) for c in Codec.encode_many(colors)]} for name, colors in palettes]}, indent=2)
+
+
+def loads_json(text):
+    data = json.loads(text)
+    entries = data["palettes"] if isinstance(data, dict) else data
+    return [as_palette(entry.get("name", f"palette {i + 1}"), entry["colors"]) for i, entry in enumerate(entries)]
+
+
+def dumps_gpl(palettes):
+    # one GIMP palette; with several palettes each starts with a "# Palette:" comment that GIMP ignores
+    lines = ["GIMP Palette", f"Name: {palettes[0][0] if len(palettes) == 1 else 'palettes'}", "Columns: 5", "#"]
+    for name, colors in palettes:
+        if len(palettes) > 1:
+            lines.append(f"# Palette: {name}")
+        lines.extend(f"{r:3d} {g:3d} {b:3d}\t{name} {i + 1}" for i, (r, g, b) in enumerate(colors.tolist()))
+    return "\n".join(lines) + "\n"
+
+
+def loads_gpl(text):
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != "GIMP Palette":
+        raise ValueError("Not a GIMP palette: missing 'GIMP Palette' header")
+    name = "palette"
+    palettes = []
+    current = None
+    for line in lines[1:]:
+        line = line.strip()
+        if line.startswith("Name:"):
+            name = line[5:].strip()
+        elif line.startswith("# Palette:"):
+            current = (line[10:].strip(), [])
+            palettes.append(current)
+        elif line and not line.startswith(("#", "Columns:")):
+            parts = line.split()
+            if current is None:
+                current = (name, [])
+                palettes.append(current)
+            current[1].append(tuple(int(value) for value in parts[:3]))
+    return [as_palette(name, colors) for name, colors in palettes]
+
+
+def _ase_string(text):
+    encoded = (text + "\0").encode("utf-16-be")
+    return struct.pack(">H", len(encoded) // 2) + encoded
+
+
+def dumps_ase(palettes):
+    blocks = []
+    for name, colors in palettes:
+        blocks.append(struct.pack(">H", ASE_GROUP_START) + struct.pack(">I", len(_ase_string(name))) + _ase_string(name))
+        for i, (r, g, b) in enumerate(colors.tolist()):
+            body = _ase_string(f"{name} {i + 1}") + b"RGB " + struct.pack(">fffH", r / 255.0, g / 255.0, b / 255.0, 2)
+            blocks.append(struct.pack(">HI", ASE_COLOR, len(body)) + body)
+        blocks.append(struct.pack(">HI", ASE_GROUP_END, 0))
+    return ASE_MAGIC + struct.pack(">HHI", 1, 0, len(blocks)) + b"".join(blocks)
+
+
+def _ase_color(model, values):
+    if model == b"RGB ":
+        r, g, b = values[:3]
+    elif model == b"Gray":
+        r = g = b = values[0]
+    elif model == b"CMYK":
+        c, m, y, k = values[:4]
+        r, g, b = (1 - c) * (1 - k), (1 - m) * (1 - k), (1 - y) * (1 - k)
+    elif model == b"LAB ":
+        # L is stored as 0-1, a and b in Lab units; colors outside sRGB are clipped
+        lightness, a, b = values[:3]
+        return tuple(int(v) for v in ColorSpace.lab_to_rgb(np.array([lightness * 100.0, a, b])))
+    else:
+        raise ValueError(f"Unsupported ASE color model: {model!r}")
+    return tuple(int(round(min(max(v, 0.0), 1.0) * 255)) for v in (r, g, b))
+
+
+def loads_ase(data):
+    if data[:4] != ASE_MAGIC:
+        raise ValueError("Not an Adobe Swatch Exchange file")
+    _, _, count = struct.unpack_from(">HHI", data, 4)
+    position = 12
+    palettes = []
+    current = None
+    for _ in range(count):
+        kind, length = struct.unpack_from(">HI", data, position)
+        body = data[position + 6:position + 6 + length]
+        position += 6 + length
+        if kind == ASE_GROUP_END:
+            current = None
+            continue
+        name_length = struct.unpack_from(">H", body)[0]
+        name = body[2:2 + 2 * name_length].decode("utf-16-be").rstrip("\0")
+        if kind == ASE_GROUP_START:
+            current = (name, [])
+            palettes.append(current)
+        elif kind == ASE_COLOR:
+            offset = 2 + 2 * name_length
+            model = body[offset:offset + 4]
+            channels = {b"RGB ": 3, b"LAB ": 3, b"CMYK": 4, b"Gray": 1}.get(model, 0)
+            values = struct.unpack_from(f">{channels}f", body, offset + 4)
+            if current is None:
+                current = ("swatches", [])
+                palettes.append(current)
+            current[1].append(_ase_color(model, values))
+    return [as_palette(name, colors) for name, colors in palettes]
+
+
+def _css_name(name):
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", name.strip()).strip("-").lower() or "palette"
+
+
+def dumps_css(palettes):
+    lines = [":root {"]
+    for name, colors in palettes:
+        slug = _css_name(name)
+        lines.extend(f"  --{slug}-{i + 1}: {value};" for i, value in enumerate(Codec.encode_many(colors)))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def loads_css(text):
+    # groups "--name-N: #RRGGBB;" custom properties by name, ordered by N
+    groups = {}
+    for name, index, value in CSS_VARIABLE.findall(text):
+        groups.setdefault(name, []).append((int(index), value))
+    return [as_palette(name, [value for _, value in sorted(entries)]) for name, entries in groups.items()]
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+def save_packed(path, palettes):
+    names = [name.encode("utf-8") for name, _ in palettes]
+    sizes = np.array([len(colors) for _, colors in palettes], dtype=np.uint64)
+    palette_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype("<u8")
+    name_offsets = np.concatenate([[0], np.cumsum([len(name) for name in names])]).astype("<u8")
+    colors = np.concatenate([colors for _, colors in palettes]) if palettes else np.empty((0, 3), dtype=np.uint8)
+    write_packed(path, palette_offsets, name_offsets, colors, b"".join(names))
+
+
+def write_packed(path, palette_offsets, name_offsets, colors, strings):
+    # low-level writer for callers that already hold the packed arrays, e.g. when appending to a library
+    palette_offsets = np.asarray(palette_offsets, dtype="<u8")
+    name_offsets = np.asarray(name_offsets, dtype="<u8")
+    colors = np.ascontiguousarray(colors, dtype=np.uint8).reshape(-1, 3)
+    strings = bytes(strings)
+    header = PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, 0, len(palette_offsets) - 1, len(colors), len(strings), 0)
+    # write to a sibling file first so readers with the old file mapped are never disturbed
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as stream:
+        for section in (header, palette_offsets.tobytes(), name_offsets.tobytes(), colors.tobytes(), strings):
+            stream.write(section)
+            stream.write(b"\0" * (_aligned(len(section)) - len(section)))
+    os.replace(temp_path, path)
+
+
+class PackedPalettes(object):
+    # read-only, memory-mapped view of a .cpal file: opening costs a header read, and palettes are sliced
+    # out of the shared colors array on demand without parsing anything per entry
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as stream:
+            magic, version, _, count, total, string_bytes, _ = PACKED_HEADER.unpack(stream.read(PACKED_HEADER.size))
+        if magic != PACKED_MAGIC:
+            raise ValueError(f"Not a packed palette file: {path}")
+        if version != PACKED_VERSION:
+            raise ValueError(f"Unsupported packed palette version {version} in {path}")
+        self.count = count
+        offset = _aligned(PACKED_HEADER.size)
+        self.palette_offsets = np.memmap(path, dtype="<u8", mode="r", offset=offset, shape=(count + 1,))
+        offset += _aligned(8 * (count + 1))
+        self.name_offsets = np.memmap(path, dtype="<u8", mode="r", offset=offset, shape=(count + 1,))
+        offset += _aligned(8 * (count + 1))
+        self.colors = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(total, 3)) if total else np.empty((0, 3), dtype=np.uint8)
+        offset += _aligned(3 * total)
+        self.strings = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(string_bytes,)) if string_bytes else np.empty(0, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def sizes(self):
+        return np.diff(self.palette_offsets)
+
+    def name(self, index):
+        return self.strings[int(self.name_offsets[index]):int(self.name_offsets[index + 1])].tobytes().decode("utf-8")
+
+    def palette_colors(self, index):
+        return self.colors[int(self.palette_offsets[index]):int(self.palette_offsets[index + 1])]
+
+    def uniform(self):
+        # (count, k, 3) view when every palette has the same size, else None
+        sizes = self.sizes
+        if not len(sizes) or (sizes != sizes[0]).any():
+            return None
+        return self.colors.reshape(self.count, int(sizes[0]), 3)
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError(f"Palette index {index} out of range for {self.count} palettes")
+        index %= self.count
+        return self.name(index), self.palette_colors(index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert palette files between JSON, GPL, ASE, CSS and the packed .cpal format.")
+    parser.add_argument("inputs", nargs="+", help="palette files to read; their palettes are concatenated in order")
+    parser.add_argument("-o", "--output", required=True, help="file to write; the format follows the extension")
+    parser.add_argument("-f", "--format", choices=FORMATS, default=None, help="output format when the extension is ambiguous")
+    args = parser.parse_args(argv)
+
+    palettes = []
+    try:
+        for path in args.inputs:
+            palettes.extend(load_palettes(path))
+        save_palettes(args.output, palettes, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {len(palettes)} palettes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
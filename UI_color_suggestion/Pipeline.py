@@ -0,0 +1,151 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Cache import ResultCache
+from Engine import ColorEngine
+from Extraction import ImageColorExtractor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+_worker_extractor = None
+_worker_cache = None
+
+
+def _init_worker(sample_size, method, bits, cache_dir):
+    global _worker_extractor, _worker_cache
+    _worker_extractor = ImageColorExtractor(sample_size=sample_size, method=method, bits=bits)
+    _worker_cache = ResultCache(cache_dir=cache_dir) if cache_dir else None
+
+
+def _extract_one(image_path):
+    try:
+        if _worker_cache is not None:
+            color = _worker_cache.get_or_compute(image_path, _worker_extractor.cache_params(), lambda: list(_worker_extractor.extract(image_path)))
+        else:
+            color = _worker_extractor.extract(image_path)
+        return {"path": image_path, "hex": ColorEngine.rgb_to_hex(color), "r": color[0], "g": color[1], "b": color[2], "error": ""}
+    except Exception as e:
+        return {"path": image_path, "hex": "", "r": "", "g": "", "b": "", "error": str(e)}
+
+
+def iter_image_paths(sources, recursive=True):
+    for source in sources:
+        if source == "-":
+            for line in sys.stdin:
+                line = line.strip()
+                if line:
+                    yield line
+        elif source.startswith("@"):
+            with open(source[1:]) as file_list:
+                for line in file_list:
+                    line = line.strip()
+                    if line:
+                        yield line
+        elif os.path.isdir(source):
+            for dirpath, dirnames, filenames in os.walk(source):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(IMAGE_EXTENSIONS):
+                        yield os.path.join(dirpath, filename)
+                if not recursive:
+                    break
+        else:
+            yield source
+
+
+class CsvResultWriter(object):
+    FIELDS = ["path", "hex", "r", "g", "b", "error"]
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=self.FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        self.writer.writerow(result)
+        self.stream.flush()
+
+
+class JsonlResultWriter(object):
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, result):
+        self.stream.write(json.dumps(result) + "\n")
+        self.stream.flush()
+
+
+WRITERS = {"csv": CsvResultWriter, "jsonl": JsonlResultWriter}
+
+
+class DominantColorPipeline(object):
+    # streams paths through decode -> downsample -> dominant color with a bounded number of in-flight jobs
+
+    def __init__(self, sample_size=50, method="common", bits=8, workers=None, max_pending=None, cache_dir=None):
+        if method not in ImageColorExtractor.METHODS:
+            raise ValueError(f"Unknown extraction method: {method!r}")
+        self.sample_size = sample_size
+        self.method = method
+        self.bits = bits
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+
+    def run(self, paths, writer):
+        processed = 0
+        failed = 0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.sample_size, self.method, self.bits, self.cache_dir)) as executor:
+            pending = set()
+            for path in paths:
+                if len(pending) >= self.max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        failed += bool(result["error"])
+                        processed += 1
+                        writer.write(result)
+                pending.add(executor.submit(_extract_one, path))
+            for future in pending:
+                result = future.result()
+                failed += bool(result["error"])
+                processed += 1
+                writer.write(result)
+        return processed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract dominant colors from directories or lists of images.")
+    parser.add_argument("sources", nargs="+", help="image files, directories, @file-list or - for paths on stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), help="output format (default: from the output extension, else csv)")
+    parser.add_argument("-m", "--method", choices=ImageColorExtractor.METHODS, default="common")
+    parser.add_argument("-s", "--sample-size", type=int, default=50)
+    parser.add_argument("-b", "--bits", type=int, default=8, help="bits per channel for the histogram method (1-8)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None, help="max images in flight (default: 4 per worker)")
+    parser.add_argument("--no-recursive", action="store_true")
+    parser.add_argument("--cache-dir", default=None, help="reuse results for unchanged files from this directory")
+    args = parser.parse_args(argv)
+
+    output_format = args.format
+    if output_format is None:
+        output_format = "jsonl" if args.output.endswith((".jsonl", ".json")) else "csv"
+
+    pipeline = DominantColorPipeline(sample_size=args.sample_size, method=args.method, bits=args.bits, workers=args.workers, max_pending=args.max_pending, cache_dir=args.cache_dir)
+    paths = iter_image_paths(args.sources, recursive=not args.no_recursive)
+
+    if args.output == "-":
+        processed, failed = pipeline.run(paths, WRITERS[output_format](sys.stdout))
+    else:
+        with open(args.output, "w", newline="") as stream:
+            processed, failed = pipeline.run(paths, WRITERS[output_format](stream))
+    print(f"Processed {processed} images ({failed} failed)", file=sys.stderr)
+    return 1 if failed and failed == processed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import ColorSpace
+import Trace
+from Clustering import DominantPaletteExtractor
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+
+class PaletteQuantizer(object):
+    # top-k palette with pixel shares by median cut or octree reduction: one pass bins every pixel into a
+    # 2**(3 * bits) color histogram (linear in pixel count), and the quantizer only ever touches the occupied
+    # bins; clusters closer than merge_delta (CIELAB Delta E 1976) are folded together before the top k are taken
+
+    METHODS = ("median_cut", "octree")
+
+    def __init__(self, num_colors=5, method="median_cut", bits=5, merge_delta=10.0, oversample=3):
+        if num_colors < 1:
+            raise ValueError(f"num_colors must be at least 1, got {num_colors!r}")
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown quantization method: {method!r}")
+        if not 1 <= int(bits) <= 8:
+            raise ValueError(f"Bits per channel must be between 1 and 8, got {bits!r}")
+        self.num_colors = int(num_colors)
+        self.method = method
+        self.bits = int(bits)
+        self.merge_delta = float(merge_delta)
+        # clusters built per requested color, so merging near-duplicates still leaves num_colors distinct ones
+        self.oversample = int(oversample)
+
+    def histogram(self, pixels):
+        # occupied bins as (bin keys, pixel counts, per-channel pixel sums)
+        shift = 8 - self.bits
+        pixels = np.asarray(pixels)
+        quantized = (pixels >> shift).astype(np.intp)
+        keys = (quantized[:, 0] << (2 * self.bits)) | (quantized[:, 1] << self.bits) | quantized[:, 2]
+        size = 1 << (3 * self.bits)
+        counts = np.bincount(keys, minlength=size)
+        occupied = np.flatnonzero(counts)
+        sums = np.stack([np.bincount(keys, weights=pixels[:, c], minlength=size)[occupied] for c in range(3)], axis=1)
+        return occupied, counts[occupied].astype(np.float64), sums
+
+    def median_cut(self, means, counts, target):
+        # repeatedly splits the box with the largest pixel-weighted channel range at its weighted median
+        def measured(box):
+            spread = np.ptp(means[box], axis=0) if len(box) > 1 else np.zeros(3)
+            return box, float(spread.max() * counts[box].sum()), int(spread.argmax())
+
+        boxes = [measured(np.arange(len(means)))]
+        while len(boxes) < target:
+            best = max(range(len(boxes)), key=lambda i: boxes[i][1])
+            if boxes[best][1] <= 0.0:
+                break
+            box, _, channel = boxes.pop(best)
+            box = box[np.argsort(means[box, channel], kind="stable")]
+            cumulative = np.cumsum(counts[box])
+            cut = int(np.searchsorted(cumulative, cumulative[-1] / 2.0)) + 1
+            cut = min(max(cut, 1), len(box) - 1)
+            boxes.extend((measured(box[:cut]), measured(box[cut:])))
+        labels = np.empty(len(means), dtype=np.intp)
+        for i, (box, _, _) in enumerate(boxes):
+            labels[box] = i
+        return labels
+
+    def octree(self, keys, counts, target):
+        # leaves start as the histogram bins (depth `bits`); the smallest subtrees at the deepest level are
+        # folded into their parents until at most `target` leaves remain
+        bits = self.bits
+        r, g, b = keys >> (2 * bits), (keys >> bits) & ((1 << bits) - 1), keys & ((1 << bits) - 1)
+        codes = np.zeros(len(keys), dtype=np.int64)
+        for level in range(bits):
+            bit = bits - 1 - level
+            codes = (codes << 3) | (((r >> bit) & 1) << 2) | (((g >> bit) & 1) << 1) | ((b >> bit) & 1)
+        # leaves are (code, depth) pairs; `owner` maps every histogram bin to the leaf that holds it
+        leaf_codes, owner = codes, np.arange(len(keys))
+        depths = np.full(len(keys), bits)
+        leaf_counts = counts.copy()
+        while len(leaf_codes) > target and depths.max() > 0:
+            deepest = depths.max()
+            at = np.flatnonzero(depths == deepest)
+            parents, inverse = np.unique(leaf_codes[at] >> 3, return_inverse=True)
+            parent_counts = np.bincount(inverse, weights=leaf_counts[at])
+            children = np.bincount(inverse)
+            order = np.argsort(parent_counts, kind="stable")
+            # folding a parent removes children - 1 leaves; fold the lightest parents until enough are gone
+            removed = np.cumsum(children[order] - 1)
+            needed = len(leaf_codes) - target
+            chosen = order[:int(np.searchsorted(removed, needed)) + 1]
+            fold = np.zeros(len(parents), dtype=bool)
+            fold[chosen] = True
+            folded = fold[inverse]
+            keep = np.ones(len(leaf_codes), dtype=bool)
+            keep[at[folded]] = False
+            # new leaves for the folded parents go after the kept ones
+            kept = np.flatnonzero(keep)
+            new_index = np.full(len(parents), -1)
+            new_index[chosen] = len(kept) + np.arange(len(chosen))
+            remap = np.empty(len(leaf_codes), dtype=np.intp)
+            remap[kept] = np.arange(len(kept))
+            remap[at[folded]] = new_index[inverse[folded]]
+            owner = remap[owner]
+            leaf_codes = np.concatenate([leaf_codes[kept], parents[chosen]])
+            depths = np.concatenate([depths[kept], np.full(len(chosen), deepest - 1)])
+            leaf_counts = np.bincount(remap, weights=leaf_counts, minlength=len(leaf_codes))
+        return owner
+
+    def merge(self, colors, weights):
+        # greedy, heaviest first: a cluster within merge_delta of a kept one is folded into it
+        order = np.argsort(-weights, kind="stable")
+        colors, weights = colors[order], weights[order]
+        lab = ColorSpace.rgb_to_lab(np.clip(np.rint(colors), 0, 255).astype(np.uint8))
+        kept_colors, kept_weights, kept_lab = [], [], []
+        for color, weight, point in zip(colors, weights, lab):
+            if kept_lab:
+                distances = np.sqrt(((np.asarray(kept_lab) - point) ** 2).sum(axis=1))
+                nearest = int(distances.argmin())
+                if distances[nearest] < self.merge_delta:
+                    total = kept_weights[nearest] + weight
+                    kept_colors[nearest] = (kept_colors[nearest] * kept_weights[nearest] + color * weight) / total
+                    kept_weights[nearest] = total
+                    continue
+            kept_colors.append(color.astype(np.float64))
+            kept_weights.append(weight)
+            kept_lab.append(point)
+        return np.asarray(kept_colors), np.asarray(kept_weights)
+
+    def extract(self, image):
+        # ([(r, g, b)], [share]) for at most num_colors colors, largest share first; shares are of all pixels
+        pixels = DominantPaletteExtractor.pixels_of(image)
+        with Trace.span(f"quantize.{self.method}", pixels=len(pixels), k=self.num_colors):
+            keys, counts, sums = self.histogram(pixels)
+            target = self.num_colors * self.oversample
+            if self.method == "octree":
+                labels = self.octree(keys, counts, target)
+            else:
+                labels = self.median_cut(sums / counts[:, None], counts, target)
+            weights = np.bincount(labels, weights=counts)
+            colors = np.stack([np.bincount(labels, weights=sums[:, c]) for c in range(3)], axis=1)
+            filled = weights > 0
+            colors, weights = self.merge(colors[filled] / weights[filled, None], weights[filled])
+        top = np.argsort(-weights, kind="stable")[:self.num_colors]
+        shares = weights[top] / float(len(pixels))
+        return [tuple(int(c) for c in np.clip(np.rint(colors[i]), 0, 255)) for i in top], [float(share) for share in shares]
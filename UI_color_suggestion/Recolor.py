@@ -0,0 +1,173 @@
+import argparse
+import sys
+
+import Codec
+import ColorSpace
+from Clustering import DominantPaletteExtractor
+from LazyImport import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+MATCH_MODES = ("order", "lightness")
+# palettes are extracted from a strided view of about this many pixels instead of the full frame
+PALETTE_PIXELS = 1 << 20
+
+
+class PaletteRecolorer(object):
+    # moves every pixel by a smooth OKLab offset that carries each source color onto its target color
+    # the offsets are baked into a (2**bits)**3 RGB lookup table of int16 deltas, so recoloring is one
+    # table gather per pixel and the fine detail below the table resolution is kept
+
+    def __init__(self, source_palette, target_palette, bits=6, match="order", power=2.0):
+        if len(source_palette) != len(target_palette) or not len(source_palette):
+            raise ValueError("Source and target palettes must be non-empty and the same length")
+        if not 3 <= int(bits) <= 7:
+            raise ValueError(f"Bits per channel must be between 3 and 7, got {bits!r}")
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown palette match mode: {match!r}")
+        self.source = self.as_palette(source_palette)
+        self.target = self.as_palette(target_palette)
+        if match == "lightness":
+            self.target = self.target[self.lightness_pairing(self.source, self.target)]
+        self.bits = int(bits)
+        self.power = float(power)
+        self.lut = self.build_lut()
+
+    @staticmethod
+    def as_palette(palette):
+        return np.array([Codec.hex_to_rgb(c) if isinstance(c, str) else tuple(c) for c in palette], dtype=np.uint8)
+
+    @staticmethod
+    def lightness_pairing(source, target):
+        # darkest source goes to the darkest target, and so on up
+        order = np.empty(len(source), dtype=np.intp)
+        order[np.argsort(ColorSpace.rgb_to_oklab(source)[:, 0], kind="stable")] = np.argsort(ColorSpace.rgb_to_oklab(target)[:, 0], kind="stable")
+        return order
+
+    def build_lut(self):
+        size = 1 << self.bits
+        shift = 8 - self.bits
+        levels = (np.arange(size) << shift) + ((1 << shift) >> 1)
+        grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1).reshape(-1, 3).astype(np.uint8)
+
+        grid_lab = ColorSpace.rgb_to_oklab(grid)
+        source_lab = ColorSpace.rgb_to_oklab(self.source)
+        offsets = ColorSpace.rgb_to_oklab(self.target) - source_lab
+        # Shepard (inverse distance) weights: exact at the source colors and smooth in between
+        distances = ((grid_lab[:, None, :] - source_lab[None, :, :]) ** 2).sum(axis=-1)
+        weights = 1.0 / np.maximum(distances, 1e-9) ** (self.power / 2.0)
+        weights /= weights.sum(axis=1, keepdims=True)
+        moved = ColorSpace.oklab_to_rgb(grid_lab + weights @ offsets)
+        return (moved.astype(np.int16) - grid.astype(np.int16)).reshape(size, size, size, 3)
+
+    def recolor_tile(self, tile, channel_order="rgb"):
+        if tile.dtype != np.uint8 or tile.ndim != 3 or tile.shape[2] not in (3, 4):
+            raise ValueError(f"Expected 8-bit RGB or RGBA pixels, got {tile.dtype} with shape {tile.shape}")
+        shift = 8 - self.bits
+        if channel_order == "bgr":
+            delta = self.lut[tile[..., 2] >> shift, tile[..., 1] >> shift, tile[..., 0] >> shift][..., ::-1]
+        else:
+            delta = self.lut[tile[..., 0] >> shift, tile[..., 1] >> shift, tile[..., 2] >> shift]
+        return np.clip(tile[..., :3] + delta, 0, 255).astype(np.uint8)
+
+    def recolor(self, image, out=None, tile_rows=256, channel_order="rgb"):
+        # image and out may be memmaps; only one band of tile_rows rows is materialized at a time,
+        # and out may be image itself to recolor in place
+        if out is None:
+            out = np.empty_like(image)
+        for top in range(0, image.shape[0], tile_rows):
+            band = slice(top, top + tile_rows)
+            out[band, :, :3] = self.recolor_tile(np.asarray(image[band]), channel_order)
+            if out.shape[2] > 3 and out is not image:
+                out[band, :, 3:] = image[band, :, 3:]
+        return out
+
+
+def as_8bit_color(image):
+    # decoded BGR(A) image of any depth cv2 reads -> uint8 with 3 or 4 channels
+    if image.dtype == np.uint16:
+        image = (image >> 8).astype(np.uint8)
+    elif image.dtype != np.uint8:
+        raise ValueError(f"Unsupported image depth: {image.dtype}")
+    if image.ndim == 3 and image.shape[2] == 1:
+        image = image[..., 0]
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 2:
+        # gray + alpha
+        gray, alpha = image[..., 0], image[..., 1]
+        return np.stack([gray, gray, gray, alpha], axis=-1)
+    if image.shape[2] not in (3, 4):
+        raise ValueError(f"Unsupported channel count: {image.shape[2]}")
+    return image
+
+
+def palette_of(image, num_colors, channel_order="rgb"):
+    # dominant palette from a strided view so an 8K frame is never copied whole
+    step = max(1, int(np.sqrt(image.shape[0] * image.shape[1] / PALETTE_PIXELS)))
+    sample = np.ascontiguousarray(image[::step, ::step, :3])
+    if channel_order == "bgr":
+        sample = sample[..., ::-1]
+    colors, shares = DominantPaletteExtractor(num_colors=num_colors, random_state=0).extract(sample)
+    return colors
+
+
+def recolor_file(source_path, output_path, target_palette, source_palette=None, bits=6, match="order", tile_rows=256):
+    # .npy files are memory-mapped on both ends; encoded images are decoded once and recolored in place
+    if source_path.endswith(".npy"):
+        image = np.load(source_path, mmap_mode="r")
+        if image.dtype != np.uint8 or image.ndim != 3 or image.shape[2] not in (3, 4):
+            raise ValueError(f"Expected an (H, W, 3) or (H, W, 4) uint8 array, got {image.dtype} with shape {image.shape}")
+        channel_order = "rgb"
+    else:
+        image = cv2.imread(source_path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError(f"Could not decode image: {source_path}")
+        # 16-bit files are recolored at 8 bits per channel, and gray or gray + alpha become BGR(A)
+        image = as_8bit_color(image)
+        channel_order = "bgr"
+
+    if source_palette is None:
+        source_palette = palette_of(image, len(target_palette), channel_order)
+    recolorer = PaletteRecolorer(source_palette, target_palette, bits=bits, match=match)
+
+    if output_path.endswith(".npy"):
+        out = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=image.shape)
+        recolorer.recolor(image, out, tile_rows, channel_order)
+        out.flush()
+        return recolorer
+    if channel_order == "rgb":
+        out = np.empty(image.shape, dtype=np.uint8)
+        recolorer.recolor(image, out, tile_rows, channel_order)
+        image = cv2.cvtColor(out, cv2.COLOR_RGBA2BGRA if out.shape[2] == 4 else cv2.COLOR_RGB2BGR, dst=out)
+    else:
+        recolorer.recolor(image, image, tile_rows, channel_order)
+    if not cv2.imwrite(output_path, image):
+        raise ValueError(f"Could not write image: {output_path}")
+    return recolorer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recolor an image by mapping its dominant palette onto a target palette.")
+    parser.add_argument("source", help="input image, or an RGB .npy array to memory-map")
+    parser.add_argument("output", help="output image, or .npy for a memory-mapped RGB array")
+    parser.add_argument("-t", "--to", nargs="+", required=True, metavar="HEX", help="target palette, main color first")
+    parser.add_argument("--from", dest="source_palette", nargs="+", metavar="HEX", help="source palette (default: extracted from the image)")
+    parser.add_argument("-b", "--bits", type=int, default=6, help="lookup table bits per channel (3-7)")
+    parser.add_argument("-m", "--match", choices=MATCH_MODES, default="order", help="pair colors by dominance order or by lightness")
+    parser.add_argument("--tile-rows", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    try:
+        recolorer = recolor_file(args.source, args.output, args.to, args.source_palette, args.bits, args.match, args.tile_rows)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for source, target in zip(recolorer.source, recolorer.target):
+        print(f"{Codec.rgb_to_hex(tuple(source))} -> {Codec.rgb_to_hex(tuple(target))}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
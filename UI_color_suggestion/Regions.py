@@ -0,0 +1,165 @@
+import argparse
+import json
+import sys
+
+import Codec
+import Trace
+from Clustering import DominantPaletteExtractor
+from Extraction import ImageColorExtractor
+from LazyImport import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+
+class RegionColorExtractor(object):
+    # colors of many rectangles from one pass over the image: a summed-area table of the pixels gives every
+    # rectangle's mean in O(1), and one of the one-hot palette labels gives its color histogram in O(k)
+    # rectangles are (x, y, width, height) in source-image pixels
+
+    def __init__(self, num_colors=8, max_side=1024, random_state=0):
+        if num_colors < 1:
+            raise ValueError(f"num_colors must be at least 1, got {num_colors!r}")
+        self.num_colors = int(num_colors)
+        self.max_side = int(max_side)
+        self.palette_extractor = DominantPaletteExtractor(num_colors=num_colors, warm_start=False, random_state=random_state)
+        self.image = None
+        self.scale = 1.0
+        self.source_size = None
+        self.palette = None
+        self.color_table = None
+        self.label_table = None
+        self.labels = None
+
+    def load(self, image_path, task=None):
+        # decode no larger than needed for the working resolution; a Worker task gets progress and may cancel
+        header = ImageColorExtractor.read_header(image_path)
+        min_size = None
+        if header:
+            width, height = header[1]
+            min_size = max(1, min(width, height) * self.max_side // max(width, height))
+        image = ImageColorExtractor.load_image(image_path, min_size)
+        if task is not None:
+            task.report(0.5)
+            task.check_cancelled()
+        self.prepare(image, source_size=header[1] if header else None)
+        if task is not None:
+            task.report(1.0)
+        return self
+
+    def prepare(self, image, source_size=None):
+        image = np.asarray(image)[..., :3]
+        if image.ndim != 3 or not image.size:
+            raise ValueError(f"Expected a non-empty RGB image, got shape {image.shape}")
+        height, width = image.shape[:2]
+        self.source_size = tuple(source_size) if source_size else (width, height)
+        if max(width, height) > self.max_side:
+            factor = self.max_side / float(max(width, height))
+            with Trace.span("cv2.resize"):
+                image = cv2.resize(image, (max(1, round(width * factor)), max(1, round(height * factor))), interpolation=cv2.INTER_AREA)
+        self.image = np.ascontiguousarray(image)
+        self.scale = self.image.shape[1] / float(self.source_size[0])
+
+        with Trace.span("regions.palette"):
+            colors, shares = self.palette_extractor.extract(self.image)
+            self.palette = np.array(colors, dtype=np.uint8)
+            pixels = self.image.reshape(-1, 3).astype(np.float32)
+            self.labels = self.palette_extractor.squared_distances(pixels, self.palette.astype(np.float32)).argmin(axis=1).reshape(self.image.shape[:2])
+        with Trace.span("regions.integral"):
+            self.color_table = self.integral(self.image.astype(np.float64))
+            one_hot = np.zeros(self.image.shape[:2] + (len(self.palette),), dtype=np.uint32)
+            np.put_along_axis(one_hot, self.labels[..., None], 1, axis=2)
+            self.label_table = self.integral(one_hot)
+        return self
+
+    @staticmethod
+    def integral(values):
+        # (H, W, C) -> (H + 1, W + 1, C) summed-area table with a zero first row and column
+        table = np.zeros((values.shape[0] + 1, values.shape[1] + 1, values.shape[2]), dtype=values.dtype)
+        np.cumsum(values, axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    def _corners(self, rects):
+        if self.color_table is None:
+            raise ValueError("Call prepare() or load() before querying regions")
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        height, width = self.image.shape[:2]
+        x0 = np.clip(np.floor(rects[:, 0] * self.scale), 0, width - 1).astype(np.intp)
+        y0 = np.clip(np.floor(rects[:, 1] * self.scale), 0, height - 1).astype(np.intp)
+        x1 = np.clip(np.ceil((rects[:, 0] + rects[:, 2]) * self.scale), x0 + 1, width).astype(np.intp)
+        y1 = np.clip(np.ceil((rects[:, 1] + rects[:, 3]) * self.scale), y0 + 1, height).astype(np.intp)
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _box_sums(table, x0, y0, x1, y1):
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+    def region_means(self, rects):
+        x0, y0, x1, y1 = self._corners(rects)
+        area = ((x1 - x0) * (y1 - y0)).astype(np.float64)
+        sums = self._box_sums(self.color_table, x0, y0, x1, y1)
+        return np.rint(sums / area[:, None]).astype(np.uint8)
+
+    def region_histograms(self, rects):
+        # (N, k) pixel counts of each palette color inside each rectangle
+        # uint32 wrap-around cancels out: every true box count fits, so the modular result is exact
+        x0, y0, x1, y1 = self._corners(rects)
+        return self._box_sums(self.label_table, x0, y0, x1, y1).astype(np.int64)
+
+    def region_colors(self, rects):
+        # dominant palette color of every rectangle and the share of the rectangle it covers
+        counts = self.region_histograms(rects)
+        winner = counts.argmax(axis=1)
+        shares = counts[np.arange(len(counts)), winner] / counts.sum(axis=1).astype(np.float64)
+        return self.palette[winner], shares
+
+    def mask_colors(self, region_map):
+        # region_map: integer array the size of the working image (or the source image), 0 = ignore,
+        # 1..R = region id; returns (R, 3) dominant colors and (R,) shares from a single bincount
+        region_map = np.asarray(region_map)
+        if region_map.shape != self.labels.shape:
+            region_map = cv2.resize(region_map.astype(np.int32), self.labels.shape[::-1], interpolation=cv2.INTER_NEAREST)
+        regions = int(region_map.max())
+        k = len(self.palette)
+        counts = np.bincount((region_map.astype(np.intp) * k + self.labels).ravel(), minlength=(regions + 1) * k).reshape(regions + 1, k)[1:]
+        winner = counts.argmax(axis=1)
+        totals = np.maximum(counts.sum(axis=1), 1)
+        return self.palette[winner], counts[np.arange(regions), winner] / totals.astype(np.float64)
+
+
+def load_regions(path):
+    # JSON list of {"name": ..., "rect": [x, y, width, height]}
+    with open(path) as stream:
+        regions = json.load(stream)
+    for region in regions:
+        if len(region.get("rect", ())) != 4:
+            raise ValueError(f"Region needs a rect of [x, y, width, height]: {region!r}")
+    return regions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dominant and mean colors of named rectangles in an image.")
+    parser.add_argument("image")
+    parser.add_argument("regions", help='JSON list of {"name": ..., "rect": [x, y, width, height]}')
+    parser.add_argument("-k", "--num-colors", type=int, default=8, help="palette size used for dominant colors")
+    parser.add_argument("--max-side", type=int, default=1024, help="working resolution (longest side)")
+    args = parser.parse_args(argv)
+
+    try:
+        regions = load_regions(args.regions)
+        extractor = RegionColorExtractor(args.num_colors, args.max_side).load(args.image)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    rects = [region["rect"] for region in regions]
+    colors, shares = extractor.region_colors(rects)
+    means = extractor.region_means(rects)
+    for region, color, share, mean in zip(regions, colors, shares, means):
+        print(json.dumps({"name": region.get("name", ""), "rect": region["rect"], "dominant": Codec.rgb_to_hex(tuple(color)),
+                          "share": round(float(share), 4), "mean": Codec.rgb_to_hex(tuple(mean))}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
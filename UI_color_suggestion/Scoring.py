@@ -0,0 +1,144 @@
+import ColorSpace
+from LazyImport import lazy_import
+
+np = lazy_import("numpy")
+
+# all functions take uint8 RGB arrays of shape (..., 3) and broadcast like NumPy arithmetic
+
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+# Machado, Oliveira & Fernandes (2009) simulation matrices at full severity, applied in linear RGB
+CVD_MATRICES = {
+    "protanopia": ((0.152286, 1.052583, -0.204868),
+                   (0.114503, 0.786281, 0.099216),
+                   (-0.003882, -0.048116, 1.051998)),
+    "deuteranopia": ((0.367322, 0.860646, -0.227968),
+                     (0.280085, 0.672501, 0.047413),
+                     (-0.011820, 0.042940, 0.968881)),
+    "tritanopia": ((1.255528, -0.076749, -0.178779),
+                   (-0.078411, 0.930809, 0.147602),
+                   (0.004733, 0.691367, 0.303900)),
+}
+
+# APCA-W3 0.0.98G constants
+APCA_TRC = 2.4
+APCA_COEFFICIENTS = (0.2126729, 0.7151522, 0.0721750)
+APCA_BLACK_THRESHOLD = 0.022
+APCA_BLACK_CLAMP = 1.414
+APCA_DELTA_Y_MIN = 0.0005
+APCA_LOW_CLIP = 0.1
+APCA_OFFSET = 0.027
+APCA_SCALE = 1.14
+
+# WCAG 2.x thresholds
+WCAG_AA_TEXT = 4.5
+WCAG_AA_LARGE = 3.0
+WCAG_AAA_TEXT = 7.0
+
+
+def relative_luminance(rgb):
+    return ColorSpace.srgb_to_linear(np.asarray(rgb, dtype=np.uint8)) @ np.asarray(LUMINANCE_WEIGHTS)
+
+
+def contrast_ratio(foreground, background):
+    first = relative_luminance(foreground)
+    second = relative_luminance(background)
+    return (np.maximum(first, second) + 0.05) / (np.minimum(first, second) + 0.05)
+
+
+def pairwise_contrast(palette):
+    # (..., k, 3) -> (..., k, k) WCAG contrast ratio of every pair in each palette
+    luminance = relative_luminance(palette)
+    first, second = luminance[..., :, None], luminance[..., None, :]
+    return (np.maximum(first, second) + 0.05) / (np.minimum(first, second) + 0.05)
+
+
+def _apca_luminance(rgb):
+    y = (np.asarray(rgb, dtype=np.float64) / 255.0) ** APCA_TRC @ np.asarray(APCA_COEFFICIENTS)
+    return np.where(y < APCA_BLACK_THRESHOLD, y + (APCA_BLACK_THRESHOLD - np.minimum(y, APCA_BLACK_THRESHOLD)) ** APCA_BLACK_CLAMP, y)
+
+
+def apca_contrast(text, background):
+    # signed lightness contrast Lc: positive for dark text on light background, negative for the reverse
+    y_text = _apca_luminance(text)
+    y_background = _apca_luminance(background)
+    normal = (y_background ** 0.56 - y_text ** 0.57) * APCA_SCALE
+    reverse = (y_background ** 0.65 - y_text ** 0.62) * APCA_SCALE
+    sapc = np.where(y_background > y_text, normal, reverse)
+    out = np.where(y_background > y_text,
+                   np.where(sapc < APCA_LOW_CLIP, 0.0, sapc - APCA_OFFSET),
+                   np.where(sapc > -APCA_LOW_CLIP, 0.0, sapc + APCA_OFFSET))
+    out = np.where(np.abs(y_background - y_text) < APCA_DELTA_Y_MIN, 0.0, out)
+    return out * 100.0
+
+
+def simulate_cvd(rgb, kind):
+    if kind not in CVD_MATRICES:
+        raise ValueError(f"Unknown color vision deficiency: {kind!r}")
+    linear = ColorSpace.srgb_to_linear(np.asarray(rgb, dtype=np.uint8))
+    simulated = linear @ np.asarray(CVD_MATRICES[kind]).T
+    return ColorSpace.linear_to_srgb(simulated)
+
+
+def pairwise_delta_e(palette):
+    lab = ColorSpace.rgb_to_lab(np.asarray(palette, dtype=np.uint8))
+    return np.sqrt(((lab[..., :, None, :] - lab[..., None, :, :]) ** 2).sum(axis=-1))
+
+
+def _min_off_diagonal(matrix):
+    k = matrix.shape[-1]
+    if k < 2:
+        return np.full(matrix.shape[:-2], np.inf)
+    masked = np.where(np.eye(k, dtype=bool), np.inf, matrix)
+    return masked.min(axis=(-2, -1))
+
+
+def cvd_min_delta(palette):
+    # worst-case Delta E between any two palette colors across normal vision and every simulated deficiency
+    palette = np.asarray(palette, dtype=np.uint8)
+    worst = _min_off_diagonal(pairwise_delta_e(palette))
+    for kind in CVD_MATRICES:
+        worst = np.minimum(worst, _min_off_diagonal(pairwise_delta_e(simulate_cvd(palette, kind))))
+    return worst
+
+
+def score_palettes(palettes, min_contrast=WCAG_AA_LARGE, min_delta=10.0):
+    # palettes: (M, k, 3) with the main color in slot 0; returns per-palette metrics and a combined score in [0, 1]
+    palettes = np.asarray(palettes, dtype=np.uint8)
+    if palettes.ndim == 2:
+        palettes = palettes[None]
+    contrast = pairwise_contrast(palettes)
+    main_contrast = contrast[:, 0, 1:].min(axis=1) if palettes.shape[1] > 1 else np.full(len(palettes), 21.0)
+    apca = np.abs(apca_contrast(palettes[:, 1:], palettes[:, :1])).min(axis=1) if palettes.shape[1] > 1 else np.full(len(palettes), 108.0)
+    delta = cvd_min_delta(palettes)
+    contrast_score = np.clip(main_contrast / min_contrast, 0.0, 1.0)
+    delta_score = np.clip(delta / min_delta, 0.0, 1.0)
+    apca_score = np.clip(apca / 60.0, 0.0, 1.0)
+    score = 0.5 * contrast_score + 0.3 * delta_score + 0.2 * apca_score
+    return {"score": score, "min_contrast": main_contrast, "min_apca": apca, "cvd_min_delta": delta,
+            "passes": (main_contrast >= min_contrast) & (delta >= min_delta)}
+
+
+def score_candidates(main_color, candidates, min_contrast=WCAG_AA_LARGE):
+    # score every candidate as a companion to the main color, in one vectorized pass
+    main = np.asarray(main_color, dtype=np.uint8).reshape(1, 3)
+    candidates = np.asarray(candidates, dtype=np.uint8).reshape(-1, 3)
+    pairs = np.stack([np.broadcast_to(main, candidates.shape), candidates], axis=1)
+    return score_palettes(pairs, min_contrast=min_contrast)
+
+
+def rank_candidates(main_color, candidates, count, min_contrast=WCAG_AA_LARGE, min_delta=10.0):
+    # best-scoring candidates first, skipping any that sit closer than min_delta to one already chosen
+    candidates = np.asarray(candidates, dtype=np.uint8).reshape(-1, 3)
+    scores = score_candidates(main_color, candidates, min_contrast)["score"]
+    lab = ColorSpace.rgb_to_lab(candidates)
+    chosen = []
+    for index in np.argsort(-scores, kind="stable"):
+        if len(chosen) == count:
+            break
+        if chosen and np.sqrt(((lab[chosen] - lab[index]) ** 2).sum(axis=1)).min() < min_delta:
+            continue
+        chosen.append(int(index))
+    if len(chosen) < count:
+        chosen += [int(index) for index in np.argsort(-scores, kind="stable") if index not in chosen][:count - len(chosen)]
+    return chosen, scores
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("numpy", "cv2", "PIL", "sklearn")
+
+# imports the launcher, optionally brings the window up, and reports which heavy modules got loaded
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import Main
+imported = time.perf_counter()
+shown = None
+if {window!r}:
+    import tkinter as tk
+    root = tk.Tk()
+    Main.Main(root)
+    root.update()
+    shown = time.perf_counter()
+    root.destroy()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000.0,
+    "window_ms": None if shown is None else (shown - start) * 1000.0,
+    "heavy_loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_probe(window=False):
+    code = PROBE.format(window=window, heavy=HEAVY_MODULES)
+    wall_start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - wall_start) * 1000.0
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = wall_ms
+    result["top_imports"] = parse_importtime(completed.stderr)
+    return result
+
+
+def parse_importtime(stderr, limit=10):
+    # keep top-level imports and their direct children (cumulative time includes grandchildren)
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 3:
+            top_level.append((match.group(4), int(match.group(2)) / 1000.0))
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return top_level[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the launcher (Main.py).")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--window", action="store_true", help="also create the launcher window (needs a display)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median import time exceeds this")
+    parser.add_argument("--history", default=None, help="append the summary to this JSON-lines file")
+    args = parser.parse_args(argv)
+
+    runs = [run_probe(window=args.window) for _ in range(args.runs)]
+    import_ms = [run["import_ms"] for run in runs]
+    summary = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_ms_median": statistics.median(import_ms),
+        "import_ms_max": max(import_ms),
+        "process_ms_median": statistics.median(run["process_ms"] for run in runs),
+        "heavy_loaded": sorted(set(name for run in runs for name in run["heavy_loaded"])),
+    }
+    if args.window:
+        summary["window_ms_median"] = statistics.median(run["window_ms"] for run in runs)
+
+    print(f"Launcher import: median {summary['import_ms_median']:.1f} ms, max {summary['import_ms_max']:.1f} ms")
+    print(f"Interpreter + import: median {summary['process_ms_median']:.1f} ms")
+    if args.window:
+        print(f"Window shown: median {summary['window_ms_median']:.1f} ms")
+    print("Heavy modules loaded at startup: " + (", ".join(summary["heavy_loaded"]) or "none"))
+    print("Slowest imports (last run):")
+    for name, ms in runs[-1]["top_imports"]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.history:
+        with open(args.history, "a") as history:
+            history.write(json.dumps(summary) + "\n")
+
+    if summary["heavy_loaded"]:
+        return 1
+    if args.budget_ms is not None and summary["import_ms_median"] > args.budget_ms:
+        print(f"Median import time exceeds budget of {args.budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
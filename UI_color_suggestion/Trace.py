@@ -0,0 +1,161 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# COLOR_TRACE=1 turns tracing on at startup, COLOR_TRACE_FILE=path writes a Chrome trace there on exit
+# (open it in chrome://tracing or https://ui.perfetto.dev)
+
+MAX_EVENTS = 100000
+
+
+class _NullSpan(object):
+    # returned while tracing is off so instrumented code pays one attribute check and nothing else
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args = dict(self.args, error=exc_type.__name__)
+        self.tracer.record(self.name, self.start, end, self.args)
+        return False
+
+
+class Tracer(object):
+    # thread-safe spans and counters kept as Chrome trace events in a bounded buffer
+
+    def __init__(self, enabled=False, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)
+        self.counters = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def traced(self, name=None):
+        def decorate(fn):
+            label = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, label, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name, start, end, args=None):
+        duration_ms = (end - start) * 1000.0
+        event = {"name": name, "ph": "X", "ts": (start - self.origin) * 1e6, "dur": duration_ms * 1000.0,
+                 "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+            count, total, worst, last = self.stats.get(name, (0, 0.0, 0.0, 0.0))
+            self.stats[name] = (count + 1, total + duration_ms, max(worst, duration_ms), duration_ms)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+            self.events.append({"name": name, "ph": "C", "ts": (time.perf_counter() - self.origin) * 1e6,
+                                "pid": self.pid, "tid": threading.get_ident(), "args": {"value": total}})
+
+    def summary(self):
+        # name -> (calls, total ms, mean ms, max ms, last ms), slowest total first
+        with self.lock:
+            rows = [(name, count, total, total / count, worst, last) for name, (count, total, worst, last) in self.stats.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+            self.counters.clear()
+            self.stats.clear()
+
+    def export(self, path):
+        with self.lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        with open(path, "w") as stream:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"counters": counters}}, stream)
+        return len(events)
+
+
+tracer = Tracer(enabled=os.environ.get("COLOR_TRACE", "") not in ("", "0"))
+span = tracer.span
+count = tracer.count
+traced = tracer.traced
+
+
+def _export_on_exit():
+    path = os.environ.get("COLOR_TRACE_FILE")
+    if path and tracer.events:
+        tracer.export(path)
+
+
+atexit.register(_export_on_exit)
+
+
+class TraceOverlay(object):
+    # small always-on-top window listing the slowest stages, refreshed with root.after
+
+    def __init__(self, root, refresh_interval=500, rows=8):
+        import tkinter as tk
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.rows = rows
+        self.window = tk.Toplevel(root)
+        self.window.title("Timings")
+        self.window.attributes("-topmost", True)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.label = tk.Label(self.window, font=("Courier", 10), justify="left", anchor="nw", bg="black", fg="#7CFC00")
+        self.label.pack(fill="both", expand=True)
+        self.after_id = None
+        self.refresh()
+
+    def refresh(self):
+        lines = [f"{'stage':32} {'n':>5} {'mean':>8} {'last':>8}"]
+        for name, calls, total, mean, worst, last in tracer.summary()[:self.rows]:
+            lines.append(f"{name[-32:]:32} {calls:5d} {mean:7.1f}ms {last:7.1f}ms")
+        if tracer.counters:
+            lines.append("  ".join(f"{name}={value}" for name, value in sorted(tracer.counters.items())))
+        self.label.config(text="\n".join(lines))
+        self.after_id = self.root.after(self.refresh_interval, self.refresh)
+
+    def close(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.window.destroy()
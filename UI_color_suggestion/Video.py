@@ -0,0 +1,213 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import Codec
+import Trace
+from Clustering import DominantPaletteExtractor
+from LazyImport import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# pixels kept per segment for clustering, spread evenly over its sampled frames
+SEGMENT_PIXELS = 20000
+HISTOGRAM_BITS = 3
+
+_worker_extractor = None
+
+
+def _init_worker(num_colors):
+    global _worker_extractor
+    _worker_extractor = DominantPaletteExtractor(num_colors=num_colors, warm_start=False, random_state=0)
+
+
+def _segment_palette(segment, pixels):
+    colors, shares = _worker_extractor.extract(pixels)
+    segment["colors"] = [Codec.rgb_to_hex(color) for color in colors]
+    segment["shares"] = [round(share, 3) for share in shares]
+    return segment
+
+
+def color_histogram(frame, bits=HISTOGRAM_BITS):
+    # normalized joint RGB histogram with 2**(3 * bits) bins
+    shift = 8 - bits
+    pixels = frame.reshape(-1, 3) >> shift
+    keys = (pixels[:, 0].astype(np.intp) << (2 * bits)) | (pixels[:, 1].astype(np.intp) << bits) | pixels[:, 2]
+    return np.bincount(keys, minlength=1 << (3 * bits)) / float(len(keys))
+
+
+class PixelPool(object):
+    # evenly spread pixel sample of a scene, kept as frames arrive: each frame adds up to `per_frame` strided
+    # pixels, and once the pool holds twice SEGMENT_PIXELS it is halved along with the per-frame budget,
+    # so memory stays bounded however long the scene runs
+
+    def __init__(self, limit=SEGMENT_PIXELS):
+        self.limit = int(limit)
+        self.per_frame = self.limit
+        self.samples = []
+        self.size = 0
+        self.frames = 0
+
+    def add(self, frame):
+        pixels = frame.reshape(-1, 3)
+        sample = pixels[::max(1, -(-len(pixels) // self.per_frame))].copy()
+        self.samples.append(sample)
+        self.size += len(sample)
+        self.frames += 1
+        if self.size > 2 * self.limit:
+            # one thinned array replaces the per-frame samples, so very long scenes stay bounded too
+            self.samples = [np.concatenate(self.samples)[::2]]
+            self.size = len(self.samples[0])
+            self.per_frame = max(1, self.per_frame // 2)
+
+    def pixels(self):
+        pixels = np.concatenate(self.samples)
+        return pixels[::max(1, len(pixels) // self.limit)]
+
+
+class VideoFrameSampler(object):
+    # yields (frame index, small RGB frame) every `stride` frames; seek=True jumps straight to each sample,
+    # which lets the demuxer start from the nearest keyframe instead of decoding everything in between
+
+    def __init__(self, path, stride=10, seek=False, max_side=160):
+        if stride < 1:
+            raise ValueError(f"Frame stride must be at least 1, got {stride!r}")
+        self.path = path
+        self.stride = int(stride)
+        self.seek = seek
+        self.max_side = int(max_side)
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open video: {path}")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    def shrink(self, frame):
+        height, width = frame.shape[:2]
+        if max(height, width) > self.max_side:
+            factor = self.max_side / float(max(height, width))
+            frame = cv2.resize(frame, (max(1, round(width * factor)), max(1, round(height * factor))), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def __iter__(self):
+        index = 0
+        try:
+            while True:
+                with Trace.span("video.decode"):
+                    if self.seek and index:
+                        self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                    ok, frame = self.capture.read()
+                if not ok:
+                    return
+                yield index, self.shrink(frame)
+                if not self.seek:
+                    # grab() advances without converting the skipped frames to BGR
+                    for _ in range(self.stride - 1):
+                        if not self.capture.grab():
+                            return
+                index += self.stride
+        finally:
+            self.capture.release()
+
+
+class VideoColorTimeline(object):
+    # splits a video into scenes by histogram distance between sampled frames and clusters each scene's
+    # pixels into a palette; clustering runs in worker processes while the main process keeps decoding
+
+    def __init__(self, num_colors=5, stride=10, seek=False, threshold=0.35, min_segment=1.0, max_side=160, workers=None, max_pending=None):
+        self.num_colors = int(num_colors)
+        self.stride = int(stride)
+        self.seek = seek
+        self.threshold = float(threshold)
+        self.min_segment = float(min_segment)
+        self.max_side = int(max_side)
+        self.workers = workers
+        self.max_pending = max_pending
+
+    def segments(self, sampler):
+        # yields (segment dict, pixels) for each scene; a cut needs the histogram jump and min_segment seconds
+        previous = None
+        start = None
+        index = 0
+        pool = PixelPool()
+        for index, frame in sampler:
+            histogram = color_histogram(frame)
+            if previous is not None:
+                distance = 0.5 * np.abs(histogram - previous).sum()
+                if distance > self.threshold and (index - start) / sampler.fps >= self.min_segment:
+                    yield self.close_segment(start, index, sampler.fps, pool)
+                    start, pool = None, PixelPool()
+            previous = histogram
+            if start is None:
+                start = index
+            pool.add(frame)
+        if pool.frames:
+            end = max(sampler.frame_count, index + 1)
+            yield self.close_segment(start, end, sampler.fps, pool)
+
+    def close_segment(self, start, end, fps, pool):
+        segment = {"start": round(start / fps, 3), "end": round(end / fps, 3), "frames": pool.frames}
+        return segment, pool.pixels()
+
+    def run(self, path):
+        started = time.perf_counter()
+        sampler = VideoFrameSampler(path, self.stride, self.seek, self.max_side)
+        max_pending = self.max_pending or 4 * (self.workers or 2)
+        segments = []
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.num_colors,)) as executor:
+            pending = set()
+            for segment, pixels in self.segments(sampler):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    segments.extend(future.result() for future in done)
+                pending.add(executor.submit(_segment_palette, segment, pixels))
+            segments.extend(future.result() for future in pending)
+        segments.sort(key=lambda segment: segment["start"])
+        duration = segments[-1]["end"] if segments else 0.0
+        elapsed = time.perf_counter() - started
+        return {
+            "source": path,
+            "fps": round(sampler.fps, 3),
+            "duration": duration,
+            "stride": self.stride,
+            "segments": segments,
+            "processing_seconds": round(elapsed, 3),
+            "realtime_factor": round(duration / elapsed, 2) if elapsed else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a per-scene dominant color timeline for a video file.")
+    parser.add_argument("video")
+    parser.add_argument("-o", "--output", default="-", help="timeline JSON file (default: stdout)")
+    parser.add_argument("-k", "--num-colors", type=int, default=5)
+    parser.add_argument("-s", "--stride", type=int, default=10, help="analyze every Nth frame")
+    parser.add_argument("--seek", action="store_true", help="seek to each sampled frame instead of grabbing through (faster for large strides)")
+    parser.add_argument("-t", "--threshold", type=float, default=0.35, help="histogram distance (0-1) that starts a new scene")
+    parser.add_argument("--min-segment", type=float, default=1.0, help="shortest scene in seconds")
+    parser.add_argument("--max-side", type=int, default=160, help="frames are shrunk to this longest side before analysis")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="clustering processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    timeline = VideoColorTimeline(args.num_colors, args.stride, args.seek, args.threshold, args.min_segment, args.max_side, args.workers)
+    try:
+        result = timeline.run(args.video)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.output == "-":
+        json.dump(result, sys.stdout, separators=(",", ":"))
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as stream:
+            json.dump(result, stream, separators=(",", ":"))
+    print(f"{len(result['segments'])} segments, {result['duration']:.1f} s of video in {result['processing_seconds']:.1f} s "
+          f"({result['realtime_factor']}x real time)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
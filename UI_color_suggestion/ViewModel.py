@@ -0,0 +1,63 @@
+import Codec
+import Trace
+
+
+class PaletteView(object):
+    # view-model for a row of color swatch labels: remembers what each label currently shows, queues only
+    # the slots whose state changed, and applies them in one redraw scheduled with after_idle, so bursts
+    # of updates (camera frames, batch imports, sliders) cost one label.config per changed slot
+
+    def __init__(self, root, labels, placeholders, empty_bg="white"):
+        if len(labels) != len(placeholders):
+            raise ValueError("Every label needs a placeholder text")
+        self.root = root
+        self.labels = list(labels)
+        self.placeholders = list(placeholders)
+        self.empty_bg = empty_bg
+        self.shown = [(empty_bg, text) for text in placeholders]
+        self.pending = {}
+        self.after_id = None
+
+    def state_of(self, slot, color):
+        if color and Codec.is_valid_hex_color(color):
+            return color, color
+        return self.empty_bg, self.placeholders[slot]
+
+    def set(self, slot, color):
+        self.set_state(slot, *self.state_of(slot, color))
+
+    def set_state(self, slot, background, text):
+        state = (background, text)
+        if self.pending.get(slot, self.shown[slot]) == state:
+            return
+        self.pending[slot] = state
+        if self.after_id is None:
+            self.after_id = self.root.after_idle(self.flush)
+
+    def text_of(self, slot):
+        return self.pending.get(slot, self.shown[slot])[1]
+
+    def set_all(self, colors):
+        for slot, color in enumerate(colors[:len(self.labels)]):
+            self.set(slot, color)
+
+    def clear(self, slot):
+        self.set(slot, "")
+
+    def flush(self):
+        self.after_id = None
+        pending, self.pending = self.pending, {}
+        with Trace.span("PaletteView.flush", slots=len(pending)):
+            for slot, state in pending.items():
+                if state == self.shown[slot]:
+                    continue
+                background, text = state
+                self.labels[slot].config(bg=background, text=text)
+                self.shown[slot] = state
+                Trace.count("tk.label_push")
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.pending.clear()
@@ -0,0 +1,118 @@
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task(object):
+    # handle for one background job; a job that takes a `task` argument can report progress and poll for cancellation
+    def __init__(self, name, on_done=None, on_error=None, on_progress=None):
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future = None
+        self.progress = None
+        self._reported = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, fraction):
+        self.progress = max(0.0, min(1.0, float(fraction)))
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.name)
+
+
+class TaskRunner(object):
+    # runs jobs on a thread (or process) pool and delivers their results on the Tk thread by polling with root.after
+
+    def __init__(self, root, max_workers=2, use_processes=False, poll_interval=50, on_busy_change=None):
+        self.root = root
+        self.poll_interval = int(poll_interval)
+        self.use_processes = use_processes
+        self.on_busy_change = on_busy_change
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="color-worker")
+        self.tasks = []
+        self._after_id = None
+
+    @property
+    def busy(self):
+        return bool(self.tasks)
+
+    def submit(self, fn, *args, name=None, on_done=None, on_error=None, on_progress=None, pass_task=False, **kwargs):
+        task = Task(name or getattr(fn, "__name__", "task"), on_done, on_error, on_progress)
+        if pass_task:
+            if self.use_processes:
+                raise ValueError("Progress and cancellation callbacks need a thread pool")
+            kwargs["task"] = task
+        task.future = self.executor.submit(fn, *args, **kwargs)
+        was_busy = self.busy
+        self.tasks.append(task)
+        if not was_busy and self.on_busy_change:
+            self.on_busy_change(True)
+        if self._after_id is None:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+        return task
+
+    def cancel_all(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+    def _poll(self):
+        self._after_id = None
+        still_running = []
+        for task in self.tasks:
+            if task.progress is not None and task.progress != task._reported and task.on_progress:
+                task._reported = task.progress
+                task.on_progress(task.progress)
+            if task.future.done():
+                self._finish(task)
+            else:
+                still_running.append(task)
+        self.tasks = still_running
+        if self.tasks:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+        elif self.on_busy_change:
+            self.on_busy_change(False)
+
+    def _finish(self, task):
+        if task.cancelled:
+            return
+        try:
+            result = task.future.result()
+        except (CancelledError, TaskCancelled):
+            return
+        except Exception as e:
+            if task.on_error:
+                task.on_error(e)
+            else:
+                print(f"Error in background task {task.name}: {e}")
+            return
+        if task.on_done:
+            task.on_done(result)
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self.tasks = []
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Batch import BatchEngine
+from Engine import ColorEngine
+
+COLORS = np.random.default_rng(0).integers(0, 256, (200, 3), dtype=np.uint8)
+
+
+def scalar(method, *args, **kwargs):
+    return np.array([getattr(ColorEngine, method)(tuple(int(c) for c in color), *args, **kwargs) for color in COLORS])
+
+
+@pytest.mark.parametrize("space", ["hsv", "oklch"])
+def test_hue_schemes_match_the_scalar_engine(space):
+    assert (BatchEngine.analogous(COLORS, 4, space=space) == scalar("analogous", 4, space=space)).all()
+    assert (BatchEngine.split_complementary(COLORS, space=space) == scalar("split_complementary", space=space)).all()
+    assert (BatchEngine.complementary(COLORS, space)[:, 0] == scalar("complementary", space=space)).all()
+
+
+@pytest.mark.parametrize("space", ["srgb", "oklab"])
+def test_ladders_match_the_scalar_engine(space):
+    assert (BatchEngine.tints(COLORS, 3, 20, space) == scalar("tints", 3, 20, space)).all()
+    assert (BatchEngine.shades(COLORS, 3, 20, space) == scalar("shades", 3, 20, space)).all()
+
+
+def test_hsv_round_trip_and_grays():
+    rgb = COLORS.astype(np.float64) / 255.0
+    assert np.allclose(BatchEngine.hsv_to_rgb(BatchEngine.rgb_to_hsv(rgb)), rgb)
+    grays = np.repeat(np.arange(0, 256, 51, dtype=np.uint8)[:, None], 3, axis=1)
+    assert (BatchEngine.complementary(grays)[:, 0] == grays).all()
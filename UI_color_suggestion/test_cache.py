@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+
+from Cache import ResultCache
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert cache.get("a") == [1]
+    cache.put("c", [3])
+    assert cache.get("b") is None and cache.get("a") == [1] and cache.get("c") == [3]
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_keys_follow_file_and_params(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"first")
+    for key_mode in ("stat", "content"):
+        cache = ResultCache(key_mode=key_mode)
+        key = cache.key(str(path), {"decode_size": 64})
+        assert key == cache.key(str(path), {"decode_size": 64})
+        assert key != cache.key(str(path), {"decode_size": 128})
+    content = ResultCache(key_mode="content")
+    before = content.key(str(path), {})
+    path.write_bytes(b"second")
+    assert content.key(str(path), {}) != before
+
+
+def test_disk_entries_survive_and_hits_refresh_mtime(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    ResultCache(cache_dir=cache_dir).put("key", [1, 2, 3])
+    stored = os.path.join(cache_dir, "key.json")
+    old = time.time() - 3600
+    os.utime(stored, (old, old))
+    assert ResultCache(cache_dir=cache_dir).get("key") == [1, 2, 3]
+    assert os.path.getmtime(stored) > old + 60
+
+
+def test_trim_drops_least_recently_used_files(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = ResultCache(cache_dir=cache_dir, max_disk_bytes=30)
+    for i, name in enumerate(("old", "used", "new")):
+        cache.put(name, [i] * 4)
+        stamp = time.time() - 3600 + i
+        os.utime(os.path.join(cache_dir, name + ".json"), (stamp, stamp))
+    cache.get("old")
+    cache.trim_disk()
+    assert sorted(os.listdir(cache_dir)) == ["new.json", "old.json"]
+
+
+def test_get_or_compute_computes_once(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"pixels")
+    cache = ResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or [10, 20, 30]
+    assert cache.get_or_compute(str(path), {}, compute) == [10, 20, 30]
+    assert cache.get_or_compute(str(path), {}, compute) == [10, 20, 30]
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        ResultCache(key_mode="mtime")
@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ColorSpace
+from Catalog import ColorCatalog, LabGridIndex
+
+
+def brute_force(catalog, colors, k):
+    lab = ColorSpace.rgb_to_lab(np.asarray(colors, dtype=np.uint8)).astype(np.float32)
+    distances = np.sqrt(((lab[:, None] - catalog.lab[None]) ** 2).sum(axis=-1))
+    return np.sort(distances, axis=1)[:, :k]
+
+
+def test_exact_colors_match_their_names():
+    catalog = ColorCatalog.css(backend="grid")
+    assert catalog.name_of((255, 0, 0)) == "red"
+    assert catalog.name_of((70, 130, 180)) == "steelblue"
+    name, hex_color, distance = catalog.match((0, 0, 128))[0]
+    assert (name, hex_color) == ("navy", "#000080") and distance == pytest.approx(0.0, abs=1e-3)
+
+
+def test_grid_index_agrees_with_brute_force():
+    catalog = ColorCatalog.css(backend="grid")
+    colors = np.random.default_rng(0).integers(0, 256, (300, 3), dtype=np.uint8)
+    distances, indices = catalog.nearest(colors, k=3)
+    assert isinstance(catalog.index, LabGridIndex)
+    assert np.allclose(distances, brute_force(catalog, colors, 3), atol=1e-3)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_save_and_load(tmp_path):
+    catalog = ColorCatalog(["ink", "paper"], [(20, 20, 30), (250, 248, 240)], backend="grid")
+    path = str(tmp_path / "catalog.npz")
+    catalog.build_index().save(path)
+    loaded = ColorCatalog.from_file(path, backend="grid")
+    assert isinstance(loaded.index, LabGridIndex)
+    assert loaded.name_of((10, 10, 10)) == "ink" and loaded.name_of((255, 255, 255)) == "paper"
+
+
+def test_empty_catalog_cannot_be_queried():
+    with pytest.raises(ValueError):
+        ColorCatalog([], np.empty((0, 3), dtype=np.uint8), backend="grid").nearest([(0, 0, 0)])
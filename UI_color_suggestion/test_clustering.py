@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Clustering import DominantPaletteExtractor
+
+
+def two_cluster_pixels(seed=0):
+    rng = np.random.default_rng(seed)
+    dark = rng.normal((30, 40, 50), 3, (700, 3))
+    light = rng.normal((220, 200, 180), 3, (300, 3))
+    return np.clip(np.concatenate([dark, light]), 0, 255).astype(np.uint8)
+
+
+def test_recovers_clusters_and_shares():
+    colors, shares = DominantPaletteExtractor(2, random_state=0).extract(two_cluster_pixels())
+    assert max(abs(a - b) for a, b in zip(colors[0], (30, 40, 50))) <= 3
+    assert max(abs(a - b) for a, b in zip(colors[1], (220, 200, 180))) <= 3
+    assert shares == pytest.approx([0.7, 0.3], abs=0.01)
+
+
+def test_warm_start_reuses_centroids():
+    extractor = DominantPaletteExtractor(2, random_state=0)
+    first, _ = extractor.extract(two_cluster_pixels(0))
+    extractor.max_iter = 1
+    second, _ = extractor.extract(two_cluster_pixels(1))
+    assert all(max(abs(a - b) for a, b in zip(p, q)) <= 3 for p, q in zip(first, second))
+    extractor.reset()
+    assert extractor.centroids is None
+
+
+def test_single_color_is_the_mean():
+    pixels = np.array([[0, 0, 0], [100, 50, 20]], dtype=np.uint8)
+    assert DominantPaletteExtractor(1).dominant_color(pixels) == (50, 25, 10)
+
+
+def test_more_colors_than_pixels():
+    colors, shares = DominantPaletteExtractor(5, random_state=0).extract(np.array([[10, 20, 30], [200, 100, 0]], dtype=np.uint8))
+    assert len(colors) == 2 and sum(shares) == pytest.approx(1.0)
+
+
+def test_bad_input_is_rejected():
+    with pytest.raises(ValueError):
+        DominantPaletteExtractor(0)
+    with pytest.raises(ValueError):
+        DominantPaletteExtractor(2).extract(np.empty((0, 3), dtype=np.uint8))
@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Codec
+
+
+def test_scalar_round_trip_every_byte():
+    for value in range(256):
+        color = (value, 255 - value, value // 2)
+        assert Codec.hex_to_rgb(Codec.rgb_to_hex(color)) == color
+
+
+@pytest.mark.parametrize("text", ["#3c6e9f", "#3C6E9F", "3C6E9F", "#3c6E9f"])
+def test_hex_to_rgb_accepts_any_case(text):
+    assert Codec.hex_to_rgb(text) == (60, 110, 159)
+
+
+@pytest.mark.parametrize("text", ["", "#", "#12345", "#1234567", "#GG0000", None, 123])
+def test_invalid_hex_is_rejected(text):
+    assert not Codec.is_valid_hex_color(text)
+    with pytest.raises(ValueError):
+        Codec.hex_to_rgb(text)
+
+
+def test_rgb_to_hex_range_check():
+    with pytest.raises(ValueError):
+        Codec.rgb_to_hex((256, 0, 0))
+    with pytest.raises(ValueError):
+        Codec.rgb_to_hex((0, 0))
+
+
+def test_bulk_matches_scalar():
+    colors = np.random.default_rng(0).integers(0, 256, (500, 3), dtype=np.uint8)
+    encoded = Codec.encode_many(colors)
+    assert encoded.tolist() == [Codec.rgb_to_hex(c) for c in colors]
+    assert (Codec.decode_many(np.char.lower(encoded)) == colors).all()
+
+
+def test_validate_many_flags_bad_entries():
+    valid = Codec.validate_many(np.array(["#000000", "#00000G", "000000", "#FFFFFF"]))
+    assert valid.tolist() == [True, False, False, True]
+    with pytest.raises(ValueError, match="index 1"):
+        Codec.decode_many(np.array(["#000000", "#00000G"]))
+
+
+def test_hex_csv_round_trip(tmp_path):
+    path = str(tmp_path / "colors.csv")
+    colors = np.array([[0, 0, 0], [60, 110, 159]], dtype=np.uint8)
+    Codec.save_hex_csv(path, colors)
+    assert (Codec.load_hex_csv(path) == colors).all()
@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ColorSpace
+
+
+def random_colors(count=2000, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (count, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("space", ColorSpace.SPACES)
+def test_round_trip_through_every_space(space):
+    colors = random_colors()
+    for use_lut in (True, False):
+        back = ColorSpace.from_space(ColorSpace.to_space(colors, space), space, use_lut)
+        assert back.dtype == np.uint8
+        assert np.abs(back.astype(int) - colors).max() <= 1
+
+
+def test_reference_values():
+    white, black = ColorSpace.rgb_to_lab(np.array([[255, 255, 255], [0, 0, 0]], dtype=np.uint8))
+    assert np.allclose(white, (100.0, 0.0, 0.0), atol=0.05)
+    assert np.allclose(black, (0.0, 0.0, 0.0), atol=0.05)
+    red_lab = ColorSpace.rgb_to_lab(np.array([255, 0, 0], dtype=np.uint8))
+    assert np.allclose(red_lab, (53.24, 80.09, 67.20), atol=0.1)
+    red_oklab = ColorSpace.rgb_to_oklab(np.array([255, 0, 0], dtype=np.uint8))
+    assert np.allclose(red_oklab, (0.6280, 0.2249, 0.1258), atol=1e-3)
+
+
+def test_grays_have_no_chroma():
+    grays = np.repeat(np.arange(0, 256, 15, dtype=np.uint8)[:, None], 3, axis=1)
+    for space in ("lch", "oklch"):
+        assert np.abs(ColorSpace.to_space(grays, space)[:, 1]).max() < 1e-3
+
+
+def test_lightness_is_monotonic_in_gray():
+    grays = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+    for space in ("lab", "oklab"):
+        assert (np.diff(ColorSpace.to_space(grays, space)[:, 0]) > 0).all()
+
+
+def test_rotate_hue_full_turn_is_identity():
+    colors = random_colors(200)
+    rotated = ColorSpace.rotate_hue(colors, [0.0, 1.0])
+    assert np.abs(rotated.astype(int) - colors[:, None]).max() <= 1
+    with pytest.raises(ValueError):
+        ColorSpace.rotate_hue(colors, [0.5], space="oklab")
+
+
+def test_mix_of_one_color_is_itself():
+    color = np.array([60, 110, 159], dtype=np.uint8)
+    assert np.abs(ColorSpace.mix([color, color]).astype(int) - color).max() <= 1
+    black_white = ColorSpace.mix([[0, 0, 0], [255, 255, 255]], space="oklab")
+    assert black_white[0] == black_white[1] == black_white[2]
+
+
+def test_unknown_space_is_rejected():
+    with pytest.raises(ValueError):
+        ColorSpace.to_space(random_colors(2), "hsl")
+    with pytest.raises(ValueError):
+        ColorSpace.from_space(np.zeros((1, 3)), "hsl")
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+
+from Extraction import ImageColorExtractor
+
+ORIENTATION = 0x0112
+
+
+def rotated_jpeg(path, width=640, height=320):
+    # left half red, right half blue as stored; EXIF orientation 6 means "rotate 90 degrees clockwise to view"
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[:, :width // 2] = (220, 30, 30)
+    pixels[:, width // 2:] = (30, 30, 220)
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    Image.fromarray(pixels).save(path, "JPEG", quality=95, exif=exif.tobytes())
+
+
+def test_reduced_and_full_decodes_share_orientation(tmp_path):
+    path = str(tmp_path / "photo.jpg")
+    rotated_jpeg(path)
+    full = ImageColorExtractor.load_image(path)
+    reduced = ImageColorExtractor.load_image(path, 64)
+    assert full.shape[:2] == (640, 320)
+    assert reduced.shape[0] > reduced.shape[1] and reduced.shape[1] < full.shape[1]
+    # viewed upright, the red half is on top in both decodes
+    for image in (full, reduced):
+        top, bottom = image[:image.shape[0] // 4].mean(axis=(0, 1)), image[-image.shape[0] // 4:].mean(axis=(0, 1))
+        assert top[0] > top[2] and bottom[2] > bottom[0]
+
+
+def test_reduced_decode_keeps_min_size(tmp_path):
+    path = str(tmp_path / "photo.png")
+    Image.fromarray(np.zeros((400, 800, 3), dtype=np.uint8)).save(path)
+    image = ImageColorExtractor.load_image(path, 100)
+    assert image.shape == (100, 200, 3)
+
+
+@pytest.mark.parametrize("bits", [4, 6, 8])
+def test_histogram_color_matches_most_common(bits):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (50, 50, 3), dtype=np.uint8)
+    image[:20, :30] = (37, 142, 201)
+    expected = ImageColorExtractor.most_common_color(image)
+    assert expected == (37, 142, 201)
+    assert ImageColorExtractor.histogram_color(image, bits) == expected
+
+
+def test_low_bit_histogram_averages_its_bin():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    image[:, :6] = (100, 100, 100)
+    image[:, 6:] = (102, 102, 102)
+    assert ImageColorExtractor.histogram_color(image, 4) == (101, 101, 101)
@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Codec
+import ColorSpace
+import Ladder
+
+BASES = ["#000000", "#101010", "#3C6E9F", "#F2C14E", "#FAFAFA", "#FFFFFF"]
+
+
+def lightness(rgb):
+    return ColorSpace.to_space(np.asarray(rgb, dtype=np.uint8), "oklab")[..., 0]
+
+
+@pytest.mark.parametrize("kind, sign", [("shade", -1.0), ("tint", 1.0)])
+def test_tints_never_darken_and_shades_never_lighten(kind, sign):
+    ladders = Ladder.ladder([Codec.hex_to_rgb(color) for color in BASES], 6, kind)
+    assert ladders.shape == (len(BASES), 6, 3)
+    steps = np.diff(lightness(ladders), axis=1) * sign
+    assert (steps >= -1e-3).all()
+
+
+def test_ladder_starts_at_the_base_color():
+    bases = np.array([Codec.hex_to_rgb(color) for color in BASES], dtype=np.uint8)
+    for kind in ("tint", "shade", "tone"):
+        assert (np.abs(Ladder.ladder(bases, 4, kind)[:, 0].astype(int) - bases) <= 1).all()
+
+
+def test_fit_gamut_keeps_lightness_and_hue():
+    oklch = np.array([[0.9, 0.35, 30.0], [0.3, 0.4, 250.0]])
+    fitted = Ladder.fit_gamut(oklch)
+    assert Ladder.in_gamut(fitted).all()
+    assert np.allclose(fitted[:, [0, 2]], oklch[:, [0, 2]])
+    assert (fitted[:, 1] < oklch[:, 1]).all()
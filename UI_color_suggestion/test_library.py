@@ -0,0 +1,64 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import PaletteIO
+from Library import PaletteLibrary, palette_features
+
+OCEAN = ["#0B3C5D", "#328CC1", "#D9B310", "#1D2731"]
+
+
+def test_features_ignore_color_order():
+    palette = np.array([[[11, 60, 93], [50, 140, 193], [217, 179, 16], [29, 39, 49]]], dtype=np.uint8)
+    shuffled = palette[:, [2, 0, 3, 1]]
+    assert np.allclose(palette_features(palette), palette_features(shuffled), atol=1e-6)
+
+
+def test_similar_finds_the_same_palette_first(tmp_path):
+    library = PaletteLibrary(str(tmp_path / "library"))
+    rng = np.random.default_rng(0)
+    library.add([(f"random {i}", rng.integers(0, 256, (5, 3), dtype=np.uint8)) for i in range(200)])
+    library.add([("ocean", OCEAN)])
+    name, colors, distance = library.similar(list(reversed(OCEAN)), k=3)[0]
+    assert name == "ocean" and colors == OCEAN and distance == pytest.approx(0.0, abs=1e-3)
+
+
+def test_appends_persist_and_reopen(tmp_path):
+    path = str(tmp_path / "library")
+    library = PaletteLibrary(path)
+    library.add([("one", ["#FF0000"]), ("two", ["#00FF00", "#0000FF"])])
+    library.add([("three", ["#123456", "#654321", "#ABCDEF"])])
+    reopened = PaletteLibrary(path)
+    assert len(reopened) == 3
+    assert [reopened[i][0] for i in range(3)] == ["one", "two", "three"]
+    assert reopened[-1][1].tolist() == [[18, 52, 86], [101, 67, 33], [171, 205, 239]]
+
+
+def test_interrupted_append_is_ignored(tmp_path):
+    path = str(tmp_path / "library")
+    library = PaletteLibrary(path)
+    library.add([("kept", ["#102030"])])
+    # bytes written past the committed offsets, as if a later append had been cut short
+    with open(library._file("colors.u8"), "ab") as stream:
+        stream.write(b"\xff" * 30)
+    reopened = PaletteLibrary(path)
+    assert len(reopened) == 1
+    reopened.add([("next", ["#405060"])])
+    assert reopened[1][1].tolist() == [[64, 80, 96]]
+
+
+def test_packed_import_matches_pairs(tmp_path):
+    rng = np.random.default_rng(1)
+    palettes = [(f"p{i}", rng.integers(0, 256, (3 + i % 3, 3), dtype=np.uint8)) for i in range(50)]
+    packed_path = str(tmp_path / "palettes.cpal")
+    PaletteIO.save_packed(packed_path, palettes)
+    packed = PaletteLibrary(str(tmp_path / "packed")).add(PaletteIO.PackedPalettes(packed_path))
+    pairs = PaletteLibrary(str(tmp_path / "pairs")).add(palettes)
+    assert len(packed) == len(pairs) == 50
+    assert np.allclose(np.asarray(packed.features), np.asarray(pairs.features), atol=1e-6)
+    assert packed[7][0] == "p7" and (packed[7][1] == palettes[7][1]).all()
+
+
+def test_empty_library_cannot_be_queried(tmp_path):
+    with pytest.raises(ValueError):
+        PaletteLibrary(str(tmp_path / "missing")).similar(OCEAN)
@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Codec
+import ColorSpace
+import Scoring
+from Optimizer import MIN_HARMONY_CHROMA, PaletteOptimizer
+
+
+def as_array(hex_colors):
+    return np.array([[Codec.hex_to_rgb(color) for color in hex_colors]], dtype=np.uint8)
+
+
+def test_grays_do_not_satisfy_a_harmony_rule():
+    optimizer = PaletteOptimizer(5, {0: "#3366CC"}, 4.5, "complementary")
+    palette = as_array(["#3366CC", "#F7ECD6", "#EEEEEE", "#EEEEEE", "#E7EFFB"])
+    assert not optimizer.feasible(palette)[0]
+
+
+def test_complementary_palette_is_feasible_and_chromatic():
+    optimizer = PaletteOptimizer(5, {0: "#3366CC"}, 4.5, "complementary", random_state=0)
+    hexes, score, feasible = optimizer.optimize(1, time_budget=0.3)[0]
+    assert feasible and hexes[0] == "#3366CC"
+    lch = ColorSpace.to_space(as_array(hexes), "oklch")[0]
+    assert (lch[1:, 1] >= MIN_HARMONY_CHROMA).all()
+    difference = np.mod(lch[1:, 2] - lch[0, 2], 360.0)
+    error = np.minimum(np.abs(difference - 180.0), np.minimum(difference, 360.0 - difference))
+    assert (error <= optimizer.harmony_tolerance).all()
+    contrast = Scoring.contrast_ratio(as_array(hexes[1:])[0], np.array(Codec.hex_to_rgb(hexes[0])))
+    assert (contrast >= 4.5).all()
+
+
+def test_unreachable_contrast_is_reported_infeasible():
+    # nothing reaches 21:1 against a mid gray
+    optimizer = PaletteOptimizer(3, {0: "#777777"}, 21.0, random_state=0)
+    results = optimizer.optimize(2, time_budget=0.05)
+    assert results and not any(feasible for _, _, feasible in results)
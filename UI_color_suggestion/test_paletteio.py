@@ -0,0 +1,52 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import ColorSpace
+import PaletteIO
+
+PALETTES = [("Ocean", ["#3C6E9F", "#F2C14E", "#202020"]), ("Mono", ["#FFFFFF"]), ("Sunset", ["#FF7F50", "#8B0000"])]
+
+
+def ase_color(name, model, values):
+    body = PaletteIO._ase_string(name) + model + struct.pack(f">{len(values)}fH", *values, 2)
+    return struct.pack(">HI", PaletteIO.ASE_COLOR, len(body)) + body
+
+
+def ase_file(blocks):
+    return PaletteIO.ASE_MAGIC + struct.pack(">HHI", 1, 0, len(blocks)) + b"".join(blocks)
+
+
+@pytest.mark.parametrize("fmt", PaletteIO.FORMATS)
+def test_round_trip(tmp_path, fmt):
+    path = str(tmp_path / f"palettes.{fmt}")
+    PaletteIO.save_palettes(path, PALETTES)
+    loaded = [(name, colors.copy()) for name, colors in PaletteIO.load_palettes(path)]
+    assert len(loaded) == len(PALETTES)
+    for (name, colors), (expected_name, expected) in zip(loaded, PALETTES):
+        assert (colors == PaletteIO.as_palette(expected_name, expected)[1]).all()
+        if fmt != "css":
+            assert name == expected_name
+
+
+def test_ase_lab_swatches_load():
+    rgb = np.array([[60, 110, 159], [242, 193, 78]], dtype=np.uint8)
+    lab = ColorSpace.rgb_to_lab(rgb)
+    data = ase_file([ase_color(f"lab {i}", b"LAB ", (l / 100.0, a, b)) for i, (l, a, b) in enumerate(lab)]
+                    + [ase_color("rgb", b"RGB ", (1.0, 0.0, 0.0))])
+    (name, colors), = PaletteIO.loads_ase(data)
+    assert name == "swatches"
+    assert (np.abs(colors[:2].astype(int) - rgb) <= 1).all()
+    assert colors[2].tolist() == [255, 0, 0]
+
+
+def test_ase_lab_outside_srgb_is_clipped():
+    (_, colors), = PaletteIO.loads_ase(ase_file([ase_color("vivid", b"LAB ", (0.5, 120.0, -120.0))]))
+    assert colors.dtype == np.uint8 and colors.shape == (1, 3)
+
+
+def test_ase_unknown_model_is_rejected():
+    with pytest.raises(ValueError):
+        PaletteIO.loads_ase(ase_file([ase_color("odd", b"HSV ", ())]))
@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Quantize import PaletteQuantizer
+
+BLOCKS = [((200, 30, 30), 0.5), ((30, 30, 200), 0.3), ((30, 200, 30), 0.2)]
+
+
+def block_image(width=100, height=40):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    start = 0
+    for color, share in BLOCKS:
+        end = start + int(round(width * share))
+        image[:, start:end] = color
+        start = end
+    return image
+
+
+@pytest.mark.parametrize("method", PaletteQuantizer.METHODS)
+def test_colors_and_shares_of_flat_blocks(method):
+    colors, shares = PaletteQuantizer(3, method).extract(block_image())
+    assert len(colors) == 3
+    for (color, share), (expected, expected_share) in zip(zip(colors, shares), BLOCKS):
+        assert max(abs(a - b) for a, b in zip(color, expected)) <= 4
+        assert share == pytest.approx(expected_share, abs=1e-9)
+
+
+@pytest.mark.parametrize("method", PaletteQuantizer.METHODS)
+def test_shares_are_sorted_and_bounded(method):
+    image = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    colors, shares = PaletteQuantizer(5, method).extract(image)
+    assert len(colors) == len(shares) <= 5
+    assert all(a >= b for a, b in zip(shares, shares[1:]))
+    assert 0.0 < sum(shares) <= 1.0 + 1e-9
+
+
+def test_near_duplicates_are_merged():
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    image[:, :5] = (120, 120, 120)
+    image[:, 5:] = (123, 121, 122)
+    colors, shares = PaletteQuantizer(2, merge_delta=10.0).extract(image)
+    assert len(colors) == 1 and shares[0] == pytest.approx(1.0)
+
+
+def test_invalid_arguments_are_rejected():
+    with pytest.raises(ValueError):
+        PaletteQuantizer(0)
+    with pytest.raises(ValueError):
+        PaletteQuantizer(3, "kmeans")
+    with pytest.raises(ValueError):
+        PaletteQuantizer(3, bits=9)
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+import Recolor
+
+
+def gradient(size=32):
+    ramp = np.linspace(0, 65535, size).astype(np.uint16)
+    return np.stack([np.broadcast_to(ramp[None, :], (size, size)), np.broadcast_to(ramp[:, None], (size, size)),
+                     np.full((size, size), 30000, np.uint16)], axis=-1)
+
+
+def test_recolor_16bit_png(tmp_path):
+    source, output = str(tmp_path / "in.png"), str(tmp_path / "out.png")
+    assert cv2.imwrite(source, np.ascontiguousarray(gradient()))
+    assert cv2.imread(source, cv2.IMREAD_UNCHANGED).dtype == np.uint16
+    Recolor.recolor_file(source, output, ["#3C6E9F", "#F2C14E"])
+    result = cv2.imread(output, cv2.IMREAD_UNCHANGED)
+    assert result.dtype == np.uint8 and result.shape == (32, 32, 3)
+
+
+def test_recolor_gray_alpha_png(tmp_path):
+    source, output = str(tmp_path / "in.png"), str(tmp_path / "out.png")
+    gray = np.tile(np.arange(0, 256, 8, dtype=np.uint8), (32, 1))
+    alpha = np.full_like(gray, 200)
+    Image = pytest.importorskip("PIL.Image")
+    Image.fromarray(np.stack([gray, alpha], axis=-1), "LA").save(source)
+    Recolor.recolor_file(source, output, ["#3C6E9F", "#F2C14E"])
+    result = cv2.imread(output, cv2.IMREAD_UNCHANGED)
+    assert result.shape == (32, 32, 4)
+    assert (result[..., 3] == 200).all()
+
+
+def test_unsupported_array_reports_error(tmp_path):
+    source = str(tmp_path / "in.npy")
+    np.save(source, np.zeros((8, 8, 3), dtype=np.int32))
+    assert Recolor.main([source, str(tmp_path / "out.npy"), "-t", "#3C6E9F"]) == 1
+    assert not os.path.exists(str(tmp_path / "out.npy"))
+
+
+def test_as_8bit_color_expands_gray_alpha():
+    image = np.stack([np.full((4, 4), 1000, np.uint16), np.full((4, 4), 65535, np.uint16)], axis=-1)
+    result = Recolor.as_8bit_color(image)
+    assert result.dtype == np.uint8 and result.shape == (4, 4, 4)
+    assert (result[..., :3] == 3).all() and (result[..., 3] == 255).all()
@@ -0,0 +1,27 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+
+from Regions import RegionColorExtractor
+from test_extraction import rotated_jpeg
+
+
+def test_source_size_follows_exif_orientation(tmp_path):
+    path = str(tmp_path / "photo.jpg")
+    rotated_jpeg(path, 640, 320)
+    extractor = RegionColorExtractor(num_colors=2, max_side=128).load(path)
+    assert extractor.source_size == (320, 640)
+    assert extractor.image.shape[0] > extractor.image.shape[1]
+    # rectangles are in upright source pixels: the top half is red and the bottom half blue
+    top, bottom = extractor.region_means([(0, 0, 320, 300), (0, 340, 320, 300)])
+    assert top[0] > top[2] and bottom[2] > bottom[0]
+
+
+def test_prepare_region_means():
+    image = np.zeros((40, 80, 3), dtype=np.uint8)
+    image[:, 40:] = (0, 200, 0)
+    extractor = RegionColorExtractor(num_colors=2).prepare(image)
+    left, right = extractor.region_means([(0, 0, 40, 40), (40, 0, 40, 40)])
+    assert tuple(left) == (0, 0, 0) and tuple(right) == (0, 200, 0)
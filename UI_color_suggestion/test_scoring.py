@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Scoring
+
+BLACK, WHITE = np.array([0, 0, 0], np.uint8), np.array([255, 255, 255], np.uint8)
+
+
+def test_contrast_ratio_reference_values():
+    assert Scoring.contrast_ratio(BLACK, WHITE) == pytest.approx(21.0, rel=1e-3)
+    assert Scoring.contrast_ratio(WHITE, WHITE) == pytest.approx(1.0)
+    # #767676 is the lightest gray that passes AA text on white
+    gray = np.array([118, 118, 118], np.uint8)
+    assert Scoring.contrast_ratio(gray, WHITE) == pytest.approx(4.54, abs=0.01)
+    assert Scoring.contrast_ratio(gray, WHITE) == pytest.approx(Scoring.contrast_ratio(WHITE, gray))
+
+
+def test_apca_reference_values():
+    assert Scoring.apca_contrast(BLACK, WHITE) == pytest.approx(106.04, abs=0.1)
+    assert Scoring.apca_contrast(WHITE, BLACK) == pytest.approx(-107.88, abs=0.1)
+    assert Scoring.apca_contrast(WHITE, WHITE) == 0.0
+
+
+def test_pairwise_contrast_is_symmetric():
+    palette = np.random.default_rng(0).integers(0, 256, (4, 5, 3), dtype=np.uint8)
+    contrast = Scoring.pairwise_contrast(palette)
+    assert contrast.shape == (4, 5, 5)
+    assert np.allclose(contrast, contrast.transpose(0, 2, 1))
+    assert np.allclose(contrast[:, range(5), range(5)], 1.0)
+
+
+def test_cvd_catches_red_green_confusion():
+    red_green = np.array([[200, 40, 40], [80, 120, 40]], dtype=np.uint8)
+    blue_orange = np.array([[40, 80, 200], [230, 140, 20]], dtype=np.uint8)
+    assert Scoring.cvd_min_delta(red_green) < Scoring.cvd_min_delta(blue_orange)
+    with pytest.raises(ValueError):
+        Scoring.simulate_cvd(red_green, "achromatopsia")
+
+
+def test_score_palettes_prefers_readable_palettes():
+    palettes = np.array([[[255, 255, 255], [0, 0, 0]], [[255, 255, 255], [250, 250, 250]]], dtype=np.uint8)
+    metrics = Scoring.score_palettes(palettes, Scoring.WCAG_AA_TEXT)
+    assert metrics["passes"].tolist() == [True, False]
+    assert metrics["score"][0] == pytest.approx(1.0) and metrics["score"][1] < 0.5
+
+
+def test_rank_candidates_skips_near_duplicates():
+    candidates = [(0, 0, 0), (1, 1, 1), (0, 0, 120), (250, 250, 250)]
+    chosen, scores = Scoring.rank_candidates((255, 255, 255), candidates, 3)
+    assert len(scores) == len(candidates)
+    assert chosen[0] == 0 and 1 not in chosen and sorted(chosen) == [0, 2, 3]
@@ -0,0 +1,26 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from Video import PixelPool
+
+
+def test_pool_stays_bounded_over_long_scenes():
+    pool = PixelPool(limit=1000)
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    for i in range(2000):
+        frame[...] = i % 256
+        pool.add(frame)
+        assert pool.size <= 2 * pool.limit
+    assert len(pool.pixels()) <= 2 * pool.limit and pool.frames == 2000
+
+
+def test_pool_samples_every_part_of_the_scene():
+    pool = PixelPool(limit=1000)
+    for value in (0, 100, 200):
+        for _ in range(50):
+            pool.add(np.full((60, 80, 3), value, dtype=np.uint8))
+    values, counts = np.unique(pool.pixels()[:, 0], return_counts=True)
+    assert values.tolist() == [0, 100, 200]
+    assert counts.min() > 0.2 * counts.sum()